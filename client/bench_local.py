@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Optional, Sequence
+
+from mock_server import add_server_arguments, config_from_args
+from planner import pin_cpus
+
+
+PREFIX = "server-"
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_server.py")
+
+
+def _server_argv(args: argparse.Namespace) -> List[str]:
+    """Параметры ``--server-*`` лаунчера -> аргументы ``mock_server.py``."""
+    argv = []
+    for action_dest, value in sorted(vars(args).items()):
+        if not action_dest.startswith("server_") or action_dest == "server_cpus":
+            continue
+        flag = "--" + action_dest[len("server_"):].replace("_", "-")
+        if isinstance(value, bool):
+            if value:
+                argv.append(flag)
+        elif value is not None:
+            argv += [flag, str(value)]
+    return argv
+
+
+async def wait_ready(host: str, port: int, proc, timeout: float = 10.0, what: str = "mock server") -> None:
+    """Ждёт, пока дочерний процесс ``proc`` начнёт принимать соединения."""
+    deadline = time.monotonic() + timeout
+    while True:
+        if proc.returncode is not None:
+            raise RuntimeError(f"{what} exited with code {proc.returncode}")
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"{what} did not start on {host}:{port} in {timeout:.0f}s")
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return
+
+
+async def run(server_argv: Sequence[str], host: str, port: int, bench_argv: Sequence[str], cpus: Optional[List[int]]):
+    """Поднимает ``mock_server.py`` отдельным процессом (не делит GIL и цикл
+    событий с клиентами), гоняет ``benchmark_otel.py`` против него и гасит сервер.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        MOCK_SERVER,
+        *server_argv,
+        preexec_fn=(lambda: pin_cpus(cpus)) if cpus else None,
+    )
+    try:
+        await wait_ready(host, port, proc)
+        # импорт здесь: benchmark_otel при загрузке ищет клиенты и настраивает логирование
+        import benchmark_otel
+
+        await benchmark_otel.main([*bench_argv, "--base-url", f"http://{host}:{port}/users"])
+    finally:
+        if proc.returncode is None:
+            proc.terminate()
+            await proc.wait()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run benchmark_otel.py against a local mock users API. Server options are "
+            "prefixed with --server-; everything else is passed to benchmark_otel.py."
+        )
+    )
+    add_server_arguments(parser, prefix=PREFIX)
+    parser.add_argument("--server-cpus", default=None, help="pin the mock server to these CPUs, e.g. 0,1")
+    args, bench_argv = parser.parse_known_args(argv)
+    try:
+        config_from_args(args, prefix=PREFIX)
+        cpus = [int(c) for c in args.server_cpus.split(",") if c.strip()] if args.server_cpus else None
+    except ValueError as e:
+        parser.error(str(e))
+    if "--base-url" in bench_argv:
+        parser.error("--base-url is set by the launcher")
+
+    asyncio.run(run(_server_argv(args), args.server_host, args.server_port, bench_argv, cpus))
+
+
+if __name__ == "__main__":
+    main()
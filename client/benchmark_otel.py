@@ -1,16 +1,54 @@
+import argparse
 import asyncio
+import json
 import time
 import logging
-from statistics import mean
-from typing import Dict, Any
-
-from clients import (
-    UrllibUserClient,
-    RequestsUserClient,
-    HttpxUserClient,
-    AiohttpUserClient,
+import os
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from clients import ClientSpec, discover_clients, expand_sweep, get_client, split_client_list
+from clients.hdr import LatencyHistogram
+from instrument import (
+    AsyncInstrumentedClient,
+    InstrumentedClient,
+    OperationMetrics,
+    OperationStats,
+    format_operations_table,
 )
-from otel_config import configure_opentelemetry, get_tracer, get_meter
+from planner import RunPlan, RunSample, SubprocessRunner, by_client, format_ci_table, gc_allocations, pin_cpus
+from otel_config import (
+    add_telemetry_arguments,
+    configure_opentelemetry,
+    get_meter,
+    get_tracer,
+    telemetry_argv,
+    telemetry_config_from_args,
+)
+from load import (
+    CRUD_OPS,
+    ArrivalProfile,
+    CrudError,
+    LoadConfig,
+    crud_iteration,
+    crud_iteration_async,
+    run_client_load,
+    report,
+)
+from payload import (
+    DEFAULT_SIZES,
+    PayloadConfig,
+    PayloadPoint,
+    format_payload_chart,
+    parse_shapes,
+    parse_sizes,
+    report_payload,
+    run_payload_sweep,
+)
+from reads import ReadConfig, report_reads, run_skewed_reads
+from results import BenchmarkResult, environment, scenario_from_args
+from seed import BulkConfig, report_bulk, run_bulk_seed
+from workload import SHAPES, format_size
 
 
 logging.basicConfig(
@@ -20,309 +58,677 @@ logging.basicConfig(
 logger = logging.getLogger("benchmark_otel")
 
 
-TEST_USERS = [
-    {"username": "ivan", "email": "ivan@example.com"},
-    {"username": "maria", "email": "maria@example.com"},
-    {"username": "petr", "email": "petr@example.com"},
-]
+class _IterationRecorder:
+    """Общие для всех клиентов замер, span и метрики одной CRUD-итерации."""
+
+    def __init__(
+        self,
+        spec: ClientSpec,
+        tracer,
+        duration_hist,
+        errors_counter,
+        significant_digits: int,
+        log_iterations: bool = True,
+    ):
+        self.name = spec.name
+        self.log_iterations = log_iterations
+        self.tracer = tracer
+        self.duration_hist = duration_hist
+        self.errors_counter = errors_counter
+        self.attributes = {"client.name": spec.name, "client.type": spec.kind}
+        self.hist = LatencyHistogram(significant_digits=significant_digits)
+        self.operations = OperationStats(significant_digits=significant_digits)
+        self.errors = 0
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+
+    @contextmanager
+    def iteration(self, i: int):
+        with self.tracer.start_as_current_span(f"{self.name}.iteration") as span_iter:
+            span_iter.set_attribute("iteration", i)
+            start = time.perf_counter()
+            if self._first_start is None:
+                self._first_start = start
+            try:
+                yield span_iter
+            except CrudError as e:
+                self._error(span_iter)
+                span_iter.set_attribute("error.reason", "no id on create")
+                logger.warning("[%s] %s", self.name, e)
+            except Exception as e:
+                self._error(span_iter)
+                span_iter.set_attribute("error.msg", str(e))
+                logger.exception("[%s] error on iteration %d", self.name, i)
+            else:
+                duration_ms = (time.perf_counter() - start) * 1000
+                self.hist.record(duration_ms)
+                self.duration_hist.record(duration_ms, attributes=self.attributes)
+
+                span_iter.set_attribute("status", "success")
+                span_iter.set_attribute("duration_ms", round(duration_ms, 2))
+                span_iter.set_attribute("crud_ops", CRUD_OPS)
+
+                if self.log_iterations:
+                    logger.info("[%s] iteration %d: %.2f ms", self.name, i, duration_ms)
+            finally:
+                self._last_end = time.perf_counter()
+
+    def _error(self, span_iter) -> None:
+        self.errors += 1
+        self.errors_counter.add(1, attributes=self.attributes)
+        span_iter.set_attribute("status", "error")
+
+    def result(self, repetition: int = 0) -> RunSample:
+        elapsed = (self._last_end or 0.0) - (self._first_start or 0.0)
+        return RunSample(
+            client=self.name,
+            repetition=repetition,
+            hist=self.hist,
+            errors=self.errors,
+            elapsed=elapsed,
+            operations=self.operations,
+        )
 
 
-def bench_sync_client(
-    name: str,
-    client,
-    tracer,
-    duration_hist,
-    errors_counter,
-    num_requests: int = 10,
-) -> Dict[str, Any]:
-    logger.info(f"=== {name} (sync) ===")
-    times = []
-    errors = 0
-
-    with tracer.start_as_current_span(f"benchmark.{name}") as span_client:
-        span_client.set_attribute("client.name", name)
-        span_client.set_attribute("client.type", "sync")
-
-        for i in range(num_requests):
-            with tracer.start_as_current_span(f"{name}.iteration") as span_iter:
-                span_iter.set_attribute("iteration", i)
-                start = time.perf_counter()
-
-                user_payload = TEST_USERS[i % len(TEST_USERS)].copy()
-                user_payload["email"] = f"user{i}_{user_payload['email']}"
-
-                try:
-                    created = client.create_user(user_payload)
-                    if not created or "id" not in created:
-                        errors += 1
-                        errors_counter.add(
-                            1,
-                            attributes={"client.name": name, "client.type": "sync"},
-                        )
-                        span_iter.set_attribute("status", "error")
-                        span_iter.set_attribute("error.reason", "no id on create")
-                        logger.warning("[%s] create_user returned no id: %r", name, created)
-                        continue
-
-                    user_id = created["id"]
-                    span_iter.set_attribute("user.id", user_id)
-
-                    _ = client.get_user(user_id)
-
-                    updated = {**user_payload, "username": user_payload["username"] + "_updated"}
-                    _ = client.update_user(user_id, updated)
-
-                    _ = client.delete_user(user_id)
-
-                    duration_ms = (time.perf_counter() - start) * 1000
-                    times.append(duration_ms)
-
-                    attributes = {
-                        "client.name": name,
-                        "client.type": "sync",
-                    }
-                    duration_hist.record(duration_ms, attributes=attributes)
-
-                    span_iter.set_attribute("status", "success")
-                    span_iter.set_attribute("duration_ms", round(duration_ms, 2))
-                    span_iter.set_attribute("crud_ops", 4)
-
-                    logger.info("[%s] iteration %d: %.2f ms", name, i, duration_ms)
-                except Exception as e:
-                    errors += 1
-                    errors_counter.add(
-                        1,
-                        attributes={"client.name": name, "client.type": "sync"},
-                    )
-                    span_iter.set_attribute("status", "error")
-                    span_iter.set_attribute("error.msg", str(e))
-                    logger.exception("[%s] error on iteration %d", name, i)
-
-    if hasattr(client, "close"):
+def _warm_up(client, warmup: int) -> None:
+    for i in range(warmup):
+        try:
+            crud_iteration(client, i)
+        except Exception as e:
+            logger.debug("warm-up iteration %d failed: %s", i, e)
+
+
+async def _warm_up_async(client, warmup: int) -> None:
+    for i in range(warmup):
+        try:
+            await crud_iteration_async(client, i)
+        except Exception as e:
+            logger.debug("warm-up iteration %d failed: %s", i, e)
+
+
+def _bench_sync(
+    spec: ClientSpec, recorder: _IterationRecorder, num_requests: int, warmup: int, op_metrics
+) -> None:
+    raw_client = spec.factory()
+    client = InstrumentedClient(raw_client, recorder.operations, op_metrics, recorder.attributes)
+    try:
+        _warm_up(raw_client, warmup)
+        for i in range(warmup, warmup + num_requests):
+            with recorder.iteration(i) as span_iter:
+                span_iter.set_attribute("user.id", crud_iteration(client, i))
+    finally:
         try:
             client.close()
         except Exception:
             pass
 
-    return {"times": times, "errors": errors}
-
 
-async def bench_httpx_client(
-    tracer,
-    duration_hist,
-    errors_counter,
-    num_requests: int = 10,
-) -> Dict[str, Any]:
-    name = "httpx"
-    logger.info(f"=== {name} (async) ===")
-    times = []
-    errors = 0
-
-    with tracer.start_as_current_span("benchmark.httpx") as span_client:
-        span_client.set_attribute("client.name", name)
-        span_client.set_attribute("client.type", "async")
-
-        async with HttpxUserClient() as client:
-            for i in range(num_requests):
-                with tracer.start_as_current_span(f"{name}.iteration") as span_iter:
-                    span_iter.set_attribute("iteration", i)
-                    start = time.perf_counter()
-
-                    user_payload = TEST_USERS[i % len(TEST_USERS)].copy()
-                    user_payload["email"] = f"user{i}_{user_payload['email']}"
-
-                    try:
-                        created = await client.create_user(user_payload)
-                        if not created or "id" not in created:
-                            errors += 1
-                            errors_counter.add(
-                                1,
-                                attributes={"client.name": name, "client.type": "async"},
-                            )
-                            span_iter.set_attribute("status", "error")
-                            span_iter.set_attribute("error.reason", "no id on create")
-                            logger.warning("[%s] create_user returned no id: %r", name, created)
-                            continue
-
-                        user_id = created["id"]
-                        span_iter.set_attribute("user.id", user_id)
-
-                        _ = await client.get_user(user_id)
-
-                        updated = {**user_payload, "username": user_payload["username"] + "_updated"}
-                        _ = await client.update_user(user_id, updated)
-
-                        _ = await client.delete_user(user_id)
-
-                        duration_ms = (time.perf_counter() - start) * 1000
-                        times.append(duration_ms)
-
-                        attributes = {
-                            "client.name": name,
-                            "client.type": "async",
-                        }
-                        duration_hist.record(duration_ms, attributes=attributes)
-
-                        span_iter.set_attribute("status", "success")
-                        span_iter.set_attribute("duration_ms", round(duration_ms, 2))
-                        span_iter.set_attribute("crud_ops", 4)
-
-                        logger.info("[%s] iteration %d: %.2f ms", name, i, duration_ms)
-                    except Exception as e:
-                        errors += 1
-                        errors_counter.add(
-                            1,
-                            attributes={"client.name": name, "client.type": "async"},
-                        )
-                        span_iter.set_attribute("status", "error")
-                        span_iter.set_attribute("error.msg", str(e))
-                        logger.exception("[%s] error on iteration %d", name, i)
-
-    return {"times": times, "errors": errors}
-
-
-async def bench_aiohttp_client(
+async def bench_client(
+    spec: ClientSpec,
     tracer,
     duration_hist,
     errors_counter,
     num_requests: int = 10,
-) -> Dict[str, Any]:
-    name = "aiohttp"
-    logger.info(f"=== {name} (async) ===")
-    times = []
-    errors = 0
-
-    with tracer.start_as_current_span("benchmark.aiohttp") as span_client:
-        span_client.set_attribute("client.name", name)
-        span_client.set_attribute("client.type", "async")
-
-        async with AiohttpUserClient() as client:
-            for i in range(num_requests):
-                with tracer.start_as_current_span(f"{name}.iteration") as span_iter:
-                    span_iter.set_attribute("iteration", i)
-                    start = time.perf_counter()
-
-                    user_payload = TEST_USERS[i % len(TEST_USERS)].copy()
-                    user_payload["email"] = f"user{i}_{user_payload['email']}"
-
-                    try:
-                        created = await client.create_user(user_payload)
-                        if not created or "id" not in created:
-                            errors += 1
-                            errors_counter.add(
-                                1,
-                                attributes={"client.name": name, "client.type": "async"},
-                            )
-                            span_iter.set_attribute("status", "error")
-                            span_iter.set_attribute("error.reason", "no id on create")
-                            logger.warning("[%s] create_user returned no id: %r", name, created)
-                            continue
-
-                        user_id = created["id"]
-                        span_iter.set_attribute("user.id", user_id)
-
-                        _ = await client.get_user(user_id)
-
-                        updated = {**user_payload, "username": user_payload["username"] + "_updated"}
-                        _ = await client.update_user(user_id, updated)
-
-                        _ = await client.delete_user(user_id)
-
-                        duration_ms = (time.perf_counter() - start) * 1000
-                        times.append(duration_ms)
-
-                        attributes = {
-                            "client.name": name,
-                            "client.type": "async",
-                        }
-                        duration_hist.record(duration_ms, attributes=attributes)
-
-                        span_iter.set_attribute("status", "success")
-                        span_iter.set_attribute("duration_ms", round(duration_ms, 2))
-                        span_iter.set_attribute("crud_ops", 4)
-
-                        logger.info("[%s] iteration %d: %.2f ms", name, i, duration_ms)
-                    except Exception as e:
-                        errors += 1
-                        errors_counter.add(
-                            1,
-                            attributes={"client.name": name, "client.type": "async"},
-                        )
-                        span_iter.set_attribute("status", "error")
-                        span_iter.set_attribute("error.msg", str(e))
-                        logger.exception("[%s] error on iteration %d", name, i)
-
-    return {"times": times, "errors": errors}
-
-
-def summarize(name: str, result: Dict[str, Any]) -> None:
-    times = result["times"]
-    errors = result["errors"]
-    logger.info("--- %s summary ---", name)
-    logger.info("  successful: %d", len(times))
-    logger.info("  errors:     %d", errors)
-    if times:
-        logger.info("  min:        %.2f ms", min(times))
-        logger.info("  max:        %.2f ms", max(times))
-        logger.info("  avg:        %.2f ms", mean(times))
-
-
-async def main():
-    configure_opentelemetry()
-    tracer = get_tracer("benchmark_otel")
-    meter = get_meter("benchmark_otel")
+    significant_digits: int = 2,
+    op_metrics: Optional[OperationMetrics] = None,
+    warmup: int = 0,
+    repetition: int = 0,
+    log_iterations: bool = True,
+) -> RunSample:
+    """Последовательные CRUD-итерации одним клиентом любого типа;
+    первые ``warmup`` итераций не замеряются.
+    """
+    logger.info("=== %s (%s) ===", spec.name, spec.kind)
+    recorder = _IterationRecorder(spec, tracer, duration_hist, errors_counter, significant_digits, log_iterations)
+
+    with tracer.start_as_current_span(f"benchmark.{spec.name}") as span_client:
+        span_client.set_attribute("client.name", spec.name)
+        span_client.set_attribute("client.type", spec.kind)
+
+        if not spec.is_async:
+            # контекст (и текущий span) копируется в поток
+            await asyncio.to_thread(_bench_sync, spec, recorder, num_requests, warmup, op_metrics)
+        else:
+            async with spec.factory() as raw_client:
+                await _warm_up_async(raw_client, warmup)
+                client = AsyncInstrumentedClient(
+                    raw_client, recorder.operations, op_metrics, recorder.attributes
+                )
+                for i in range(warmup, warmup + num_requests):
+                    with recorder.iteration(i) as span_iter:
+                        span_iter.set_attribute("user.id", await crud_iteration_async(client, i))
+
+    return recorder.result(repetition)
+
+
+def summarize(sample: RunSample) -> None:
+    hist = sample.hist
+    logger.info("--- %s summary ---", sample.client)
+    logger.info("  successful: %d", hist.total_count)
+    logger.info("  errors:     %d", sample.errors)
+    if hist.total_count:
+        logger.info("  min:        %.2f ms", hist.min)
+        logger.info("  max:        %.2f ms", hist.max)
+        logger.info("  avg:        %.2f ms", hist.mean)
+        for q, value in hist.percentiles((50, 95, 99)).items():
+            logger.info("  p%-9s %.2f ms", f"{q:g}:", value)
+
+
+def report_operations(operations: Dict[str, OperationStats]) -> None:
+    """Сравнение CRUD-операций и их фаз между клиентами, мс."""
+    if not any(stats.hists for stats in operations.values()):
+        return
+    logger.info("--- per-operation latency, ms ---\n%s", format_operations_table(operations))
+
+
+def dump_histogram(hist_dir: str, name: str, hist: LatencyHistogram) -> None:
+    """Сохраняет гистограмму для офлайн-сравнения: ``python hdr.py a.hdr.json b.hdr.json``."""
+    os.makedirs(hist_dir, exist_ok=True)
+    path = os.path.join(hist_dir, f"{name}.hdr.json")
+    hist.dump(path)
+    logger.info("  histogram:  %s", path)
+
+
+# клиенты из clients/*_client.py и плагинов BENCH_CLIENT_PLUGINS
+ALL_CLIENTS = tuple(discover_clients())
+
+DEFAULT_BASE_URL = "http://localhost:3100/users"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HTTP clients benchmark with OpenTelemetry")
+    parser.add_argument(
+        "--mode",
+        choices=("iterations", "load", "open", "bulk", "reads", "payload"),
+        default="iterations",
+        help=(
+            "iterations: sequential CRUD iterations; load: concurrent virtual users "
+            "(closed loop); open: constant arrival rate (open loop); "
+            "bulk: seed, update and delete users with the batch APIs, items/s; "
+            "reads: concurrent get_user on Zipf-distributed keys, GETs saved by coalesce/cache; "
+            "payload: CRUD load per request body size and shape, throughput vs payload size"
+        ),
+    )
+    parser.add_argument(
+        "--clients",
+        default=",".join(ALL_CLIENTS),
+        help=(
+            "comma-separated subset of %(default)s; constructor options as "
+            "name[key=value;key=value], e.g. httpx[http2=true;http1=false]"
+        ),
+    )
+    parser.add_argument(
+        "--base-url",
+        default=DEFAULT_BASE_URL,
+        help="users collection URL (default: %(default)s); see mock_server.py / bench_local.py",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2",
+        help="run every client that accepts option KEY once per value; repeatable, values are combined",
+    )
+    parser.add_argument("--iterations", type=int, default=10, help="iterations mode: CRUD iterations per client")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help=(
+            "load/payload mode: virtual users per client; bulk mode: requests in flight; "
+            "reads mode: concurrent readers"
+        ),
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="load/reads mode: seconds to run after warm-up")
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=None,
+        help=(
+            "load mode: total CRUD iterations; reads mode: total reads (instead of --duration); "
+            f"payload mode: CRUD iterations per size and shape (default {PayloadConfig.requests})"
+        ),
+    )
+    parser.add_argument("--warmup", type=float, default=0.0, help="load mode: seconds of discarded warm-up")
+    parser.add_argument(
+        "--rate",
+        default="constant:10",
+        help="open mode: iterations/s profile, e.g. constant:50, step:10,20,40@5, ramp:10:200",
+    )
+    parser.add_argument("--bulk-items", type=int, default=1000, help="bulk mode: users to seed per run")
+    parser.add_argument(
+        "--bulk-size", type=int, default=500, help="bulk mode: items per request when the server has a bulk endpoint"
+    )
+    parser.add_argument("--read-keys", type=int, default=1000, help="reads mode: users created and read")
+    parser.add_argument(
+        "--zipf", type=float, default=1.1, help="reads mode: Zipf exponent of the key distribution, 0 = uniform"
+    )
+    parser.add_argument(
+        "--payload-sizes",
+        default=DEFAULT_SIZES,
+        help="payload mode: request body sizes, bytes or k/m (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--payload-shapes",
+        default=",".join(SHAPES),
+        help="payload mode: body shapes, subset of %(default)s",
+    )
+    parser.add_argument("--max-inflight", type=int, default=1000, help="open mode: in-flight cap before sends are missed")
+    parser.add_argument("--hist-dir", default=None, help="directory to save per-client latency histograms (<client>.hdr.json)")
+    parser.add_argument(
+        "--results-dir",
+        default="results",
+        help="directory for the machine-readable run result, see compare_results.py; empty to skip (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--hist-digits",
+        type=int,
+        choices=range(1, 4),
+        default=2,
+        metavar="{1..3}",
+        help=(
+            "latency histogram precision in significant digits: 2 is ~20 KB per histogram and 1%% error, "
+            "3 is ~140 KB and 0.1%% (default: %(default)s)"
+        ),
+    )
+    parser.add_argument("--warmup-iterations", type=int, default=0, help="iterations mode: discarded CRUD iterations per run")
+    parser.add_argument("--repetitions", type=int, default=1, help="runs per client; >1 reports a 95%% confidence interval")
+    parser.add_argument("--shuffle", action="store_true", help="randomize client order in every repetition")
+    parser.add_argument("--seed", type=int, default=None, help="seed for --shuffle and the reads mode key sequence")
+    parser.add_argument("--cooldown", type=float, default=0.0, help="seconds to pause between runs")
+    parser.add_argument(
+        "--isolate",
+        choices=("inline", "subprocess"),
+        default="inline",
+        help="inline: runs share this process; subprocess: fresh interpreter per run",
+    )
+    parser.add_argument("--cpus", default=None, help="pin the benchmarking process to these CPUs, e.g. 2,3")
+    add_telemetry_arguments(parser)
+    # служебные: запуск одного прогона дочерним процессом SubprocessRunner
+    parser.add_argument("--worker-output", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-repetition", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.repetitions < 1:
+        parser.error("--repetitions must be >= 1")
+    if args.cpus is not None:
+        try:
+            args.cpus = [int(c) for c in args.cpus.split(",") if c.strip()]
+        except ValueError:
+            parser.error(f"invalid --cpus: {args.cpus!r}")
+
+    try:
+        ArrivalProfile(args.rate)
+        parse_sizes(args.payload_sizes)
+        parse_shapes(args.payload_shapes)
+        args.telemetry = telemetry_config_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    sweep = {}
+    for item in args.sweep:
+        key, sep, values = item.partition("=")
+        if not sep or not values:
+            parser.error(f"invalid --sweep {item!r}, expected KEY=V1,V2")
+        sweep[key.strip()] = [v.strip() for v in values.split(",") if v.strip()]
+
+    try:
+        args.clients = expand_sweep(split_client_list(args.clients), sweep)
+        for name in args.clients:
+            get_client(name)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def _load_config(args) -> LoadConfig:
+    return LoadConfig(
+        concurrency=args.concurrency,
+        duration=args.duration,
+        requests=args.requests,
+        warmup=args.warmup,
+        rate=args.rate if args.mode == "open" else None,
+        max_inflight=args.max_inflight,
+        significant_digits=args.hist_digits,
+    )
 
-    duration_hist = meter.create_histogram(
-        name="http_client_iteration_ms",
-        unit="ms",
-        description="Duration of one CRUD iteration per client",
+
+def _bulk_config(args) -> BulkConfig:
+    return BulkConfig(
+        items=args.bulk_items,
+        concurrency=args.concurrency,
+        bulk_size=args.bulk_size,
+        significant_digits=args.hist_digits,
     )
-    errors_counter = meter.create_counter(
-        name="http_client_errors_total",
-        unit="1",
-        description="Number of failed CRUD iterations per client",
+
+
+def _read_config(args) -> ReadConfig:
+    return ReadConfig(
+        keys=args.read_keys,
+        zipf_s=args.zipf,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        requests=args.requests,
+        seed=args.seed,
+        significant_digits=args.hist_digits,
     )
 
-    num_requests = 10
-    logger.info(
-        "Running OTEL benchmark against http://localhost:3100/users with %d iterations each",
-        num_requests,
+
+def _payload_config(args) -> PayloadConfig:
+    return PayloadConfig(
+        sizes=parse_sizes(args.payload_sizes),
+        shapes=parse_shapes(args.payload_shapes),
+        concurrency=args.concurrency,
+        requests=args.requests if args.requests is not None else PayloadConfig.requests,
+        seed=args.seed,
+        significant_digits=args.hist_digits,
     )
 
-    with tracer.start_as_current_span("benchmark.full") as root_span:
-        root_span.set_attribute("num_requests", num_requests)
-        root_span.set_attribute("clients", "urllib,requests,httpx,aiohttp")
 
-        urllib_res = bench_sync_client(
-            "urllib",
-            UrllibUserClient(),
+def _worker_argv(args) -> List[str]:
+    """Параметры одного прогона для дочернего процесса."""
+    argv = [
+        "--mode", args.mode,
+        "--base-url", args.base_url,
+        "--iterations", str(args.iterations),
+        "--warmup-iterations", str(args.warmup_iterations),
+        "--concurrency", str(args.concurrency),
+        "--duration", str(args.duration),
+        "--warmup", str(args.warmup),
+        "--rate", args.rate,
+        "--max-inflight", str(args.max_inflight),
+        "--bulk-items", str(args.bulk_items),
+        "--bulk-size", str(args.bulk_size),
+        "--read-keys", str(args.read_keys),
+        "--zipf", str(args.zipf),
+        "--payload-sizes", args.payload_sizes,
+        "--payload-shapes", args.payload_shapes,
+        "--hist-digits", str(args.hist_digits),
+    ]
+    if args.requests is not None:
+        argv += ["--requests", str(args.requests)]
+    if args.seed is not None:
+        argv += ["--seed", str(args.seed)]
+    return argv + telemetry_argv(args.telemetry)
+
+
+async def run_once(
+    args, spec: ClientSpec, repetition: int, tracer, duration_hist, errors_counter, op_metrics
+) -> RunSample:
+    """Один прогон; процессорное время и GC-аллокации считаются на весь
+    процесс, вместе с потоками экспорта телеметрии.
+    """
+    cpu_started, allocs_started = time.process_time(), gc_allocations()
+    sample = await _run_mode(args, spec, repetition, tracer, duration_hist, errors_counter, op_metrics)
+    sample.cpu = time.process_time() - cpu_started
+    sample.gc_allocs = gc_allocations() - allocs_started
+    return sample
+
+
+async def _run_mode(
+    args, spec: ClientSpec, repetition: int, tracer, duration_hist, errors_counter, op_metrics
+) -> RunSample:
+    if args.mode == "iterations":
+        sample = await bench_client(
+            spec,
             tracer,
             duration_hist,
             errors_counter,
-            num_requests,
+            args.iterations,
+            args.hist_digits,
+            op_metrics,
+            args.warmup_iterations,
+            repetition,
+            args.telemetry.iteration_logs,
         )
-        requests_res = bench_sync_client(
-            "requests",
-            RequestsUserClient(),
-            tracer,
-            duration_hist,
-            errors_counter,
-            num_requests,
+        summarize(sample)
+        return sample
+
+    if args.mode == "bulk":
+        with tracer.start_as_current_span(f"benchmark.{spec.name}.bulk") as span:
+            span.set_attribute("client.name", spec.name)
+            span.set_attribute("repetition", repetition)
+            result = await run_bulk_seed(spec, _bulk_config(args), errors_counter)
+            span.set_attribute("items", result.total)
+            span.set_attribute("errors", result.errors)
+            span.set_attribute("throughput_items", round(result.rps, 2))
+        report_bulk(result)
+        return RunSample(
+            client=spec.name,
+            repetition=repetition,
+            hist=result.hist,
+            errors=result.errors,
+            elapsed=result.elapsed,
+            operations=result.operations,
+        )
+
+    if args.mode == "reads":
+        cfg = _read_config(args)
+        with tracer.start_as_current_span(f"benchmark.{spec.name}.reads") as span:
+            span.set_attribute("client.name", spec.name)
+            span.set_attribute("repetition", repetition)
+            result = await run_skewed_reads(spec, cfg, errors_counter)
+            span.set_attribute("reads", result.total)
+            span.set_attribute("errors", result.errors)
+            span.set_attribute("sent", result.sent)
+            span.set_attribute("coalesced", result.coalesced)
+            span.set_attribute("cache_hits", result.cache_hits)
+        report_reads(result, cfg)
+        return RunSample(
+            client=spec.name,
+            repetition=repetition,
+            hist=result.hist,
+            errors=result.errors,
+            elapsed=result.elapsed,
+            operations=result.operations,
+        )
+
+    if args.mode == "payload":
+        cfg = _payload_config(args)
+        with tracer.start_as_current_span(f"benchmark.{spec.name}.payload") as span:
+            span.set_attribute("client.name", spec.name)
+            span.set_attribute("repetition", repetition)
+            result = await run_payload_sweep(spec, cfg, duration_hist, errors_counter, op_metrics)
+            span.set_attribute("iterations", result.total)
+            span.set_attribute("errors", result.errors)
+            span.set_attribute("points", len(result.points))
+        report_payload(result, cfg)
+        return RunSample(
+            client=spec.name,
+            repetition=repetition,
+            hist=result.hist,
+            errors=result.errors,
+            elapsed=result.elapsed,
+            operations=result.operations,
+            points=[p.to_dict() for p in result.points],
         )
 
-        httpx_res, aiohttp_res = await asyncio.gather(
-            bench_httpx_client(tracer, duration_hist, errors_counter, num_requests),
-            bench_aiohttp_client(tracer, duration_hist, errors_counter, num_requests),
+    with tracer.start_as_current_span(f"benchmark.{spec.name}.load") as span:
+        span.set_attribute("client.name", spec.name)
+        span.set_attribute("repetition", repetition)
+        result = await run_client_load(
+            spec, _load_config(args), duration_hist, errors_counter, op_metrics
+        )
+        span.set_attribute("iterations", result.total)
+        span.set_attribute("errors", result.errors)
+        span.set_attribute("missed", result.missed)
+        span.set_attribute("throughput_its", round(result.rps, 2))
+    report(result)
+    return RunSample(
+        client=spec.name,
+        repetition=repetition,
+        hist=result.hist,
+        errors=result.errors,
+        missed=result.missed,
+        elapsed=result.elapsed,
+        operations=result.operations,
+    )
+
+
+def report_samples(args, samples: List[RunSample]) -> None:
+    grouped = by_client(samples)
+    operations = {}
+    for client, runs in grouped.items():
+        operations[client] = OperationStats(significant_digits=args.hist_digits)
+        for sample in runs:
+            operations[client].merge(sample.operations)
+        if args.hist_dir:
+            dump_histogram(args.hist_dir, client, LatencyHistogram.merged(s.hist for s in runs))
+
+    report_operations(operations)
+    if args.mode == "payload":
+        logger.info(
+            "--- throughput vs payload size, concurrency=%d ---\n%s",
+            args.concurrency,
+            format_payload_chart(
+                {client: [PayloadPoint.from_dict(p) for s in runs for p in s.points] for client, runs in grouped.items()}
+            ),
+        )
+    if args.repetitions > 1:
+        logger.info(
+            "--- %d repetitions per client, mean ± 95%% CI ---\n%s",
+            args.repetitions,
+            format_ci_table(samples),
+        )
+
+
+async def run_benchmark(args, tracer, duration_hist, errors_counter, op_metrics) -> None:
+    if args.mode == "iterations":
+        logger.info(
+            "Running OTEL benchmark against %s with %d iterations each",
+            args.base_url,
+            args.iterations,
+        )
+    elif args.mode == "bulk":
+        logger.info(
+            "Running OTEL bulk seed benchmark against %s: "
+            "%d users, concurrency=%d, bulk size %d",
+            args.base_url,
+            args.bulk_items,
+            args.concurrency,
+            args.bulk_size,
+        )
+    elif args.mode == "payload":
+        cfg = _payload_config(args)
+        logger.info(
+            "Running OTEL payload sweep benchmark against %s: "
+            "sizes %s, shapes %s, concurrency=%d, %d iterations per point",
+            args.base_url,
+            ",".join(format_size(s) for s in cfg.sizes),
+            ",".join(cfg.shapes),
+            cfg.concurrency,
+            cfg.requests,
+        )
+    elif args.mode == "reads":
+        logger.info(
+            "Running OTEL skewed reads benchmark against %s: "
+            "%d keys, zipf s=%g, concurrency=%d, %s",
+            args.base_url,
+            args.read_keys,
+            args.zipf,
+            args.concurrency,
+            f"{args.requests} reads" if args.requests is not None else f"{args.duration:.1f}s",
+        )
+    else:
+        cfg = _load_config(args)
+        logger.info(
+            "Running OTEL %s benchmark against %s: "
+            "%s, %s, warm-up %.1fs",
+            args.mode,
+            args.base_url,
+            f"rate {cfg.rate}" if cfg.rate else f"concurrency={cfg.concurrency}",
+            f"{cfg.requests} iterations" if cfg.requests is not None else f"{cfg.duration:.1f}s",
+            cfg.warmup,
         )
 
-        summarize("urllib", urllib_res)
-        summarize("requests", requests_res)
-        summarize("httpx", httpx_res)
-        summarize("aiohttp", aiohttp_res)
+    plan = RunPlan(
+        clients=args.clients,
+        repetitions=args.repetitions,
+        shuffle=args.shuffle,
+        seed=args.seed,
+        cooldown=args.cooldown,
+    )
+    if args.isolate == "subprocess":
+        run_one = SubprocessRunner(os.path.abspath(__file__), _worker_argv(args), args.cpus)
+    else:
+        pin_cpus(args.cpus)
+
+        async def run_one(client: str, repetition: int) -> RunSample:
+            spec = get_client(client).with_base_url(args.base_url)
+            return await run_once(args, spec, repetition, tracer, duration_hist, errors_counter, op_metrics)
+
+    with tracer.start_as_current_span(f"benchmark.{args.mode}") as root_span:
+        root_span.set_attribute("clients", ",".join(args.clients))
+        root_span.set_attribute("repetitions", args.repetitions)
+        root_span.set_attribute("isolate", args.isolate)
+        if args.mode == "iterations":
+            root_span.set_attribute("num_requests", args.iterations)
+        elif args.mode == "bulk":
+            root_span.set_attribute("bulk_items", args.bulk_items)
+            root_span.set_attribute("concurrency", args.concurrency)
+        elif args.mode == "payload":
+            root_span.set_attribute("payload_sizes", args.payload_sizes)
+            root_span.set_attribute("payload_shapes", args.payload_shapes)
+            root_span.set_attribute("concurrency", args.concurrency)
+        elif args.mode == "reads":
+            root_span.set_attribute("read_keys", args.read_keys)
+            root_span.set_attribute("zipf", args.zipf)
+            root_span.set_attribute("concurrency", args.concurrency)
+        else:
+            root_span.set_attribute("concurrency", args.concurrency)
+            if args.mode == "open":
+                root_span.set_attribute("rate", args.rate)
+        samples = await plan.execute(run_one)
+
+    report_samples(args, samples)
+    if args.results_dir:
+        path = BenchmarkResult(scenario_from_args(args), samples, environment(args.cpus)).dump(args.results_dir)
+        logger.info("results: %s", path)
+
+
+async def run_worker(args, tracer, duration_hist, errors_counter, op_metrics) -> None:
+    sample = await run_once(
+        args,
+        get_client(args.clients[0]).with_base_url(args.base_url),
+        args.worker_repetition,
+        tracer,
+        duration_hist,
+        errors_counter,
+        op_metrics,
+    )
+    with open(args.worker_output, "w", encoding="utf-8") as f:
+        json.dump(sample.to_dict(), f)
 
-    await asyncio.sleep(3)
+
+async def main(argv=None):
+    args = parse_args(argv)
+
+    telemetry = configure_opentelemetry(cfg=args.telemetry)
+    tracer = get_tracer("benchmark_otel")
+    meter = get_meter("benchmark_otel")
+
+    duration_hist = meter.create_histogram(
+        name="http_client_iteration_ms",
+        unit="ms",
+        description="Duration of one CRUD iteration per client",
+    )
+    errors_counter = meter.create_counter(
+        name="http_client_errors_total",
+        unit="1",
+        description="Number of failed CRUD iterations per client",
+    )
+    # без SDK не нужны и инструменты по операциям: замер только в HDR-гистограммах
+    op_metrics = OperationMetrics.create(meter) if args.telemetry.exporter != "disabled" else None
+
+    try:
+        if args.worker_output:
+            await run_worker(args, tracer, duration_hist, errors_counter, op_metrics)
+        else:
+            await run_benchmark(args, tracer, duration_hist, errors_counter, op_metrics)
+    finally:
+        # дожидаемся экспорта накопленных span'ов, метрик и логов, а не спим наугад
+        telemetry.shutdown()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-
@@ -1,11 +1,45 @@
-from .urllib_client import UrllibUserClient
-from .requests_client import RequestsUserClient
-from .httpx_client import HttpxUserClient
-from .aiohttp_client import AiohttpUserClient
+import importlib
+
+from .base import (
+    AsyncUserClient,
+    ClientSpec,
+    UserClient,
+    discover_clients,
+    expand_sweep,
+    get_client,
+    register_client,
+    split_client_list,
+)
+from .paging import PageSpec, PaginationError
+from .urllib_client import UrllibUserClient, PooledUrllibUserClient
+
+# клиенты на сторонних библиотеках регистрируются через discover_clients(),
+# который пропускает неустановленные; здесь они импортируются по обращению
+_OPTIONAL = {
+    "RequestsUserClient": "requests_client",
+    "HttpxUserClient": "httpx_client",
+    "AiohttpUserClient": "aiohttp_client",
+}
+
+
+def __getattr__(name: str):
+    if name in _OPTIONAL:
+        module = importlib.import_module(f".{_OPTIONAL[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
+    "AsyncUserClient",
+    "ClientSpec",
+    "UserClient",
+    "discover_clients",
+    "expand_sweep",
+    "get_client",
+    "register_client",
+    "split_client_list",
+    "PageSpec",
+    "PaginationError",
     "UrllibUserClient",
-    "RequestsUserClient",
-    "HttpxUserClient",
-    "AiohttpUserClient",
+    "PooledUrllibUserClient",
 ]
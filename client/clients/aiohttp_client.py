@@ -1,20 +1,93 @@
-from typing import Optional, Dict, Any, List
+import asyncio
+import time
+from typing import Optional, Dict, Any, AsyncIterator, List
 
 import aiohttp
 
+from .base import register_client
+from .bulk import AsyncBulkUsers
+from .cache import ResponseCache, Revalidation
+from .coalesce import AsyncCoalescedReads, AsyncSingleFlight
+from .paging import CHUNK_SIZE, AsyncPagedUsers, PaginationError
+from .phases import record_phase
+from .retry import AsyncResilience, TransientError
+from .serializers import DecodeError, get_serializer
+
 
 AUTH_HEADERS = {
     "Authorization": "Bearer test-token",
 }
 
 
-class AiohttpUserClient:
-    def __init__(self, base_url: str = "http://localhost:3100/users"):
+def _phase_trace_config() -> aiohttp.TraceConfig:
+    """Время установки новых соединений через трассировку aiohttp."""
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, ctx, params):
+        record_phase("connect", (time.perf_counter() - ctx.connect_started) * 1000)
+
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+@register_client("aiohttp")
+class AiohttpUserClient(AsyncPagedUsers, AsyncBulkUsers, AsyncCoalescedReads):
+    """Параметры пула и DNS-кэша передаются в ``aiohttp.TCPConnector``;
+    ``limit=0`` / ``limit_per_host=0`` — без ограничения.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3100/users",
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        force_close: bool = False,
+        use_dns_cache: bool = True,
+        ttl_dns_cache: int = 10,
+        serializer: str = "json",
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+        cache: bool = False,
+        cache_size: int = 1024,
+        cache_ttl: float = 30.0,
+        coalesce: bool = False,
+    ):
         self.base_url = base_url.rstrip("/")
+        self.serializer = get_serializer(serializer)
+        self.resilience = AsyncResilience.from_options(
+            "aiohttp", retries, backoff, retry_budget, hedge, hedge_delay_ms
+        )
+        self.cache = ResponseCache("aiohttp", cache_size, cache_ttl) if cache else None
+        self.flight = AsyncSingleFlight("aiohttp") if coalesce else None
+        self.connector_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "use_dns_cache": use_dns_cache,
+            "ttl_dns_cache": ttl_dns_cache,
+            "force_close": force_close,
+        }
+        if not force_close:
+            # aiohttp не разрешает keepalive_timeout вместе с force_close
+            self.connector_options["keepalive_timeout"] = keepalive_timeout
         self._session: Optional[aiohttp.ClientSession] = None
 
+    def _make_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(**self.connector_options),
+            timeout=aiohttp.ClientTimeout(total=5.0),
+            trace_configs=[_phase_trace_config()],
+        )
+
     async def __aenter__(self) -> "AiohttpUserClient":
-        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5.0))
+        self._session = self._make_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -24,7 +97,7 @@ class AiohttpUserClient:
 
     async def _ensure_session(self) -> aiohttp.ClientSession:
         if self._session is None:
-            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5.0))
+            self._session = self._make_session()
         return self._session
 
     async def _request(
@@ -32,50 +105,98 @@ class AiohttpUserClient:
         method: str,
         path: str = "",
         json_body: Optional[Dict[str, Any]] = None,
+        revalidation: Optional[Revalidation] = None,
     ) -> Optional[Any]:
         session = await self._ensure_session()
         url = f"{self.base_url}{path}"
         headers = dict(AUTH_HEADERS)
+        if revalidation is not None:
+            headers.update(revalidation.request_headers())
+        body = None
         if json_body is not None:
+            body = self.serializer.dumps(json_body)
             headers["Content-Type"] = "application/json"
 
+        return await self.resilience.call(
+            method, url, lambda: self._attempt(session, method, url, body, headers, revalidation)
+        )
+
+    async def _attempt(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        revalidation: Optional[Revalidation] = None,
+    ) -> Optional[Any]:
         try:
+            started = time.perf_counter()
             async with session.request(
                 method=method,
                 url=url,
-                json=json_body,
+                data=body,
                 headers=headers,
             ) as resp:
-                if resp.status in (200, 201):
-                    text = await resp.text()
-                    if text:
-                        return await resp.json()
+                headers_at = time.perf_counter()
+                record_phase("ttfb", (headers_at - started) * 1000)
+                if resp.status == 304 and revalidation is not None:
+                    revalidation.not_modified = True
                     return None
+                if resp.status in (200, 201):
+                    if revalidation is not None:
+                        revalidation.capture(resp.headers)
+                    raw = await resp.read()
+                    record_phase("body", (time.perf_counter() - headers_at) * 1000)
+                    if not raw:
+                        return None
+                    try:
+                        return self.serializer.loads(raw)
+                    except DecodeError as e:
+                        print(f"[aiohttp] JSON decode error on {method} {url}: {e}")
+                        return None
                 if resp.status == 204:
                     return None
+                if self.resilience.retryable_status(resp.status):
+                    raise TransientError(f"HTTP {resp.status}", status=resp.status)
                 text = await resp.text()
                 print(f"[aiohttp] HTTP {resp.status} on {method} {url}: {text[:200]}")
                 return None
-        except aiohttp.ClientError as e:
-            print(f"[aiohttp] error on {method} {url}: {e}")
-            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise TransientError(
+                f"error: {e!r}", sent=not isinstance(e, aiohttp.ClientConnectorError)
+            ) from e
+
+    async def _stream(self, path: str = "") -> AsyncIterator[bytes]:
+        session = await self._ensure_session()
+        url = f"{self.base_url}{path}"
+        async with session.get(url, headers=AUTH_HEADERS) as resp:
+            if resp.status != 200:
+                raise PaginationError(f"HTTP {resp.status} on GET {url}")
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                yield chunk
 
     async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return await self._request("POST", "", user_data)
+        created = await self._request("POST", "", user_data)
+        self._invalidate("")
+        return created
 
     async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        return await self._request("GET", f"/{user_id}")
+        return await self._get(f"/{user_id}")
 
     async def get_all_users(self) -> Optional[List[Dict[str, Any]]]:
-        result = await self._request("GET", "")
+        result = await self._get("")
         if isinstance(result, list):
             return result
         return None
 
     async def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return await self._request("PUT", f"/{user_id}", user_data)
+        updated = await self._request("PUT", f"/{user_id}", user_data)
+        self._invalidate(f"/{user_id}", "")
+        return updated
 
     async def delete_user(self, user_id: str) -> bool:
         _ = await self._request("DELETE", f"/{user_id}")
+        self._invalidate(f"/{user_id}", "")
         return True
 
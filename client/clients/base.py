@@ -0,0 +1,219 @@
+import dataclasses
+import functools
+import importlib
+import inspect
+import itertools
+import logging
+import os
+import pkgutil
+import re
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+
+logger = logging.getLogger(__name__)
+
+
+@runtime_checkable
+class UserClient(Protocol):
+    """Синхронный клиент сервиса пользователей."""
+
+    def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    def get_all_users(self) -> Optional[List[Dict[str, Any]]]: ...
+
+    def iter_users(
+        self, page_size: Optional[int] = 100, mode: str = "offset", prefetch: bool = True
+    ) -> Iterator[Dict[str, Any]]: ...
+
+    def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    def delete_user(self, user_id: str) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+@runtime_checkable
+class AsyncUserClient(Protocol):
+    """Асинхронный клиент; сессия живёт внутри ``async with``."""
+
+    async def __aenter__(self) -> "AsyncUserClient": ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None: ...
+
+    async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def get_all_users(self) -> Optional[List[Dict[str, Any]]]: ...
+
+    def iter_users(
+        self, page_size: Optional[int] = 100, mode: str = "offset", prefetch: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]: ...
+
+    async def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    async def delete_user(self, user_id: str) -> bool: ...
+
+
+@dataclass(frozen=True)
+class ClientSpec:
+    name: str
+    factory: Callable[..., Any]
+    is_async: bool
+    options: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @property
+    def kind(self) -> str:
+        return "async" if self.is_async else "sync"
+
+    def option_names(self) -> List[str]:
+        params = inspect.signature(self.factory).parameters
+        return [p for p in params if p not in ("self", "base_url")]
+
+    def with_base_url(self, base_url: Optional[str]) -> "ClientSpec":
+        """Тот же клиент против другого сервера; имя не меняется."""
+        if not base_url:
+            return self
+        return dataclasses.replace(self, factory=functools.partial(self.factory, base_url=base_url))
+
+    def with_options(self, raw: Dict[str, str]) -> "ClientSpec":
+        """Вариант клиента с параметрами конструктора из строк ``key=value``;
+        типы берутся из значений по умолчанию.
+        """
+        params = inspect.signature(self.factory).parameters
+        options = {}
+        for key, value in raw.items():
+            param = params.get(key)
+            if param is None or key == "base_url":
+                raise ValueError(
+                    f"Client {self.name!r} has no option {key!r}; "
+                    f"available: {', '.join(self.option_names())}"
+                )
+            options[key] = _coerce(key, value, param.default)
+        name = self.name
+        if options:
+            name += "[" + ";".join(f"{k}={raw[k]}" for k in raw) + "]"
+        return ClientSpec(
+            name=name,
+            factory=functools.partial(self.factory, **options),
+            is_async=self.is_async,
+            options=options,
+        )
+
+
+def _coerce(key: str, value: str, default: Any) -> Any:
+    try:
+        if isinstance(default, bool):
+            if value.lower() not in ("1", "0", "true", "false", "yes", "no", "on", "off"):
+                raise ValueError(value)
+            return value.lower() in ("1", "true", "yes", "on")
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for {key}: {value!r}")
+    return value
+
+
+# httpx[max_connections=50;http2=true] — базовое имя и параметры варианта
+_VARIANT = re.compile(r"^([\w.-]+)(?:\[(.*)\])?$")
+
+
+def parse_client_name(name: str) -> Tuple[str, Dict[str, str]]:
+    match = _VARIANT.match(name.strip())
+    if not match:
+        raise ValueError(f"Invalid client name: {name!r}")
+    base, params = match.groups()
+    options = {}
+    for pair in filter(None, (params or "").split(";")):
+        key, sep, value = pair.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Invalid client option {pair!r} in {name!r}")
+        options[key.strip()] = value.strip()
+    return base, options
+
+
+def split_client_list(raw: str) -> List[str]:
+    """Разбивает ``--clients`` по запятым вне квадратных скобок."""
+    return [c.strip() for c in re.split(r",(?![^\[]*\])", raw) if c.strip()]
+
+
+_REGISTRY: Dict[str, ClientSpec] = {}
+
+_REQUIRED = ("create_user", "get_user", "get_all_users", "update_user", "delete_user")
+
+# внешние модули с клиентами: BENCH_CLIENT_PLUGINS=my_pkg.pycurl_client,other
+PLUGINS_ENV = "BENCH_CLIENT_PLUGINS"
+
+
+def register_client(name: str):
+    """Декоратор класса клиента; sync/async определяется по протоколу."""
+
+    def decorator(cls):
+        is_async = hasattr(cls, "__aenter__")
+        required = _REQUIRED + (("__aexit__",) if is_async else ("close",))
+        missing = [attr for attr in required if not hasattr(cls, attr)]
+        if missing:
+            raise TypeError(f"{cls.__name__} does not implement {', '.join(sorted(missing))}")
+        if name in _REGISTRY and _REGISTRY[name].factory is not cls:
+            raise ValueError(f"Client {name!r} is already registered")
+        _REGISTRY[name] = ClientSpec(name=name, factory=cls, is_async=is_async)
+        return cls
+
+    return decorator
+
+
+def _import_plugin(module: str) -> None:
+    try:
+        importlib.import_module(module)
+    except ImportError as e:
+        # плагин с неустановленной библиотекой (pycurl, niquests...) просто пропускаем
+        logger.info("Client plugin %s skipped: %s", module, e)
+
+
+def discover_clients(extra_modules: Iterable[str] = ()) -> Dict[str, ClientSpec]:
+    """Импортирует модули ``clients/*_client.py`` и плагины из ``BENCH_CLIENT_PLUGINS``;
+    каждый регистрирует свои классы через ``@register_client``.
+    """
+    package = __name__.rpartition(".")[0]
+    for info in pkgutil.iter_modules([os.path.dirname(__file__)]):
+        if info.name.endswith("_client"):
+            _import_plugin(f"{package}.{info.name}")
+
+    env = os.environ.get(PLUGINS_ENV, "")
+    for module in [*extra_modules, *env.split(",")]:
+        if module.strip():
+            _import_plugin(module.strip())
+    return dict(_REGISTRY)
+
+
+def get_client(name: str) -> ClientSpec:
+    """Клиент по имени; ``httpx[http2=true;max_connections=50]`` — вариант
+    с параметрами конструктора.
+    """
+    base, options = parse_client_name(name)
+    try:
+        spec = _REGISTRY[base]
+    except KeyError:
+        raise ValueError(f"Unknown client: {base}")
+    return spec.with_options(options) if options else spec
+
+
+def expand_sweep(clients: Sequence[str], sweep: Dict[str, List[str]]) -> List[str]:
+    """Декартово произведение значений ``sweep`` для каждого клиента. Клиенту
+    достаются только параметры, которые есть у его конструктора.
+    """
+    names = []
+    for name in clients:
+        base, fixed = parse_client_name(name)
+        accepted = set(get_client(base).option_names())
+        keys = [k for k in sweep if k in accepted and k not in fixed]
+        for values in itertools.product(*(sweep[k] for k in keys)):
+            options = {**fixed, **dict(zip(keys, values))}
+            suffix = "[" + ";".join(f"{k}={v}" for k, v in options.items()) + "]" if options else ""
+            names.append(base + suffix)
+    return names
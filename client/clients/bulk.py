@@ -0,0 +1,221 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# сервер объявляет пакетный эндпоинт в ответе на OPTIONS коллекции:
+#   {"bulk": "/bulk", "max_items": 1000}
+# запрос:  POST {base_url}{bulk}  {"op": "create"|"update"|"delete", "items": [...]}
+# ответ:   {"results": [...]} — по одному результату на элемент, в том же порядке
+
+# (элементов в пачке, успешных, длительность в мс) — после каждого запроса
+OnBatch = Callable[[int, int, float], None]
+
+_UNKNOWN = object()
+
+
+def _chunks(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _bulk_item(op: str, item: Any) -> Any:
+    if op == "update":
+        user_id, data = item
+        return {"id": user_id, "data": data}
+    return item
+
+
+def _bulk_results(op: str, chunk: Sequence[Any], payload: Any) -> List[Any]:
+    results = payload.get("results") if isinstance(payload, dict) else None
+    if not isinstance(results, list) or len(results) != len(chunk):
+        # пачка не выполнена или ответ не сопоставить с элементами
+        results = [None] * len(chunk)
+    if op == "delete":
+        return [bool(r) for r in results]
+    return results
+
+
+def _ok(op: str, result: Any) -> bool:
+    return bool(result) if op == "delete" else result is not None
+
+
+class _BulkBase:
+    _bulk = _UNKNOWN  # (путь, max_items) или None; определяется при первом вызове
+
+    def _bulk_endpoint(self, capabilities: Any) -> Optional[Tuple[str, Optional[int]]]:
+        if not isinstance(capabilities, dict) or not capabilities.get("bulk"):
+            return None
+        return capabilities["bulk"], capabilities.get("max_items")
+
+    def _bulk_learned(self, capabilities: Any) -> Optional[Tuple[str, Optional[int]]]:
+        """Запоминает ответ на OPTIONS. Пустой ответ не запоминается: это может
+        быть сбой зонда, и без повторной проверки клиент навсегда остался бы
+        на одиночных запросах; цена — один OPTIONS на пакетный вызов, пока
+        сервер не ответит телом.
+        """
+        endpoint = self._bulk_endpoint(capabilities)
+        if capabilities is not None:
+            self._bulk = endpoint
+        return endpoint
+
+    def _bulk_units(
+        self, op: str, items: Sequence[Any], bulk_size: int, endpoint: Optional[Tuple[str, Optional[int]]]
+    ) -> Tuple[Optional[str], List[Sequence[Any]]]:
+        """Единицы работы: пачки для пакетного эндпоинта, иначе по одному элементу."""
+        if endpoint is None:
+            return None, [[item] for item in items]
+        path, max_items = endpoint
+        if max_items:
+            bulk_size = min(bulk_size, max_items)
+        return path, _chunks(items, max(1, bulk_size))
+
+    def _bulk_invalidate(self, op: str, unit: Sequence[Any]) -> None:
+        """Пачка прошла мимо одиночных методов: сбрасываем кэш чтений, как они."""
+        if op == "create":
+            self._invalidate("")
+            return
+        ids = [item[0] for item in unit] if op == "update" else list(unit)
+        self._invalidate(*(f"/{user_id}" for user_id in ids), "")
+
+
+class BulkUsers(_BulkBase):
+    """Пакетные операции для синхронных клиентов: пачки через пакетный
+    эндпоинт, если сервер его объявил, иначе одиночные запросы; в обоих
+    случаях до ``concurrency`` запросов одновременно в пуле потоков.
+    Результаты — по одному на элемент, в порядке входа, как у одиночных методов.
+    """
+
+    def _bulk_probe(self) -> Optional[Tuple[str, Optional[int]]]:
+        if self._bulk is not _UNKNOWN:
+            return self._bulk
+        return self._bulk_learned(self._request("OPTIONS", ""))
+
+    def _run_bulk(
+        self,
+        op: str,
+        items: Sequence[Any],
+        single: Callable[[Any], Any],
+        concurrency: int,
+        bulk_size: int,
+        on_batch: Optional[OnBatch],
+    ) -> List[Any]:
+        path, units = self._bulk_units(op, items, bulk_size, self._bulk_probe())
+
+        def run(unit: Sequence[Any]) -> List[Any]:
+            started = time.perf_counter()
+            if path is None:
+                results = [single(unit[0])]
+            else:
+                payload = self._request("POST", path, {"op": op, "items": [_bulk_item(op, i) for i in unit]})
+                self._bulk_invalidate(op, unit)
+                results = _bulk_results(op, unit, payload)
+            if on_batch is not None:
+                ok = sum(_ok(op, r) for r in results)
+                on_batch(len(unit), ok, (time.perf_counter() - started) * 1000)
+            return results
+
+        if concurrency <= 1 or len(units) <= 1:
+            batches = [run(unit) for unit in units]
+        else:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(units))) as pool:
+                batches = list(pool.map(run, units))  # map сохраняет порядок
+        return [r for batch in batches for r in batch]
+
+    def create_users(
+        self,
+        users: Sequence[Dict[str, Any]],
+        concurrency: int = 16,
+        bulk_size: int = 500,
+        on_batch: Optional[OnBatch] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        return self._run_bulk("create", users, self.create_user, concurrency, bulk_size, on_batch)
+
+    def update_users(
+        self,
+        updates: Sequence[Tuple[str, Dict[str, Any]]],
+        concurrency: int = 16,
+        bulk_size: int = 500,
+        on_batch: Optional[OnBatch] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        return self._run_bulk(
+            "update", updates, lambda item: self.update_user(*item), concurrency, bulk_size, on_batch
+        )
+
+    def delete_users(
+        self,
+        user_ids: Sequence[str],
+        concurrency: int = 16,
+        bulk_size: int = 500,
+        on_batch: Optional[OnBatch] = None,
+    ) -> List[bool]:
+        return self._run_bulk("delete", user_ids, self.delete_user, concurrency, bulk_size, on_batch)
+
+
+class AsyncBulkUsers(_BulkBase):
+    """То же для асинхронных клиентов: ``gather`` с семафором на ``concurrency``."""
+
+    async def _bulk_probe(self) -> Optional[Tuple[str, Optional[int]]]:
+        if self._bulk is not _UNKNOWN:
+            return self._bulk
+        return self._bulk_learned(await self._request("OPTIONS", ""))
+
+    async def _run_bulk(
+        self,
+        op: str,
+        items: Sequence[Any],
+        single: Callable[[Any], Awaitable[Any]],
+        concurrency: int,
+        bulk_size: int,
+        on_batch: Optional[OnBatch],
+    ) -> List[Any]:
+        path, units = self._bulk_units(op, items, bulk_size, await self._bulk_probe())
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(unit: Sequence[Any]) -> List[Any]:
+            async with semaphore:
+                started = time.perf_counter()
+                if path is None:
+                    results = [await single(unit[0])]
+                else:
+                    payload = await self._request(
+                        "POST", path, {"op": op, "items": [_bulk_item(op, i) for i in unit]}
+                    )
+                    self._bulk_invalidate(op, unit)
+                    results = _bulk_results(op, unit, payload)
+            if on_batch is not None:
+                ok = sum(_ok(op, r) for r in results)
+                on_batch(len(unit), ok, (time.perf_counter() - started) * 1000)
+            return results
+
+        batches = await asyncio.gather(*(run(unit) for unit in units))
+        return [r for batch in batches for r in batch]
+
+    async def create_users(
+        self,
+        users: Sequence[Dict[str, Any]],
+        concurrency: int = 16,
+        bulk_size: int = 500,
+        on_batch: Optional[OnBatch] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        return await self._run_bulk("create", users, self.create_user, concurrency, bulk_size, on_batch)
+
+    async def update_users(
+        self,
+        updates: Sequence[Tuple[str, Dict[str, Any]]],
+        concurrency: int = 16,
+        bulk_size: int = 500,
+        on_batch: Optional[OnBatch] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        return await self._run_bulk(
+            "update", updates, lambda item: self.update_user(*item), concurrency, bulk_size, on_batch
+        )
+
+    async def delete_users(
+        self,
+        user_ids: Sequence[str],
+        concurrency: int = 16,
+        bulk_size: int = 500,
+        on_batch: Optional[OnBatch] = None,
+    ) -> List[bool]:
+        return await self._run_bulk("delete", user_ids, self.delete_user, concurrency, bulk_size, on_batch)
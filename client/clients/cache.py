@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
+
+from opentelemetry import metrics
+
+
+_meter = metrics.get_meter("clients.cache")
+_hits_counter = _meter.create_counter(
+    name="http_client_cache_hits_total",
+    unit="1",
+    description="Reads served from the client cache (result=fresh|revalidated)",
+)
+_misses_counter = _meter.create_counter(
+    name="http_client_cache_misses_total",
+    unit="1",
+    description="Reads that had to fetch the full response",
+)
+
+
+@dataclass
+class Revalidation:
+    """Условный GET: валидаторы закэшированного ответа уходят в запросе,
+    новые приходят из ответа; ``not_modified`` — сервер ответил 304.
+    """
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+    def request_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def capture(self, headers: Mapping[str, str]) -> None:
+        """Валидаторы из заголовков ответа 200 (регистр имён не важен)."""
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ResponseCache:
+    """LRU на ``max_entries`` ответов; запись свежая ``ttl`` секунд, потом
+    перепроверяется условным запросом, если у неё есть ETag/Last-Modified.
+    Потокобезопасен. Значения отдаются как есть, без копирования — не меняйте их.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl: float = 30.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    def store(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _hit(self, result: str) -> None:
+        if result == "fresh":
+            self.hits += 1
+        else:
+            self.revalidated += 1
+        _hits_counter.add(1, attributes={"client.name": self.name, "result": result})
+
+    def _miss(self) -> None:
+        self.misses += 1
+        _misses_counter.add(1, attributes={"client.name": self.name})
+
+    def begin(self, key: str):
+        """Начало чтения: ``(значение, None)`` для свежей записи, иначе
+        ``(запись или None, Revalidation)`` — запрос нужно отправить.
+        """
+        entry = self.lookup(key)
+        if entry is not None and self.is_fresh(entry):
+            self._hit("fresh")
+            return entry.value, None
+        if entry is not None and entry.has_validators:
+            return entry, Revalidation(entry.etag, entry.last_modified)
+        return entry, Revalidation()
+
+    def finish(self, key: str, entry: Optional[CacheEntry], revalidation: Revalidation, value: Any) -> Any:
+        """Конец чтения: 304 продлевает запись, новый ответ её заменяет."""
+        if revalidation.not_modified and entry is not None:
+            self.store(key, CacheEntry(entry.value, entry.etag, entry.last_modified))
+            self._hit("revalidated")
+            return entry.value
+        self._miss()
+        if value is None:
+            # ошибка или пустой ответ: старая запись больше не подтверждена
+            self.invalidate(key)
+            return None
+        self.store(key, CacheEntry(value, revalidation.etag, revalidation.last_modified))
+        return value
+
+
+class CachedReads:
+    """``_get`` через ``self.cache`` (``None`` — без кэша) для синхронных клиентов.
+    Ключ — путь относительно ``base_url``; клиент даёт ``_request(...,
+    revalidation=...)``, который шлёт валидаторы и разбирает 304.
+    """
+
+    cache: Optional[ResponseCache] = None
+
+    def _get(self, path: str) -> Any:
+        if self.cache is None:
+            return self._request("GET", path)
+        cached, revalidation = self.cache.begin(path)
+        if revalidation is None:
+            return cached
+        value = self._request("GET", path, revalidation=revalidation)
+        return self.cache.finish(path, cached, revalidation, value)
+
+    def _invalidate(self, *paths: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(*paths)
+
+
+class AsyncCachedReads(CachedReads):
+    """То же для асинхронных клиентов."""
+
+    async def _get(self, path: str) -> Any:
+        if self.cache is None:
+            return await self._request("GET", path)
+        cached, revalidation = self.cache.begin(path)
+        if revalidation is None:
+            return cached
+        value = await self._request("GET", path, revalidation=revalidation)
+        return self.cache.finish(path, cached, revalidation, value)
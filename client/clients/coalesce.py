@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from opentelemetry import metrics
+
+from .cache import AsyncCachedReads, CachedReads
+
+
+_meter = metrics.get_meter("clients.coalesce")
+_coalesced_counter = _meter.create_counter(
+    name="http_client_coalesced_total",
+    unit="1",
+    description="Reads that joined an identical in-flight request instead of sending their own",
+)
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Flight:
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0  # запросов реально отправлено
+        self.shared = 0   # вызовов, получивших чужой результат
+
+    def _joined(self) -> None:
+        self.shared += 1
+        _coalesced_counter.add(1, attributes={"client.name": self.name})
+
+
+class SingleFlight(_Flight):
+    """Одновременные вызовы с одним ключом выполняют ``fn`` один раз: первый
+    (лидер) отправляет запрос, остальные ждут и получают тот же результат или
+    то же исключение. Потокобезопасен. Результат общий — не меняйте его.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+        if not leader:
+            self._joined()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # ключ освобождается до пробуждения ждущих: следующий вызов
+            # уже отправит новый запрос, а не получит этот ответ
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+
+class AsyncSingleFlight(_Flight):
+    """То же для asyncio: общий запрос выполняется отдельной задачей, так что
+    отмена одного из ждущих (даже лидера) не отменяет его для остальных.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._calls: Dict[str, "asyncio.Task"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self._joined()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: "asyncio.Task") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # если все ждущие отменены, исключение никто не заберёт
+        if not task.cancelled():
+            task.exception()
+
+
+class CoalescedReads(CachedReads):
+    """``_get`` через ``self.flight`` (``None`` — без объединения) поверх кэша:
+    одновременные чтения одного пути отправляют один запрос.
+    """
+
+    flight: Optional[SingleFlight] = None
+
+    def _get(self, path: str) -> Any:
+        if self.flight is None:
+            return super()._get(path)
+        fetch = super()._get
+        return self.flight.do(path, lambda: fetch(path))
+
+
+class AsyncCoalescedReads(AsyncCachedReads):
+    """То же для асинхронных клиентов."""
+
+    flight: Optional[AsyncSingleFlight] = None
+
+    async def _get(self, path: str) -> Any:
+        if self.flight is None:
+            return await super()._get(path)
+        fetch = super()._get
+        return await self.flight.do(path, lambda: fetch(path))
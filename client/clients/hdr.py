@@ -0,0 +1,290 @@
+import base64
+import json
+import math
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9, 99.99)
+
+
+class LatencyHistogram:
+    """Лог-линейная гистограмма задержек в духе HdrHistogram.
+
+    Память фиксирована и зависит только от диапазона и точности:
+    ``significant_digits=2`` даёт относительную ошибку не больше 1 %
+    при ~20 КБ счётчиков на гистограмму, 3 — 0,1 % и ~140 КБ, а 5 — уже
+    ~10,5 МБ (диапазон по умолчанию, до 60 с).
+    Значения записываются в миллисекундах, внутри хранятся целые
+    микросекунды. Гистограммы с одинаковыми параметрами складываются
+    через ``merge``, поэтому каждый воркер пишет в свою.
+    """
+
+    UNITS_PER_MS = 1000  # храним микросекунды
+
+    def __init__(
+        self,
+        lowest_us: int = 1,
+        highest_us: int = 60_000_000,
+        significant_digits: int = 2,
+    ):
+        if lowest_us < 1 or highest_us < 2 * lowest_us:
+            raise ValueError("highest_us must be >= 2 * lowest_us >= 2")
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be in 1..5")
+
+        self.lowest_us = lowest_us
+        self.highest_us = highest_us
+        self.significant_digits = significant_digits
+
+        self._unit_magnitude = int(math.floor(math.log2(lowest_us)))
+        sub_bucket_count_magnitude = int(math.ceil(math.log2(2 * 10**significant_digits)))
+        self._sub_half_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self._sub_count = 1 << (self._sub_half_magnitude + 1)
+        self._sub_half = self._sub_count // 2
+        self._sub_mask = (self._sub_count - 1) << self._unit_magnitude
+
+        smallest_untrackable = self._sub_count << self._unit_magnitude
+        buckets = 1
+        while smallest_untrackable <= highest_us:
+            smallest_untrackable <<= 1
+            buckets += 1
+        self._bucket_count = buckets
+
+        self._counts = array("q", bytes(8 * (buckets + 1) * self._sub_half))
+        self.total_count = 0
+        self.overflow = 0  # значения выше highest_us, записаны как highest_us
+        self._min = sys.maxsize
+        self._max = 0
+        self._sum = 0
+
+    # --- индексация -----------------------------------------------------
+
+    def _index(self, value: int) -> int:
+        bucket = (value | self._sub_mask).bit_length() - self._unit_magnitude - (
+            self._sub_half_magnitude + 1
+        )
+        sub = value >> (bucket + self._unit_magnitude)
+        return ((bucket + 1) << self._sub_half_magnitude) + (sub - self._sub_half)
+
+    def _value_range(self, index: int) -> Tuple[int, int]:
+        bucket = (index >> self._sub_half_magnitude) - 1
+        sub = (index & (self._sub_half - 1)) + self._sub_half
+        if bucket < 0:
+            sub -= self._sub_half
+            bucket = 0
+        low = sub << (bucket + self._unit_magnitude)
+        size = 1 << (bucket + self._unit_magnitude)
+        return low, low + size - 1
+
+    # --- запись ---------------------------------------------------------
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        value = int(value_ms * self.UNITS_PER_MS)
+        if value < 0:
+            value = 0
+        if value > self.highest_us:
+            self.overflow += count
+            value = self.highest_us
+        self._counts[self._index(value)] += count
+        self.total_count += count
+        self._sum += value * count
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if self._config() != other._config():
+            raise ValueError("Cannot merge histograms with different parameters")
+        counts = self._counts
+        for i, c in enumerate(other._counts):
+            if c:
+                counts[i] += c
+        self.total_count += other.total_count
+        self.overflow += other.overflow
+        self._sum += other._sum
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        return self
+
+    @classmethod
+    def merged(cls, hists: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        hists = list(hists)
+        result = cls(**hists[0]._config()) if hists else cls()
+        for h in hists:
+            result.merge(h)
+        return result
+
+    # --- статистика -----------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    @property
+    def min(self) -> float:
+        return self._min / self.UNITS_PER_MS if self.total_count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max / self.UNITS_PER_MS
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.total_count / self.UNITS_PER_MS if self.total_count else 0.0
+
+    def value_at_percentile(self, percentile: float) -> float:
+        return self.percentiles((percentile,))[percentile]
+
+    def percentiles(self, qs: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+        """Все квантили за один проход по счётчикам: цели по возрастанию."""
+        qs = list(qs)
+        if not self.total_count:
+            return {q: 0.0 for q in qs}
+        targets = sorted((max(1, int(q / 100 * self.total_count + 0.5)), q) for q in qs)
+        result: Dict[float, float] = {}
+        pending = iter(targets)
+        target, q = next(pending)
+        seen = 0
+        for i, c in enumerate(self._counts):
+            if not c:
+                continue
+            seen += c
+            if seen < target:
+                continue
+            # верхняя граница бакета, но не больше реального максимума
+            value = min(self._value_range(i)[1], self._max) / self.UNITS_PER_MS
+            while seen >= target:
+                result[q] = value
+                nxt = next(pending, None)
+                if nxt is None:
+                    return {q: result[q] for q in qs}
+                target, q = nxt
+        for _, q in [(target, q), *pending]:
+            result[q] = self.max
+        return {q: result[q] for q in qs}
+
+    def cdf(self) -> List[Tuple[float, float]]:
+        """Пары (верхняя граница бакета, мс; доля значений <= неё)."""
+        points = []
+        seen = 0
+        for i, c in enumerate(self._counts):
+            if c:
+                seen += c
+                high = min(self._value_range(i)[1], self._max)
+                points.append((high / self.UNITS_PER_MS, seen / self.total_count))
+        return points
+
+    def recorded(self) -> Iterator[Tuple[float, int]]:
+        """Непустые бакеты по возрастанию: (верхняя граница, мс; число значений)."""
+        for i, c in enumerate(self._counts):
+            if c:
+                yield min(self._value_range(i)[1], self._max) / self.UNITS_PER_MS, c
+
+    # --- сериализация ---------------------------------------------------
+
+    def _config(self) -> Dict[str, int]:
+        return {
+            "lowest_us": self.lowest_us,
+            "highest_us": self.highest_us,
+            "significant_digits": self.significant_digits,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self._config(),
+            "total_count": self.total_count,
+            "overflow": self.overflow,
+            "min_us": self._min if self.total_count else 0,
+            "max_us": self._max,
+            "sum_us": self._sum,
+            # массив счётчиков почти весь из нулей и хорошо жмётся
+            "counts": base64.b64encode(zlib.compress(self._counts.tobytes())).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(
+            lowest_us=data["lowest_us"],
+            highest_us=data["highest_us"],
+            significant_digits=data["significant_digits"],
+        )
+        counts = array("q")
+        counts.frombytes(zlib.decompress(base64.b64decode(data["counts"])))
+        if len(counts) != len(hist._counts):
+            raise ValueError("Histogram counts do not match its parameters")
+        hist._counts = counts
+        hist.total_count = data["total_count"]
+        hist.overflow = data.get("overflow", 0)
+        hist._min = data["min_us"] if hist.total_count else sys.maxsize
+        hist._max = data["max_us"]
+        hist._sum = data["sum_us"]
+        return hist
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "LatencyHistogram":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def mann_whitney(a: LatencyHistogram, b: LatencyHistogram) -> Tuple[float, float]:
+    """U-тест Манна — Уитни по двум гистограммам: ``(p-value, P(a > b))``.
+
+    Значения одного бакета считаются равными (связанные ранги), p — двусторонний
+    по нормальному приближению с поправкой на связки; при тысячах значений
+    оно точное. Вторая величина — вероятность, что случайное значение из ``a``
+    больше значения из ``b``: 0.5 — распределения не сдвинуты.
+    """
+    n1, n2 = a.total_count, b.total_count
+    if not n1 or not n2:
+        return math.nan, math.nan
+    merged: Dict[float, List[int]] = {}
+    for value, c in a.recorded():
+        merged.setdefault(value, [0, 0])[0] += c
+    for value, c in b.recorded():
+        merged.setdefault(value, [0, 0])[1] += c
+    rank_sum, seen, ties = 0.0, 0, 0
+    for value in sorted(merged):
+        ca, cb = merged[value]
+        t = ca + cb
+        rank_sum += ca * (seen + (t + 1) / 2)
+        seen += t
+        ties += t**3 - t
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0, 0.5
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2)), u / (n1 * n2)
+
+
+def format_table(hists: Dict[str, LatencyHistogram], qs: Iterable[float] = DEFAULT_PERCENTILES) -> str:
+    qs = list(qs)
+    names = list(hists)
+    width = max([10] + [len(n) for n in names])
+    lines = ["".ljust(8) + "".join(n.rjust(width + 2) for n in names)]
+    rows: List[Tuple[str, Optional[float]]] = [("count", None), ("mean", None)]
+    rows += [(f"p{q:g}", q) for q in qs] + [("max", None)]
+    quantiles = {n: hists[n].percentiles(qs) for n in names}
+    for label, q in rows:
+        cells = []
+        for n in names:
+            h = hists[n]
+            if label == "count":
+                cells.append(f"{h.total_count:d}")
+            elif label == "mean":
+                cells.append(f"{h.mean:.2f}")
+            elif label == "max":
+                cells.append(f"{h.max:.2f}")
+            else:
+                cells.append(f"{quantiles[n][q]:.2f}")
+        lines.append(label.ljust(8) + "".join(c.rjust(width + 2) for c in cells))
+    return "\n".join(lines)
+
@@ -1,20 +1,99 @@
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, AsyncIterator, List
 
 import httpx
 
+from .base import register_client
+from .bulk import AsyncBulkUsers
+from .cache import ResponseCache, Revalidation
+from .coalesce import AsyncCoalescedReads, AsyncSingleFlight
+from .paging import CHUNK_SIZE, AsyncPagedUsers, PaginationError
+from .phases import record_phase
+from .retry import AsyncResilience, TransientError
+from .serializers import DecodeError, get_serializer
+
 
 AUTH_HEADERS = {
     "Authorization": "Bearer test-token",
 }
 
 
-class HttpxUserClient:
-    def __init__(self, base_url: str = "http://localhost:3100/users"):
+def _not_connected(error: httpx.RequestError) -> bool:
+    """Соединение не установлено — запрос точно не ушёл на сервер."""
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def _phase_trace(started: float):
+    """Колбэк расширения ``trace`` httpcore: события соединения и ответа."""
+    marks: Dict[str, float] = {}
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        if event_name == "connection.connect_tcp.started":
+            marks["connect"] = now
+        elif event_name == "connection.connect_tcp.complete":
+            record_phase("connect", (now - marks.pop("connect", now)) * 1000)
+        elif event_name.endswith(".receive_response_headers.complete"):
+            marks["headers"] = now
+            record_phase("ttfb", (now - started) * 1000)
+        elif event_name.endswith(".receive_response_body.complete"):
+            record_phase("body", (now - marks.get("headers", now)) * 1000)
+
+    return trace
+
+
+@register_client("httpx")
+class HttpxUserClient(AsyncPagedUsers, AsyncBulkUsers, AsyncCoalescedReads):
+    """Параметры пула соответствуют ``httpx.Limits``. ``http2=True`` требует
+    пакет ``h2``; по http:// HTTP/2 включается только вместе с ``http1=False``
+    (prior knowledge), иначе httpx договаривается о протоколе через TLS ALPN.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3100/users",
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        http1: bool = True,
+        serializer: str = "json",
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+        cache: bool = False,
+        cache_size: int = 1024,
+        cache_ttl: float = 30.0,
+        coalesce: bool = False,
+    ):
         self.base_url = base_url.rstrip("/")
+        self.serializer = get_serializer(serializer)
+        self.resilience = AsyncResilience.from_options(
+            "httpx", retries, backoff, retry_budget, hedge, hedge_delay_ms
+        )
+        self.cache = ResponseCache("httpx", cache_size, cache_ttl) if cache else None
+        self.flight = AsyncSingleFlight("httpx") if coalesce else None
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.http1 = http1
         self._client: Optional[httpx.AsyncClient] = None
 
+    def _make_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=5.0,
+            limits=self.limits,
+            http2=self.http2,
+            http1=self.http1,
+        )
+
     async def __aenter__(self) -> "HttpxUserClient":
-        self._client = httpx.AsyncClient(timeout=5.0)
+        self._client = self._make_client()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -24,7 +103,7 @@ class HttpxUserClient:
 
     async def _ensure_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=5.0)
+            self._client = self._make_client()
         return self._client
 
     async def _request(
@@ -32,48 +111,91 @@ class HttpxUserClient:
         method: str,
         path: str = "",
         json_body: Optional[Dict[str, Any]] = None,
+        revalidation: Optional[Revalidation] = None,
     ) -> Optional[Any]:
         client = await self._ensure_client()
         url = f"{self.base_url}{path}"
         headers = dict(AUTH_HEADERS)
+        if revalidation is not None:
+            headers.update(revalidation.request_headers())
+        body = None
         if json_body is not None:
+            body = self.serializer.dumps(json_body)
             headers["Content-Type"] = "application/json"
 
+        return await self.resilience.call(
+            method, url, lambda: self._attempt(client, method, url, body, headers, revalidation)
+        )
+
+    async def _attempt(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        revalidation: Optional[Revalidation] = None,
+    ) -> Optional[Any]:
         try:
             resp = await client.request(
                 method=method,
                 url=url,
-                json=json_body,
+                content=body,
                 headers=headers,
+                extensions={"trace": _phase_trace(time.perf_counter())},
             )
-            if resp.status_code in (200, 201):
-                if resp.text:
-                    return resp.json()
+        except httpx.RequestError as e:
+            raise TransientError(f"error: {e!r}", sent=not _not_connected(e)) from e
+        if resp.status_code == 304 and revalidation is not None:
+            revalidation.not_modified = True
+            return None
+        if resp.status_code in (200, 201):
+            if revalidation is not None:
+                revalidation.capture(resp.headers)
+            if not resp.content:
                 return None
-            if resp.status_code == 204:
+            try:
+                return self.serializer.loads(resp.content)
+            except DecodeError as e:
+                print(f"[httpx] JSON decode error on {method} {url}: {e}")
                 return None
-            print(f"[httpx] HTTP {resp.status_code} on {method} {url}: {resp.text[:200]}")
-            return None
-        except httpx.RequestError as e:
-            print(f"[httpx] error on {method} {url}: {e}")
+        if resp.status_code == 204:
             return None
+        if self.resilience.retryable_status(resp.status_code):
+            raise TransientError(f"HTTP {resp.status_code}", status=resp.status_code)
+        print(f"[httpx] HTTP {resp.status_code} on {method} {url}: {resp.text[:200]}")
+        return None
+
+    async def _stream(self, path: str = "") -> AsyncIterator[bytes]:
+        client = await self._ensure_client()
+        url = f"{self.base_url}{path}"
+        async with client.stream("GET", url, headers=AUTH_HEADERS) as resp:
+            if resp.status_code != 200:
+                raise PaginationError(f"HTTP {resp.status_code} on GET {url}")
+            async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                yield chunk
 
     async def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return await self._request("POST", "", user_data)
+        created = await self._request("POST", "", user_data)
+        self._invalidate("")
+        return created
 
     async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        return await self._request("GET", f"/{user_id}")
+        return await self._get(f"/{user_id}")
 
     async def get_all_users(self) -> Optional[List[Dict[str, Any]]]:
-        result = await self._request("GET", "")
+        result = await self._get("")
         if isinstance(result, list):
             return result
         return None
 
     async def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return await self._request("PUT", f"/{user_id}", user_data)
+        updated = await self._request("PUT", f"/{user_id}", user_data)
+        self._invalidate(f"/{user_id}", "")
+        return updated
 
     async def delete_user(self, user_id: str) -> bool:
         _ = await self._request("DELETE", f"/{user_id}")
+        self._invalidate(f"/{user_id}", "")
         return True
 
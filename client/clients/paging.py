@@ -0,0 +1,306 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlencode
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class PaginationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    """Как обходить коллекцию постранично.
+
+    ``offset``: ``?limit=N&offset=M``, конец — страница короче ``page_size``.
+    ``cursor``: ``?limit=N&cursor=C``, ответ ``{"items": [...], "next_cursor": C}``,
+    конец — пустой курсор. Ответ-массив в cursor-режиме считается последней
+    страницей.
+    """
+
+    mode: str = "offset"
+    page_size: int = 100
+    limit_param: str = "limit"
+    offset_param: str = "offset"
+    cursor_param: str = "cursor"
+    items_key: str = "items"
+    next_key: str = "next_cursor"
+
+    def __post_init__(self):
+        if self.mode not in ("offset", "cursor"):
+            raise ValueError(f"Unknown pagination mode: {self.mode!r}")
+        if self.page_size < 1:
+            raise ValueError("page_size must be >= 1")
+
+    def first(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {self.limit_param: self.page_size}
+        if self.mode == "offset":
+            params[self.offset_param] = 0
+        return params
+
+    def query(self, params: Dict[str, Any]) -> str:
+        return "?" + urlencode(params)
+
+    def parse(self, params: Dict[str, Any], payload: Any) -> Tuple[List[Any], Optional[Dict[str, Any]]]:
+        """Элементы страницы и параметры следующей (``None`` — страниц больше нет)."""
+        if payload is None:
+            raise PaginationError(f"Failed to fetch page {params}")
+        if isinstance(payload, dict):
+            items = payload.get(self.items_key) or []
+            cursor = payload.get(self.next_key)
+        elif isinstance(payload, list):
+            items, cursor = payload, None
+        else:
+            raise PaginationError(f"Unexpected page payload: {type(payload).__name__}")
+
+        if self.mode == "cursor":
+            if not cursor:
+                return items, None
+            return items, {self.limit_param: self.page_size, self.cursor_param: cursor}
+        if len(items) < self.page_size:
+            return items, None
+        offset = params[self.offset_param] + len(items)
+        return items, {self.limit_param: self.page_size, self.offset_param: offset}
+
+
+def iter_pages(fetch: Callable[[str], Any], spec: PageSpec, prefetch: bool = True) -> Iterator[Any]:
+    """Элементы коллекции по страницам. ``fetch(query)`` возвращает
+    разобранную страницу. С ``prefetch`` следующая страница грузится в фоновом
+    потоке, пока вызывающий обрабатывает текущую: в памяти не больше двух страниц.
+    """
+    params: Optional[Dict[str, Any]] = spec.first()
+    if not prefetch:
+        while params is not None:
+            items, params = spec.parse(params, fetch(spec.query(params)))
+            yield from items
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(fetch, spec.query(params))
+        while params is not None:
+            items, next_params = spec.parse(params, future.result())
+            if next_params is not None:
+                future = pool.submit(fetch, spec.query(next_params))
+            params = next_params
+            yield from items
+            del items
+
+
+async def aiter_pages(
+    fetch: Callable[[str], Awaitable[Any]], spec: PageSpec, prefetch: bool = True
+) -> AsyncIterator[Any]:
+    """То же для асинхронных клиентов; prefetch — отдельной задачей."""
+    params: Optional[Dict[str, Any]] = spec.first()
+    task = asyncio.ensure_future(fetch(spec.query(params))) if prefetch else None
+    try:
+        while params is not None:
+            payload = await task if prefetch else await fetch(spec.query(params))
+            items, next_params = spec.parse(params, payload)
+            if prefetch and next_params is not None:
+                task = asyncio.ensure_future(fetch(spec.query(next_params)))
+            params = next_params
+            for item in items:
+                yield item
+            del items
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
+
+
+_WHITESPACE = b" \t\r\n"
+# вне строки интересны только кавычки и скобки, внутри — кавычка и экранирование
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_STRING_END = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[ \t\r\n]*[,\]]")
+
+
+class JsonArrayStream:
+    """Инкрементальный разбор JSON-массива верхнего уровня: ``feed`` принимает
+    очередной кусок тела и возвращает целиком пришедшие элементы, каждый
+    декодируется отдельно через ``loads``. В буфере держится только
+    незаконченный элемент.
+
+    Конец элемента ищется за один проход: сканер помнит глубину вложенности,
+    находится ли он внутри строки и позицию, до которой дошёл, поэтому каждый
+    байт смотрится один раз (регулярки перепрыгивают к следующей кавычке или
+    скобке), а ``loads`` вызывается один раз на элемент.
+    """
+
+    def __init__(self, loads: Callable[[bytes], Any]):
+        self._loads = loads
+        self._buf = bytearray()
+        self._started = False
+        # состояние сканера текущего элемента; _scan is None — элемент не начат
+        self._scan: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self.done = False
+
+    def _skip_ws(self, i: int) -> int:
+        buf = self._buf
+        while i < len(buf) and buf[i] in _WHITESPACE:
+            i += 1
+        return i
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        if self.done:
+            return []
+        buf = self._buf
+        buf += chunk
+        items = []
+        i = 0
+        while True:
+            i = self._skip_ws(i)
+            if i >= len(buf):
+                break
+            if not self._started:
+                if buf[i] != 0x5B:
+                    raise ValueError("JSON stream is not an array")
+                self._started = True
+                i += 1
+                continue
+            c = buf[i]
+            if self._scan is None:
+                if c == 0x5D:  # ] — конец массива
+                    self.done = True
+                    i += 1
+                    break
+                if c == 0x2C:  # , между элементами
+                    i += 1
+                    continue
+            end = self._element_end(i)
+            if end is None:
+                break
+            items.append(self._loads(bytes(buf[i:end])))
+            i = end
+
+        del buf[:i]
+        if self._scan is not None:
+            self._scan -= i
+        return items
+
+    def _element_end(self, start: int) -> Optional[int]:
+        """Конец элемента, начатого на ``start``, или None, если он ещё не пришёл."""
+        buf = self._buf
+        if self._scan is None:
+            self._scan, self._depth, self._in_string = start, 0, False
+        pos = self._scan
+        if buf[start] not in b'{["':
+            m = _SCALAR_END.search(buf, pos)
+            if m is None:
+                self._scan = len(buf)
+                return None
+            self._scan = None
+            return m.start()
+
+        depth, in_string = self._depth, self._in_string
+        end = None
+        while end is None:
+            if in_string:
+                m = _STRING_END.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                if buf[m.start()] == 0x5C:  # \ — пропускаем экранированный символ
+                    if m.end() >= len(buf):
+                        pos = m.start()  # экранируемый символ в следующем куске
+                        break
+                    pos = m.end() + 1
+                    continue
+                in_string = False
+                pos = m.end()
+                if not depth:
+                    end = pos
+            else:
+                m = _STRUCTURAL.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                c = buf[m.start()]
+                pos = m.end()
+                if c == 0x22:  # "
+                    in_string = True
+                elif c in b"[{":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if not depth:
+                        end = pos
+
+        if end is None:
+            self._scan, self._depth, self._in_string = pos, depth, in_string
+            return None
+        self._scan = None
+        return end
+
+    def close(self) -> None:
+        if not self.done:
+            raise ValueError("Truncated JSON array")
+
+
+def iter_json_array(chunks: Iterable[bytes], loads: Callable[[bytes], Any]) -> Iterator[Any]:
+    stream = JsonArrayStream(loads)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    stream.close()
+
+
+async def aiter_json_array(
+    chunks: AsyncIterable[bytes], loads: Callable[[bytes], Any]
+) -> AsyncIterator[Any]:
+    stream = JsonArrayStream(loads)
+    async for chunk in chunks:
+        for item in stream.feed(chunk):
+            yield item
+    stream.close()
+
+
+class PagedUsers:
+    """``iter_users`` для синхронных клиентов. Клиент даёт ``_request``
+    (разобранный ответ или ``None``), ``_stream`` (куски тела) и ``serializer``.
+    """
+
+    def iter_users(
+        self,
+        page_size: Optional[int] = 100,
+        mode: str = "offset",
+        prefetch: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """Пользователи по одному, память не зависит от размера коллекции.
+        ``page_size=None`` — без пагинации: весь ``/users`` одним ответом,
+        разбираемым по мере чтения.
+        """
+        if page_size is None:
+            return iter_json_array(self._stream(""), self.serializer.loads)
+        return iter_pages(lambda query: self._request("GET", query), PageSpec(mode, page_size), prefetch)
+
+
+class AsyncPagedUsers:
+    """То же для асинхронных клиентов."""
+
+    def iter_users(
+        self,
+        page_size: Optional[int] = 100,
+        mode: str = "offset",
+        prefetch: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if page_size is None:
+            return aiter_json_array(self._stream(""), self.serializer.loads)
+        return aiter_pages(lambda query: self._request("GET", query), PageSpec(mode, page_size), prefetch)
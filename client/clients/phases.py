@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+# фазы одного HTTP-запроса; клиенты сообщают те, что умеют измерить:
+#   connect — установка нового TCP-соединения (httpx, aiohttp);
+#   ttfb    — от отправки запроса до заголовков ответа, включая connect;
+#   body    — чтение и разбор тела ответа.
+PHASES = ("connect", "ttfb", "body")
+
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("http_phases", default=None)
+
+
+def record_phase(phase: str, duration_ms: float) -> None:
+    """Вызывается из ``_request`` клиента. Вне ``collect_phases``
+    ничего не делает, поэтому клиенты можно использовать и без обёртки.
+    """
+    phases = _phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + duration_ms
+
+
+@contextmanager
+def collect_phases() -> Iterator[Dict[str, float]]:
+    """Собирает фазы запросов, сделанных внутри блока, в отдельный словарь."""
+    phases: Dict[str, float] = {}
+    token = _phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _phases.reset(token)
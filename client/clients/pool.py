@@ -0,0 +1,147 @@
+import http.client
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from .phases import record_phase
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+@dataclass
+class Lease:
+    conn: http.client.HTTPConnection
+    reused: bool
+    keep: bool = True  # False — не возвращать в пул (сервер закрыл соединение)
+
+
+class ConnectionPool:
+    """Keep-alive соединения ``http.client`` к одному хосту.
+
+    Не больше ``max_size`` соединений одновременно; свободные дольше
+    ``idle_timeout`` секунд закрываются при следующей выдаче. Выдача
+    потокобезопасна: при исчерпании пула поток ждёт возврата соединения
+    не дольше ``checkout_timeout``.
+    """
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: Optional[int],
+        max_size: int = 10,
+        idle_timeout: float = 30.0,
+        timeout: float = 5.0,
+        checkout_timeout: float = 5.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self._cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle: Deque[Tuple[http.client.HTTPConnection, float]] = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+
+    def _evict_idle(self, now: float) -> None:
+        # самые старые свободные соединения — в начале очереди
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            conn.close()
+            self._open -= 1
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._cond:
+            while True:
+                self._evict_idle(time.monotonic())
+                if self._idle:
+                    conn, _ = self._idle.pop()  # LIFO: самое «тёплое» соединение
+                    return conn, True
+                if self._open < self.max_size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise PoolTimeout(f"No free connection to {self.host} in {self.checkout_timeout}s")
+
+        conn = self._cls(self.host, self.port, timeout=self.timeout)
+        try:
+            started = time.perf_counter()
+            conn.connect()
+            record_phase("connect", (time.perf_counter() - started) * 1000)
+        except Exception:
+            self._discard(conn)
+            raise
+        return conn, False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn: http.client.HTTPConnection) -> None:
+        conn.close()
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Lease]:
+        """Выдаёт соединение на время блока. Если блок упал или сбросил
+        ``lease.keep``, соединение закрывается, а не возвращается в пул.
+        """
+        conn, reused = self._acquire()
+        lease = Lease(conn, reused)
+        try:
+            yield lease
+        except BaseException:
+            self._discard(conn)
+            raise
+        if lease.keep:
+            self._release(conn)
+        else:
+            self._discard(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                conn.close()
+                self._open -= 1
+
+    @property
+    def size(self) -> int:
+        return self._open
+
+
+class PoolManager:
+    """Пул на каждый (scheme, host, port)."""
+
+    def __init__(self, **pool_kwargs):
+        self._pool_kwargs = pool_kwargs
+        self._pools: Dict[Tuple[str, str, Optional[int]], ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, scheme: str, host: str, port: Optional[int]) -> ConnectionPool:
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = ConnectionPool(scheme, host, port, **self._pool_kwargs)
+            return pool
+
+    def close(self) -> None:
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
@@ -1,7 +1,18 @@
 import json
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, Iterator, List
 
 import requests
+from urllib3.exceptions import NewConnectionError
+
+from .base import register_client
+from .bulk import BulkUsers
+from .cache import ResponseCache, Revalidation
+from .coalesce import CoalescedReads, SingleFlight
+from .paging import CHUNK_SIZE, PagedUsers, PaginationError
+from .phases import record_phase
+from .retry import Resilience, TransientError
+from .serializers import DecodeError, get_serializer
 
 
 AUTH_HEADERS = {
@@ -9,9 +20,38 @@ AUTH_HEADERS = {
 }
 
 
-class RequestsUserClient:
-    def __init__(self, base_url: str = "http://localhost:3100/users"):
+def _not_connected(error: requests.RequestException) -> bool:
+    """Соединение не установлено — запрос точно не ушёл на сервер."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    # ConnectionError(MaxRetryError(reason=NewConnectionError)) из urllib3
+    cause = error.args[0] if error.args else None
+    return isinstance(getattr(cause, "reason", cause), NewConnectionError)
+
+
+@register_client("requests")
+class RequestsUserClient(PagedUsers, BulkUsers, CoalescedReads):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3100/users",
+        serializer: str = "json",
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+        cache: bool = False,
+        cache_size: int = 1024,
+        cache_ttl: float = 30.0,
+        coalesce: bool = False,
+    ):
         self.base_url = base_url.rstrip("/")
+        self.serializer = get_serializer(serializer)
+        self.resilience = Resilience.from_options(
+            "requests", retries, backoff, retry_budget, hedge, hedge_delay_ms
+        )
+        self.cache = ResponseCache("requests", cache_size, cache_ttl) if cache else None
+        self.flight = SingleFlight("requests") if coalesce else None
         self.session = requests.Session()
 
     def _request(
@@ -19,51 +59,94 @@ class RequestsUserClient:
         method: str,
         path: str = "",
         json_body: Optional[Dict[str, Any]] = None,
+        revalidation: Optional[Revalidation] = None,
     ) -> Optional[Any]:
         url = f"{self.base_url}{path}"
         headers = dict(AUTH_HEADERS)
+        if revalidation is not None:
+            headers.update(revalidation.request_headers())
+        body = None
         if json_body is not None:
+            body = self.serializer.dumps(json_body)
             headers["Content-Type"] = "application/json"
 
+        return self.resilience.call(method, url, lambda: self._attempt(method, url, body, headers, revalidation))
+
+    def _attempt(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        revalidation: Optional[Revalidation] = None,
+    ) -> Optional[Any]:
         try:
+            started = time.perf_counter()
             resp = self.session.request(
                 method=method,
                 url=url,
-                json=json_body,
+                data=body,
                 headers=headers,
                 timeout=5,
             )
-            if resp.status_code in (200, 201):
-                if resp.text:
-                    return resp.json()
+        except requests.RequestException as e:
+            raise TransientError(f"error: {e}", sent=not _not_connected(e)) from e
+        # elapsed — от отправки до разбора заголовков; тело уже прочитано
+        ttfb_ms = resp.elapsed.total_seconds() * 1000
+        record_phase("ttfb", ttfb_ms)
+        record_phase("body", max(0.0, (time.perf_counter() - started) * 1000 - ttfb_ms))
+        if resp.status_code == 304 and revalidation is not None:
+            revalidation.not_modified = True
+            return None
+        if resp.status_code in (200, 201):
+            if revalidation is not None:
+                revalidation.capture(resp.headers)
+            if not resp.content:
                 return None
-            if resp.status_code == 204:
+            try:
+                return self.serializer.loads(resp.content)
+            except DecodeError as e:
+                print(f"[requests] JSON decode error on {method} {url}: {e}")
                 return None
-            print(f"[requests] HTTP {resp.status_code} on {method} {url}: {resp.text[:200]}")
-            return None
-        except requests.RequestException as e:
-            print(f"[requests] error on {method} {url}: {e}")
+        if resp.status_code == 204:
             return None
+        if self.resilience.retryable_status(resp.status_code):
+            raise TransientError(f"HTTP {resp.status_code}", status=resp.status_code)
+        print(f"[requests] HTTP {resp.status_code} on {method} {url}: {resp.text[:200]}")
+        return None
+
+    def _stream(self, path: str = "") -> Iterator[bytes]:
+        url = f"{self.base_url}{path}"
+        with self.session.get(url, headers=AUTH_HEADERS, stream=True, timeout=5) as resp:
+            if resp.status_code != 200:
+                raise PaginationError(f"HTTP {resp.status_code} on GET {url}")
+            yield from resp.iter_content(CHUNK_SIZE)
 
     def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return self._request("POST", "", user_data)
+        created = self._request("POST", "", user_data)
+        self._invalidate("")
+        return created
 
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        return self._request("GET", f"/{user_id}")
+        return self._get(f"/{user_id}")
 
     def get_all_users(self) -> Optional[List[Dict[str, Any]]]:
-        result = self._request("GET", "")
+        result = self._get("")
         if isinstance(result, list):
             return result
         return None
 
     def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return self._request("PUT", f"/{user_id}", user_data)
+        updated = self._request("PUT", f"/{user_id}", user_data)
+        self._invalidate(f"/{user_id}", "")
+        return updated
 
     def delete_user(self, user_id: str) -> bool:
         _ = self._request("DELETE", f"/{user_id}")
+        self._invalidate(f"/{user_id}", "")
         return True
 
     def close(self) -> None:
+        self.resilience.close()
         self.session.close()
 
@@ -0,0 +1,361 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from opentelemetry import metrics, trace
+
+from .hdr import LatencyHistogram
+from .phases import collect_phases, record_phase
+
+
+# повтор безопасен, даже если сервер успел выполнить запрос
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# инструменты создаются через глобальный прокси и начинают писать,
+# когда configure_opentelemetry установит MeterProvider
+_meter = metrics.get_meter("clients.retry")
+_retries_counter = _meter.create_counter(
+    name="http_client_retries_total",
+    unit="1",
+    description="Retried HTTP requests per client, method and reason",
+)
+_hedges_counter = _meter.create_counter(
+    name="http_client_hedges_total",
+    unit="1",
+    description="Hedged GET requests per client and winner",
+)
+
+
+def _keep_phases(phases: Dict[str, float]) -> None:
+    """Переносит фазы выигравшей попытки в контекст вызывающего."""
+    for phase, duration_ms in phases.items():
+        record_phase(phase, duration_ms)
+
+
+class TransientError(Exception):
+    """Неудачная попытка, которую можно повторить: сбой соединения или
+    статус из ``RetryPolicy.retry_statuses``. ``sent=False`` — запрос заведомо
+    не дошёл до сервера (соединение не установлено), его можно повторить
+    даже для POST.
+    """
+
+    def __init__(self, reason: str, status: Optional[int] = None, sent: bool = True):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.sent = sent
+
+    @property
+    def kind(self) -> str:
+        return f"status_{self.status}" if self.status is not None else "connection"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Экспоненциальная задержка с полным джиттером:
+    ``uniform(0, min(max_delay, base_delay * 2**n))`` перед n-м повтором.
+    """
+
+    retries: int = 2
+    base_delay: float = 0.05   # seconds
+    max_delay: float = 1.0     # seconds
+    retry_statuses: Tuple[int, ...] = (502, 503, 504)
+
+    def backoff(self, retry: int, rng: random.Random) -> float:
+        return rng.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def allows(self, method: str, error: TransientError) -> bool:
+        return method in IDEMPOTENT_METHODS or not error.sent
+
+
+class RetryBudget:
+    """Ограничивает повторы и хеджи долей от обычного трафика: каждый запрос
+    добавляет ``ratio`` токена, каждый повтор забирает один. Когда сервер
+    лежит, повторы не умножают нагрузку на него больше чем в ``1 + ratio`` раз.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """Хеджирование GET: если ответа нет через ``delay_ms`` (0 — наблюдаемый
+    p95 успешных GET, как только накопится ``min_samples``), отправляется
+    вторая копия запроса; берётся первый успешный ответ.
+    """
+
+    delay_ms: float = 0.0
+    percentile: float = 95.0
+    min_samples: int = 20
+
+
+class _Resilience:
+    def __init__(
+        self,
+        name: str,
+        policy: RetryPolicy,
+        budget: Optional[RetryBudget] = None,
+        hedge: Optional[HedgePolicy] = None,
+    ):
+        self.name = name
+        self.policy = policy
+        self.budget = budget or RetryBudget()
+        self.hedge = hedge
+        self._rng = random.Random()
+        self._latency = LatencyHistogram()
+        self._hedge_delay: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(
+        cls,
+        name: str,
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+    ):
+        """Из параметров конструктора клиента (их можно перебирать через ``--sweep``)."""
+        return cls(
+            name,
+            RetryPolicy(retries=retries, base_delay=backoff),
+            RetryBudget(ratio=retry_budget),
+            HedgePolicy(delay_ms=hedge_delay_ms) if hedge else None,
+        )
+
+    def retryable_status(self, status: int) -> bool:
+        return status in self.policy.retry_statuses
+
+    def _attributes(self, method: str, **extra) -> dict:
+        return {"client.name": self.name, "http.method": method, **extra}
+
+    def _should_retry(self, method: str, error: TransientError, retry: int) -> Optional[float]:
+        """Задержка перед повтором или ``None``, если повторять нельзя."""
+        if retry >= self.policy.retries or not self.policy.allows(method, error):
+            return None
+        if not self.budget.withdraw():
+            trace.get_current_span().add_event(
+                "http.retry.budget_exhausted", self._attributes(method, reason=error.kind)
+            )
+            return None
+        delay = self.policy.backoff(retry, self._rng)
+        _retries_counter.add(1, attributes=self._attributes(method, reason=error.kind))
+        trace.get_current_span().add_event(
+            "http.retry",
+            self._attributes(method, attempt=retry + 2, reason=error.kind, backoff_ms=round(delay * 1000, 2)),
+        )
+        return delay
+
+    def _give_up(self, method: str, url: str, error: TransientError, attempts: int) -> None:
+        trace.get_current_span().add_event(
+            "http.retry.exhausted", self._attributes(method, attempts=attempts, reason=error.kind)
+        )
+        suffix = f" after {attempts} attempts" if attempts > 1 else ""
+        print(f"[{self.name}] {error.reason} on {method} {url}{suffix}")
+
+    def _hedge_after(self, method: str) -> Optional[float]:
+        """Через сколько секунд хеджировать этот запрос; ``None`` — не хеджировать."""
+        if self.hedge is None or method != "GET":
+            return None
+        if self.hedge.delay_ms > 0:
+            return self.hedge.delay_ms / 1000
+        return self._hedge_delay
+
+    def _observe(self, method: str, started: float) -> None:
+        """Задержка GET для адаптивной задержки хеджа. Основная попытка
+        пишется и при хедже, иначе медленные запросы выпадали бы из выборки
+        и квантиль только уменьшался.
+        """
+        if self.hedge is None or method != "GET" or self.hedge.delay_ms > 0:
+            return
+        with self._lock:
+            self._latency.record((time.perf_counter() - started) * 1000)
+            count = self._latency.total_count
+            # квантиль пересчитывается не на каждый запрос
+            if count >= self.hedge.min_samples and (self._hedge_delay is None or count % 100 == 0):
+                self._hedge_delay = self._latency.value_at_percentile(self.hedge.percentile) / 1000
+
+    def _hedged(self, method: str, delay: float, winner: str) -> None:
+        attributes = self._attributes(method, winner=winner)
+        _hedges_counter.add(1, attributes=attributes)
+        trace.get_current_span().add_event("http.hedge", {**attributes, "delay_ms": round(delay * 1000, 2)})
+
+
+class Resilience(_Resilience):
+    """Повторы и хеджирование для синхронных клиентов. Хедж выполняется
+    в отдельном потоке; проигравшую попытку прервать нельзя, её ответ
+    просто отбрасывается.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def call(self, method: str, url: str, attempt: Callable[[], Any]) -> Any:
+        self.budget.deposit()
+        retry = 0
+        while True:
+            try:
+                return self._once(method, attempt)
+            except TransientError as e:
+                delay = self._should_retry(method, e, retry)
+                if delay is None:
+                    self._give_up(method, url, e, retry + 1)
+                    return None
+                retry += 1
+                time.sleep(delay)
+
+    def _once(self, method: str, attempt: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        hedge_after = self._hedge_after(method)
+        if hedge_after is None:
+            result = attempt()
+            self._observe(method, started)
+            return result
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix=f"{self.name}-hedge")
+        def run_primary() -> Tuple[Any, Dict[str, float]]:
+            with collect_phases() as phases:
+                result = attempt()
+            # поток не прервать: время основной попытки известно и когда она проиграла
+            self._observe(method, started)
+            return result, phases
+
+        def run_backup() -> Tuple[Any, Dict[str, float]]:
+            with collect_phases() as phases:
+                return attempt(), phases
+
+        # попытки в пуле видят текущий span; фазы у каждой свои,
+        # вызывающему достаются только фазы выигравшей
+        primary = self._executor.submit(contextvars.copy_context().run, run_primary)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done or not self.budget.withdraw():
+            result, phases = primary.result()
+            _keep_phases(phases)
+            return result
+
+        backup = self._executor.submit(contextvars.copy_context().run, run_backup)
+        pending = {primary, backup}
+        error: Optional[TransientError] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, phases = future.result()
+                except TransientError as e:
+                    error = e
+                    continue
+                _keep_phases(phases)
+                self._hedged(method, hedge_after, "backup" if future is backup else "primary")
+                return result
+        self._hedged(method, hedge_after, "none")
+        raise error
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _discard_result(task: "asyncio.Future") -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncResilience(_Resilience):
+    """То же для асинхронных клиентов; проигравший хедж отменяется."""
+
+    async def call(self, method: str, url: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        self.budget.deposit()
+        retry = 0
+        while True:
+            try:
+                return await self._once(method, attempt)
+            except TransientError as e:
+                delay = self._should_retry(method, e, retry)
+                if delay is None:
+                    self._give_up(method, url, e, retry + 1)
+                    return None
+                retry += 1
+                await asyncio.sleep(delay)
+
+    async def _once(self, method: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        hedge_after = self._hedge_after(method)
+        if hedge_after is None:
+            result = await attempt()
+            self._observe(method, started)
+            return result
+
+        async def run_primary() -> Tuple[Any, Dict[str, float]]:
+            try:
+                with collect_phases() as phases:
+                    result = await attempt()
+            except asyncio.CancelledError:
+                # проиграла хеджу: пишем прошедшее время, настоящая задержка не меньше
+                self._observe(method, started)
+                raise
+            self._observe(method, started)
+            return result, phases
+
+        async def run_backup() -> Tuple[Any, Dict[str, float]]:
+            with collect_phases() as phases:
+                return await attempt(), phases
+
+        # у каждой задачи своя копия контекста и свой словарь фаз
+        primary = asyncio.ensure_future(run_primary())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if done or not self.budget.withdraw():
+                result, phases = await primary
+                _keep_phases(phases)
+                return result
+
+            backup = asyncio.ensure_future(run_backup())
+            tasks.append(backup)
+            pending = {primary, backup}
+            error: Optional[TransientError] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result, phases = task.result()
+                    except TransientError as e:
+                        error = e
+                        continue
+                    _keep_phases(phases)
+                    self._hedged(method, hedge_after, "backup" if task is backup else "primary")
+                    return result
+        finally:
+            for task in tasks:
+                # ошибка проигравшей попытки не нужна; httpx может доработать
+                # попытку до конца и после cancel(), поэтому забираем её в колбэке
+                task.add_done_callback(_discard_result)
+                task.cancel()
+        self._hedged(method, hedge_after, "none")
+        raise error
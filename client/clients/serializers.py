@@ -0,0 +1,66 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # необязательная зависимость
+    msgspec = None
+
+
+class DecodeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """JSON из объекта в байты тела запроса и обратно — без промежуточных str."""
+
+    name: str
+    _dumps: Callable[[Any], bytes]
+    _loads: Callable[[bytes], Any]
+    _errors: tuple
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, raw: bytes) -> Any:
+        try:
+            return self._loads(raw)
+        except self._errors as e:
+            raise DecodeError(f"{self.name}: {e}") from e
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+SERIALIZERS: Dict[str, Serializer] = {
+    # json.loads сам определяет кодировку у bytes, decode() не нужен
+    "json": Serializer("json", _stdlib_dumps, json.loads, (ValueError,)),
+}
+if orjson is not None:
+    SERIALIZERS["orjson"] = Serializer("orjson", orjson.dumps, orjson.loads, (orjson.JSONDecodeError,))
+if msgspec is not None:
+    _encoder = msgspec.json.Encoder()
+    _decoder = msgspec.json.Decoder()
+    SERIALIZERS["msgspec"] = Serializer("msgspec", _encoder.encode, _decoder.decode, (msgspec.DecodeError,))
+
+
+def available_serializers() -> List[str]:
+    return list(SERIALIZERS)
+
+
+def get_serializer(name: str) -> Serializer:
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown or not installed serializer {name!r}; "
+            f"available: {', '.join(available_serializers())}"
+        )
@@ -0,0 +1,154 @@
+import time
+from typing import Optional, Dict, Any, Iterator, List
+
+import urllib3
+
+from .base import register_client
+from .bulk import BulkUsers
+from .cache import ResponseCache, Revalidation
+from .coalesce import CoalescedReads, SingleFlight
+from .paging import CHUNK_SIZE, PagedUsers, PaginationError
+from .phases import record_phase
+from .retry import Resilience, TransientError
+from .serializers import DecodeError, get_serializer
+
+
+AUTH_HEADERS = {
+    "Authorization": "Bearer test-token",
+}
+
+
+def _not_connected(error: urllib3.exceptions.HTTPError) -> bool:
+    """Соединение не установлено — запрос точно не ушёл на сервер."""
+    return isinstance(
+        error,
+        (
+            urllib3.exceptions.NewConnectionError,
+            urllib3.exceptions.ConnectTimeoutError,
+            urllib3.exceptions.EmptyPoolError,
+        ),
+    )
+
+
+@register_client("urllib3")
+class Urllib3UserClient(PagedUsers, BulkUsers, CoalescedReads):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3100/users",
+        serializer: str = "json",
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+        cache: bool = False,
+        cache_size: int = 1024,
+        cache_ttl: float = 30.0,
+        coalesce: bool = False,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.serializer = get_serializer(serializer)
+        self.resilience = Resilience.from_options(
+            "urllib3", retries, backoff, retry_budget, hedge, hedge_delay_ms
+        )
+        self.cache = ResponseCache("urllib3", cache_size, cache_ttl) if cache else None
+        self.flight = SingleFlight("urllib3") if coalesce else None
+        # собственные повторы urllib3 выключены: ими управляет self.resilience
+        self.pool = urllib3.PoolManager(timeout=urllib3.Timeout(total=5.0), retries=False)
+
+    def _request(
+        self,
+        method: str,
+        path: str = "",
+        json_body: Optional[Dict[str, Any]] = None,
+        revalidation: Optional[Revalidation] = None,
+    ) -> Optional[Any]:
+        url = f"{self.base_url}{path}"
+        headers = dict(AUTH_HEADERS)
+        if revalidation is not None:
+            headers.update(revalidation.request_headers())
+        body = None
+        if json_body is not None:
+            body = self.serializer.dumps(json_body)
+            headers["Content-Type"] = "application/json"
+
+        return self.resilience.call(method, url, lambda: self._attempt(method, url, body, headers, revalidation))
+
+    def _attempt(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        revalidation: Optional[Revalidation] = None,
+    ) -> Optional[Any]:
+        try:
+            started = time.perf_counter()
+            resp = self.pool.request(
+                method, url, body=body, headers=headers, preload_content=False
+            )
+            headers_at = time.perf_counter()
+            record_phase("ttfb", (headers_at - started) * 1000)
+            raw = resp.read()
+            resp.release_conn()
+            record_phase("body", (time.perf_counter() - headers_at) * 1000)
+        except urllib3.exceptions.HTTPError as e:
+            raise TransientError(f"error: {e}", sent=not _not_connected(e)) from e
+
+        if resp.status == 304 and revalidation is not None:
+            revalidation.not_modified = True
+            return None
+        if resp.status in (200, 201):
+            if revalidation is not None:
+                revalidation.capture(resp.headers)
+            if not raw:
+                return None
+            try:
+                return self.serializer.loads(raw)
+            except DecodeError as e:
+                print(f"[urllib3] JSON decode error on {method} {url}: {e}")
+                return None
+        if resp.status == 204:
+            return None
+        if self.resilience.retryable_status(resp.status):
+            raise TransientError(f"HTTP {resp.status}", status=resp.status)
+        print(f"[urllib3] HTTP {resp.status} on {method} {url}: {raw[:200]!r}")
+        return None
+
+    def _stream(self, path: str = "") -> Iterator[bytes]:
+        url = f"{self.base_url}{path}"
+        resp = self.pool.request("GET", url, headers=AUTH_HEADERS, preload_content=False)
+        try:
+            if resp.status != 200:
+                raise PaginationError(f"HTTP {resp.status} on GET {url}")
+            yield from resp.stream(CHUNK_SIZE)
+        finally:
+            resp.release_conn()
+
+    def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        created = self._request("POST", "", user_data)
+        self._invalidate("")
+        return created
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._get(f"/{user_id}")
+
+    def get_all_users(self) -> Optional[List[Dict[str, Any]]]:
+        result = self._get("")
+        if isinstance(result, list):
+            return result
+        return None
+
+    def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        updated = self._request("PUT", f"/{user_id}", user_data)
+        self._invalidate(f"/{user_id}", "")
+        return updated
+
+    def delete_user(self, user_id: str) -> bool:
+        _ = self._request("DELETE", f"/{user_id}")
+        self._invalidate(f"/{user_id}", "")
+        return True
+
+    def close(self) -> None:
+        self.resilience.close()
+        self.pool.clear()
@@ -1,8 +1,22 @@
-import json
+import http.client
+import socket
+import time
 import urllib.request
 import urllib.error
-from typing import Optional, Dict, Any, List
+import urllib.parse
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from contextlib import closing
+from email.message import Message
+
+from .base import register_client
+from .bulk import BulkUsers
+from .cache import ResponseCache, Revalidation
+from .coalesce import CoalescedReads, SingleFlight
+from .serializers import DecodeError, get_serializer
+from .pool import PoolManager, PoolTimeout
+from .phases import record_phase
+from .retry import Resilience, TransientError
+from .paging import CHUNK_SIZE, PagedUsers, PaginationError
 
 
 AUTH_HEADERS = {
@@ -10,65 +24,237 @@ AUTH_HEADERS = {
 }
 
 
-class UrllibUserClient:
-    def __init__(self, base_url: str = "http://localhost:3100/users"):
+# ошибки, после которых keep-alive соединение считаем протухшим и повторяем запрос
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def _not_connected(error: BaseException) -> bool:
+    """Соединение не установлено — запрос точно не ушёл на сервер."""
+    reason = getattr(error, "reason", error)  # URLError оборачивает исходную ошибку
+    return isinstance(reason, (ConnectionRefusedError, socket.gaierror))
+
+
+@register_client("urllib")
+class UrllibUserClient(PagedUsers, BulkUsers, CoalescedReads):
+    """``pooled=False`` — ``urlopen`` и новое TCP-соединение на каждый запрос;
+    ``pooled=True`` — keep-alive соединения ``http.client`` из пула.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3100/users",
+        pooled: bool = False,
+        pool_size: int = 10,
+        idle_timeout: float = 30.0,
+        serializer: str = "json",
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+        cache: bool = False,
+        cache_size: int = 1024,
+        cache_ttl: float = 30.0,
+        coalesce: bool = False,
+    ):
         self.base_url = base_url.rstrip("/")
+        self.serializer = get_serializer(serializer)
+        self.resilience = Resilience.from_options(
+            "urllib", retries, backoff, retry_budget, hedge, hedge_delay_ms
+        )
+        self.cache = ResponseCache("urllib", cache_size, cache_ttl) if cache else None
+        self.flight = SingleFlight("urllib") if coalesce else None
+        self.pooled = pooled
+        self._pools = PoolManager(max_size=pool_size, idle_timeout=idle_timeout) if pooled else None
+
+    def _send_pooled(
+        self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]
+    ) -> Tuple[int, bytes, Message]:
+        parts = urllib.parse.urlsplit(url)
+        pool = self._pools.pool(parts.scheme, parts.hostname, parts.port)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        while True:
+            with pool.connection() as lease:
+                try:
+                    started = time.perf_counter()
+                    lease.conn.request(method, target, body=body, headers=headers)
+                    resp = lease.conn.getresponse()
+                    headers_at = time.perf_counter()
+                    record_phase("ttfb", (headers_at - started) * 1000)
+                    raw = resp.read()
+                    record_phase("body", (time.perf_counter() - headers_at) * 1000)
+                except _STALE_ERRORS:
+                    if not lease.reused:
+                        raise
+                    # сервер закрыл простаивавшее соединение — берём другое
+                    lease.keep = False
+                    continue
+                lease.keep = not resp.will_close
+                return resp.status, raw, resp.headers
+
+    def _send(
+        self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]
+    ) -> Tuple[int, bytes, Message]:
+        req = urllib.request.Request(url, data=body, method=method, headers=headers)
+        started = time.perf_counter()
+        try:
+            resp = urllib.request.urlopen(req)
+        except urllib.error.HTTPError as e:
+            # urlopen бросает HTTPError на любой статус вне 2xx, включая 304
+            with closing(e):
+                return e.code, e.read(), e.headers
+        with closing(resp):
+            # urlopen возвращается после заголовков ответа
+            headers_at = time.perf_counter()
+            record_phase("ttfb", (headers_at - started) * 1000)
+            raw = resp.read()
+            record_phase("body", (time.perf_counter() - headers_at) * 1000)
+            return resp.status, raw, resp.headers
+
+    def _attempt(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        revalidation: Optional[Revalidation] = None,
+    ) -> Optional[Any]:
+        send = self._send_pooled if self.pooled else self._send
+        try:
+            status, raw, resp_headers = send(method, url, body, headers)
+        except PoolTimeout as e:
+            raise TransientError(f"connection error: {e}", sent=False) from e
+        except (OSError, http.client.HTTPException) as e:
+            raise TransientError(f"connection error: {e}", sent=not _not_connected(e)) from e
+
+        if status == 304 and revalidation is not None:
+            revalidation.not_modified = True
+            return None
+        if status in (200, 201):
+            if revalidation is not None:
+                revalidation.capture(resp_headers)
+            try:
+                return self.serializer.loads(raw) if raw else None
+            except DecodeError as e:
+                print(f"[urllib] JSON decode error on {method} {url}: {e}")
+                return None
+        if status == 204:
+            return None
+        if self.resilience.retryable_status(status):
+            raise TransientError(f"HTTP error {status}", status=status)
+        print(f"[urllib] HTTP error {status} on {method} {url}: {raw[:200]!r}")
+        return None
 
     def _request(
         self,
         method: str,
         path: str = "",
         data: Optional[Dict[str, Any]] = None,
+        revalidation: Optional[Revalidation] = None,
     ) -> Optional[Any]:
         url = f"{self.base_url}{path}"
         body_bytes = None
         headers = dict(AUTH_HEADERS)
+        if revalidation is not None:
+            headers.update(revalidation.request_headers())
 
         if data is not None:
-            body_bytes = json.dumps(data).encode("utf-8")
+            body_bytes = self.serializer.dumps(data)
             headers["Content-Type"] = "application/json"
 
-        req = urllib.request.Request(
-            url,
-            data=body_bytes,
-            method=method,
-            headers=headers,
-        )
+        return self.resilience.call(method, url, lambda: self._attempt(method, url, body_bytes, headers, revalidation))
+
+    def _stream(self, path: str = "") -> Iterator[bytes]:
+        """Тело ответа кусками по ``CHUNK_SIZE``; ошибки — исключениями."""
+        url = f"{self.base_url}{path}"
+        if self.pooled:
+            parts = urllib.parse.urlsplit(url)
+            pool = self._pools.pool(parts.scheme, parts.hostname, parts.port)
+            target = parts.path + (f"?{parts.query}" if parts.query else "")
+            # соединение занято, пока тело не дочитано до конца
+            with pool.connection() as lease:
+                lease.conn.request("GET", target, headers=AUTH_HEADERS)
+                resp = lease.conn.getresponse()
+                if resp.status != 200:
+                    lease.keep = False
+                    raise PaginationError(f"HTTP {resp.status} on GET {url}")
+                while chunk := resp.read(CHUNK_SIZE):
+                    yield chunk
+                lease.keep = not resp.will_close
+            return
 
+        req = urllib.request.Request(url, headers=AUTH_HEADERS)
         try:
-            with closing(urllib.request.urlopen(req)) as resp:
-                raw = resp.read().decode("utf-8") or ""
-                if not raw:
-                    return None
-                return json.loads(raw)
+            resp = urllib.request.urlopen(req)
         except urllib.error.HTTPError as e:
-            if e.code in (200, 204):
-                return None
-            print(f"[urllib] HTTP error {e.code} on {method} {url}: {e}")
-            return None
-        except urllib.error.URLError as e:
-            print(f"[urllib] URL error on {method} {url}: {e}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"[urllib] JSON decode error on {method} {url}: {e}")
-            return None
+            e.close()
+            raise PaginationError(f"HTTP {e.code} on GET {url}") from e
+        with closing(resp):
+            while chunk := resp.read(CHUNK_SIZE):
+                yield chunk
 
     def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return self._request("POST", "", user_data)
+        created = self._request("POST", "", user_data)
+        self._invalidate("")
+        return created
 
     def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        return self._request("GET", f"/{user_id}")
+        return self._get(f"/{user_id}")
 
     def get_all_users(self) -> Optional[List[Dict[str, Any]]]:
-        result = self._request("GET", "")
+        result = self._get("")
         if isinstance(result, list):
             return result
         return None
 
     def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return self._request("PUT", f"/{user_id}", user_data)
+        updated = self._request("PUT", f"/{user_id}", user_data)
+        self._invalidate(f"/{user_id}", "")
+        return updated
 
     def delete_user(self, user_id: str) -> bool:
         _ = self._request("DELETE", f"/{user_id}")
+        self._invalidate(f"/{user_id}", "")
         return True
 
+    def close(self) -> None:
+        self.resilience.close()
+        # без пула urllib открывает соединение на каждый запрос
+        if self._pools is not None:
+            self._pools.close()
+
+
+@register_client("urllib-pooled")
+class PooledUrllibUserClient(UrllibUserClient):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3100/users",
+        pool_size: int = 10,
+        idle_timeout: float = 30.0,
+        serializer: str = "json",
+        retries: int = 2,
+        backoff: float = 0.05,
+        retry_budget: float = 0.2,
+        hedge: bool = False,
+        hedge_delay_ms: float = 0.0,
+        cache: bool = False,
+        cache_size: int = 1024,
+        cache_ttl: float = 30.0,
+        coalesce: bool = False,
+    ):
+        super().__init__(
+            base_url,
+            pooled=True,
+            pool_size=pool_size,
+            idle_timeout=idle_timeout,
+            serializer=serializer,
+            retries=retries,
+            backoff=backoff,
+            retry_budget=retry_budget,
+            hedge=hedge,
+            hedge_delay_ms=hedge_delay_ms,
+            cache=cache,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            coalesce=coalesce,
+        )
@@ -0,0 +1,144 @@
+import argparse
+import math
+import sys
+from dataclasses import dataclass
+from statistics import mean
+from typing import Any, Dict, List, Optional, Sequence
+
+from clients.hdr import LatencyHistogram, mann_whitney
+from planner import CI_METRICS, RunSample, by_client, welch_t_test
+from results import BenchmarkResult
+
+
+# у каких метрик больше — лучше
+HIGHER_IS_BETTER = {"it/s"}
+# не сравниваются между запусками: шум, а не условия
+VOLATILE_ENVIRONMENT = {"loadavg"}
+
+
+@dataclass
+class Comparison:
+    client: str
+    metric: str
+    base: float
+    new: float
+    p_value: float  # nan — проверить значимость нечем
+    test: str
+
+    @property
+    def change(self) -> float:
+        """Изменение в процентах относительно базы."""
+        return (self.new - self.base) / self.base * 100 if self.base else 0.0
+
+    def verdict(self, threshold: float, alpha: float) -> str:
+        if abs(self.change) < threshold:
+            return ""
+        worse = self.change < 0 if self.metric in HIGHER_IS_BETTER else self.change > 0
+        word = "REGRESSION" if worse else "improved"
+        if math.isnan(self.p_value):
+            return f"{word}?"  # выше порога, но значимость не проверить
+        return word if self.p_value < alpha else ""
+
+
+def compare_samples(client: str, base: Sequence[RunSample], new: Sequence[RunSample]) -> List[Comparison]:
+    """Метрики ``CI_METRICS`` двух запусков одного клиента. С двумя и более
+    повторностями с каждой стороны — t-тест Уэлча по повторностям (единица
+    наблюдения — прогон); иначе для задержек — U-тест по всем запросам
+    из гистограмм, для пропускной способности проверки нет.
+    """
+    hists = None
+    comparisons = []
+    for metric, value in CI_METRICS.items():
+        base_values, new_values = [value(s) for s in base], [value(s) for s in new]
+        if len(base) >= 2 and len(new) >= 2:
+            p, test = welch_t_test(base_values, new_values), "welch"
+        elif metric not in HIGHER_IS_BETTER:
+            if hists is None:
+                hists = [LatencyHistogram.merged(s.hist for s in runs) for runs in (base, new)]
+            p, test = mann_whitney(*hists)[0], "u-test"
+        else:
+            p, test = math.nan, "-"
+        comparisons.append(Comparison(client, metric, mean(base_values), mean(new_values), p, test))
+    return comparisons
+
+
+def _differences(base: Dict[str, Any], new: Dict[str, Any], ignore=()) -> List[str]:
+    diffs = []
+    for key in sorted(set(base) | set(new)):
+        if key in ignore:
+            continue
+        if base.get(key) != new.get(key):
+            diffs.append(f"{key}: {base.get(key)!r} -> {new.get(key)!r}")
+    return diffs
+
+
+def format_comparison(comparisons: Sequence[Comparison], threshold: float, alpha: float) -> str:
+    width = max([len("client")] + [len(c.client) for c in comparisons])
+    header = f"{'client':<{width}} {'metric':<8} {'base':>10} {'new':>10} {'change':>8} {'p':>8} {'test':>7}  verdict"
+    lines = [header, "-" * len(header)]
+    for c in comparisons:
+        p = "-" if math.isnan(c.p_value) else f"{c.p_value:.3g}"
+        lines.append(
+            f"{c.client:<{width}} {c.metric:<8} {c.base:>10.2f} {c.new:>10.2f} {c.change:>+7.1f}% {p:>8} {c.test:>7}  "
+            f"{c.verdict(threshold, alpha)}"
+        )
+    return "\n".join(lines)
+
+
+def compare(base: BenchmarkResult, new: BenchmarkResult) -> List[Comparison]:
+    base_runs, new_runs = by_client(base.samples), by_client(new.samples)
+    comparisons = []
+    for client in base.clients:
+        if client in new_runs:
+            comparisons += compare_samples(client, base_runs[client], new_runs[client])
+    return comparisons
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare saved benchmark results (benchmark_otel.py --results-dir) against the first one: "
+            "per-client latency and throughput changes with significance tests. "
+            "Exits with 1 if a significant regression exceeds the threshold."
+        )
+    )
+    parser.add_argument("results", nargs="+", help="result files; the first one is the baseline")
+    parser.add_argument("--threshold", type=float, default=5.0, help="minimal change to report, %% (default: %(default)s)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="significance level (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if len(args.results) < 2:
+        parser.error("need a baseline and at least one result to compare")
+    if not 0 < args.alpha < 1:
+        parser.error("--alpha must be in (0, 1)")
+
+    try:
+        runs = [BenchmarkResult.load(path) for path in args.results]
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"cannot read results: {e}")
+
+    base = runs[0]
+    regressions = 0
+    for path, new in zip(args.results[1:], runs[1:]):
+        print(f"=== {args.results[0]} ({base.label}) -> {path} ({new.label})")
+        for title, diffs in (
+            ("scenario differs", _differences(base.scenario, new.scenario)),
+            ("environment differs", _differences(base.environment, new.environment, VOLATILE_ENVIRONMENT)),
+        ):
+            if diffs:
+                print(f"warning: {title}:\n  " + "\n  ".join(diffs))
+        missing = sorted(set(base.clients) ^ set(new.clients))
+        if missing:
+            print(f"warning: clients in only one of the runs: {', '.join(missing)}")
+
+        comparisons = compare(base, new)
+        print(format_comparison(comparisons, args.threshold, args.alpha))
+        regressions += sum(c.verdict(args.threshold, args.alpha) == "REGRESSION" for c in comparisons)
+        print()
+
+    if regressions:
+        print(f"{regressions} significant regression(s) beyond {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
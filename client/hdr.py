@@ -0,0 +1,11 @@
+import sys
+
+from clients.hdr import LatencyHistogram, format_table
+
+
+if __name__ == "__main__":
+    # python hdr.py urllib.hdr.json httpx.hdr.json — сравнение сохранённых прогонов
+    if len(sys.argv) < 2:
+        print("usage: python hdr.py HIST.json [HIST.json ...]")
+        sys.exit(2)
+    print(format_table({p: LatencyHistogram.load(p) for p in sys.argv[1:]}))
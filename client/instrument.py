@@ -0,0 +1,198 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from clients.hdr import LatencyHistogram
+from clients.phases import PHASES, collect_phases
+
+
+# метод клиента -> операция CRUD
+OPERATIONS = {
+    "create_user": "create",
+    "get_user": "get",
+    "update_user": "update",
+    "delete_user": "delete",
+}
+
+TOTAL = "total"
+
+
+@dataclass
+class OperationStats:
+    """Гистограммы по (операция, фаза); сливаются через ``merge``.
+
+    Их до 17 на набор, поэтому набор один на процесс и общий для воркеров:
+    запись идёт под замком, он дешевле HTTP-запроса.
+    """
+
+    significant_digits: int = 2
+    hists: Dict[Tuple[str, str], LatencyHistogram] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def hist(self, operation: str, phase: str = TOTAL) -> LatencyHistogram:
+        key = (operation, phase)
+        hist = self.hists.get(key)
+        if hist is None:
+            hist = self.hists[key] = LatencyHistogram(significant_digits=self.significant_digits)
+        return hist
+
+    def record(self, operation: str, total_ms: float, phases: Dict[str, float]) -> None:
+        with self._lock:
+            self.hist(operation).record(total_ms)
+            for phase, duration_ms in phases.items():
+                self.hist(operation, phase).record(duration_ms)
+
+    def merge(self, other: "OperationStats") -> "OperationStats":
+        with self._lock:
+            for (operation, phase), hist in other.hists.items():
+                self.hist(operation, phase).merge(hist)
+        return self
+
+    def operations(self) -> List[str]:
+        seen = {op for op, _ in self.hists}
+        return [op for op in OPERATIONS.values() if op in seen]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "significant_digits": self.significant_digits,
+            "hists": {f"{op}/{phase}": h.to_dict() for (op, phase), h in self.hists.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OperationStats":
+        stats = cls(significant_digits=data["significant_digits"])
+        for key, hist in data["hists"].items():
+            operation, _, phase = key.partition("/")
+            stats.hists[(operation, phase)] = LatencyHistogram.from_dict(hist)
+        return stats
+
+
+@dataclass
+class OperationMetrics:
+    """OTel-инструменты для операций: атрибуты ``operation`` и ``phase``."""
+
+    duration_hist: Any
+    phase_hist: Any
+
+    @classmethod
+    def create(cls, meter) -> "OperationMetrics":
+        return cls(
+            duration_hist=meter.create_histogram(
+                name="http_client_operation_ms",
+                unit="ms",
+                description="Duration of one CRUD operation per client",
+            ),
+            phase_hist=meter.create_histogram(
+                name="http_client_operation_phase_ms",
+                unit="ms",
+                description="Connect / time-to-first-byte / body read per CRUD operation",
+            ),
+        )
+
+    def record(
+        self, attributes: Dict[str, Any], operation: str, total_ms: float, phases: Dict[str, float]
+    ) -> None:
+        attributes = {**attributes, "operation": operation}
+        self.duration_hist.record(total_ms, attributes=attributes)
+        for phase, duration_ms in phases.items():
+            self.phase_hist.record(duration_ms, attributes={**attributes, "phase": phase})
+
+
+class _Instrumented:
+    def __init__(
+        self,
+        client,
+        stats: OperationStats,
+        metrics: Optional[OperationMetrics] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        measure_from: float = 0.0,
+    ):
+        self._client = client
+        self.stats = stats
+        self._metrics = metrics
+        self._attributes = attributes or {}
+        # операции, начатые раньше (прогрев), не учитываются
+        self._measure_from = measure_from
+
+    def __getattr__(self, attr: str):
+        return getattr(self._client, attr)
+
+    def _done(self, operation: str, started: float, phases: Dict[str, float]) -> None:
+        if started < self._measure_from:
+            return
+        total_ms = (time.perf_counter() - started) * 1000
+        self.stats.record(operation, total_ms, phases)
+        if self._metrics is not None:
+            self._metrics.record(self._attributes, operation, total_ms, phases)
+
+
+class InstrumentedClient(_Instrumented):
+    """Обёртка над синхронным клиентом: время каждой CRUD-операции и её фаз."""
+
+    def _call(self, method: str, *args):
+        with collect_phases() as phases:
+            started = time.perf_counter()
+            try:
+                return getattr(self._client, method)(*args)
+            finally:
+                self._done(OPERATIONS[method], started, phases)
+
+    def create_user(self, user_data):
+        return self._call("create_user", user_data)
+
+    def get_user(self, user_id):
+        return self._call("get_user", user_id)
+
+    def update_user(self, user_id, user_data):
+        return self._call("update_user", user_id, user_data)
+
+    def delete_user(self, user_id):
+        return self._call("delete_user", user_id)
+
+
+class AsyncInstrumentedClient(_Instrumented):
+    """То же для асинхронных клиентов; фазы передаются через contextvar задачи."""
+
+    async def _call(self, method: str, *args):
+        with collect_phases() as phases:
+            started = time.perf_counter()
+            try:
+                return await getattr(self._client, method)(*args)
+            finally:
+                self._done(OPERATIONS[method], started, phases)
+
+    async def create_user(self, user_data):
+        return await self._call("create_user", user_data)
+
+    async def get_user(self, user_id):
+        return await self._call("get_user", user_id)
+
+    async def update_user(self, user_id, user_data):
+        return await self._call("update_user", user_id, user_data)
+
+    async def delete_user(self, user_id):
+        return await self._call("delete_user", user_id)
+
+
+def format_operations_table(
+    results: Dict[str, OperationStats], qs: Iterable[float] = (50, 99)
+) -> str:
+    """Таблица операции x клиенты: pXX по полному времени и по фазам."""
+    qs = list(qs)
+    names = list(results)
+    width = max([10] + [len(n) for n in names])
+    label_width = 18
+    lines = ["".ljust(label_width) + "".join(n.rjust(width + 2) for n in names)]
+    operations = [op for op in OPERATIONS.values() if any(op in s.operations() for s in results.values())]
+    for operation in operations:
+        for phase in (TOTAL,) + PHASES:
+            present = [s.hists.get((operation, phase)) for s in results.values()]
+            if not any(h is not None and h.total_count for h in present):
+                continue
+            quantiles = [h.percentiles(qs) if h is not None and h.total_count else None for h in present]
+            for q in qs:
+                label = f"{operation} {phase} p{q:g}"
+                cells = [f"{v[q]:.2f}" if v is not None else "-" for v in quantiles]
+                lines.append(label.ljust(label_width) + "".join(c.rjust(width + 2) for c in cells))
+    return "\n".join(lines)
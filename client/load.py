@@ -0,0 +1,473 @@
+import asyncio
+import itertools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from clients.hdr import LatencyHistogram
+from instrument import AsyncInstrumentedClient, InstrumentedClient, OperationMetrics, OperationStats
+from workload import PayloadSet, make_user_payload, make_update_payload
+
+
+logger = logging.getLogger("benchmark_otel.load")
+
+
+CRUD_OPS = 4  # HTTP-запросов в одной CRUD-итерации
+
+
+class CrudError(Exception):
+    pass
+
+
+def _payloads(i: int, payloads: Optional[PayloadSet]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    if payloads is None:
+        user_payload = make_user_payload(i)
+        return user_payload, make_update_payload(user_payload)
+    return payloads.user(i), payloads.update(i)
+
+
+def crud_iteration(client, i: int, payloads: Optional[PayloadSet] = None) -> str:
+    user_payload, update_payload = _payloads(i, payloads)
+    created = client.create_user(user_payload)
+    if not created or "id" not in created:
+        raise CrudError(f"create_user returned no id: {created!r}")
+    user_id = created["id"]
+    client.get_user(user_id)
+    client.update_user(user_id, update_payload)
+    client.delete_user(user_id)
+    return user_id
+
+
+async def crud_iteration_async(client, i: int, payloads: Optional[PayloadSet] = None) -> str:
+    user_payload, update_payload = _payloads(i, payloads)
+    created = await client.create_user(user_payload)
+    if not created or "id" not in created:
+        raise CrudError(f"create_user returned no id: {created!r}")
+    user_id = created["id"]
+    await client.get_user(user_id)
+    await client.update_user(user_id, update_payload)
+    await client.delete_user(user_id)
+    return user_id
+
+
+@dataclass
+class LoadConfig:
+    concurrency: int = 10
+    duration: Optional[float] = 10.0   # seconds; игнорируется, если задан requests
+    requests: Optional[int] = None     # всего CRUD-итераций на клиента
+    warmup: float = 0.0                # seconds, результаты отбрасываются
+    rate: Optional[str] = None         # open loop: профиль прихода, см. ArrivalProfile
+    max_inflight: int = 1000           # open loop: больше — отправка считается пропущенной
+    significant_digits: int = 2        # точность гистограммы задержек
+    payloads: Optional[PayloadSet] = None  # тела запросов; None — маленькие TEST_USERS
+
+
+@dataclass
+class LoadResult:
+    name: str
+    concurrency: int
+    rate: Optional[str] = None
+    hist: LatencyHistogram = field(default_factory=LatencyHistogram)  # ms
+    operations: OperationStats = field(default_factory=OperationStats)
+    errors: int = 0
+    missed: int = 0       # open loop: не отправлено из-за max_inflight
+    elapsed: float = 0.0  # seconds, без прогрева
+
+    @classmethod
+    def for_config(cls, name: str, cfg: "LoadConfig", **kwargs) -> "LoadResult":
+        hist = LatencyHistogram(significant_digits=cfg.significant_digits)
+        operations = OperationStats(significant_digits=cfg.significant_digits)
+        return cls(name=name, concurrency=cfg.concurrency, hist=hist, operations=operations, **kwargs)
+
+    def worker(self, cfg: "LoadConfig") -> "LoadResult":
+        """Часть прогона для одного воркера: своя гистограмма итераций,
+        гистограммы операций и фаз — общие с этим результатом.
+        """
+        hist = LatencyHistogram(significant_digits=cfg.significant_digits)
+        return LoadResult(name=self.name, concurrency=self.concurrency, hist=hist, operations=self.operations)
+
+    def merge(self, other: "LoadResult") -> "LoadResult":
+        self.hist.merge(other.hist)
+        if other.operations is not self.operations:
+            self.operations.merge(other.operations)
+        self.errors += other.errors
+        self.missed += other.missed
+        return self
+
+    @property
+    def successes(self) -> int:
+        return self.hist.total_count
+
+    @property
+    def total(self) -> int:
+        return self.successes + self.errors
+
+    @property
+    def rps(self) -> float:
+        return self.successes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.total if self.total else 0.0
+
+
+class _Budget:
+    """Общий для всех виртуальных пользователей счётчик итераций и дедлайн."""
+
+    def __init__(self, cfg: LoadConfig, started: float):
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._limit = cfg.requests
+        self.measure_from = started + cfg.warmup
+        self._deadline = (
+            None
+            if cfg.requests is not None
+            else self.measure_from + (cfg.duration or 0.0)
+        )
+
+    def next(self) -> Optional[int]:
+        with self._lock:
+            i = next(self._counter)
+        if self._limit is not None and i >= self._limit:
+            return None
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return None
+        return i
+
+
+def _record(
+    result: LoadResult,
+    measure_from: float,
+    scheduled: float,
+    ok: bool,
+    attributes: Dict[str, Any],
+    duration_hist,
+    errors_counter,
+) -> None:
+    if scheduled < measure_from:
+        return
+    if ok:
+        duration_ms = (time.perf_counter() - scheduled) * 1000
+        result.hist.record(duration_ms)
+        duration_hist.record(duration_ms, attributes=attributes)
+    else:
+        result.errors += 1
+        errors_counter.add(1, attributes=attributes)
+
+
+def run_sync_load(
+    name: str,
+    client_factory: Callable[[], Any],
+    cfg: LoadConfig,
+    duration_hist,
+    errors_counter,
+    op_metrics: Optional[OperationMetrics] = None,
+) -> LoadResult:
+    """Closed-loop нагрузка: ``concurrency`` потоков, у каждого свой клиент
+    и своя гистограмма итераций; в конце они сливаются. Гистограммы операций
+    и фаз общие на все потоки.
+    """
+    result = LoadResult.for_config(name, cfg)
+    attributes = {"client.name": name, "client.type": "sync", "bench.mode": "load"}
+    budget = _Budget(cfg, time.perf_counter())
+
+    def vu() -> LoadResult:
+        part = result.worker(cfg)
+        client = InstrumentedClient(
+            client_factory(), part.operations, op_metrics, attributes, budget.measure_from
+        )
+        try:
+            while (i := budget.next()) is not None:
+                start = time.perf_counter()
+                try:
+                    crud_iteration(client, i, cfg.payloads)
+                    ok = True
+                except Exception as e:
+                    logger.debug("[%s] error on iteration %d: %s", name, i, e)
+                    ok = False
+                _record(part, budget.measure_from, start, ok, attributes, duration_hist, errors_counter)
+        finally:
+            if hasattr(client, "close"):
+                client.close()
+        return part
+
+    with ThreadPoolExecutor(max_workers=cfg.concurrency) as pool:
+        for f in [pool.submit(vu) for _ in range(cfg.concurrency)]:
+            result.merge(f.result())
+
+    result.elapsed = max(0.0, time.perf_counter() - budget.measure_from)
+    return result
+
+
+async def run_async_load(
+    name: str,
+    client_cls: Callable[[], Any],
+    cfg: LoadConfig,
+    duration_hist,
+    errors_counter,
+    op_metrics: Optional[OperationMetrics] = None,
+) -> LoadResult:
+    """Closed-loop нагрузка: ``concurrency`` задач asyncio на одном клиенте."""
+    result = LoadResult.for_config(name, cfg)
+    attributes = {"client.name": name, "client.type": "async", "bench.mode": "load"}
+    budget = _Budget(cfg, time.perf_counter())
+
+    async with client_cls() as raw_client:
+
+        async def vu() -> LoadResult:
+            part = result.worker(cfg)
+            client = AsyncInstrumentedClient(
+                raw_client, part.operations, op_metrics, attributes, budget.measure_from
+            )
+            while (i := budget.next()) is not None:
+                start = time.perf_counter()
+                try:
+                    await crud_iteration_async(client, i, cfg.payloads)
+                    ok = True
+                except Exception as e:
+                    logger.debug("[%s] error on iteration %d: %s", name, i, e)
+                    ok = False
+                _record(part, budget.measure_from, start, ok, attributes, duration_hist, errors_counter)
+            return part
+
+        for part in await asyncio.gather(*(vu() for _ in range(cfg.concurrency))):
+            result.merge(part)
+
+    result.elapsed = max(0.0, time.perf_counter() - budget.measure_from)
+    return result
+
+
+class ArrivalProfile:
+    """Целевая частота прихода CRUD-итераций (в секунду) от времени.
+
+    ``constant:50`` (или просто ``50``), ``step:10,20,40@5`` — ступени
+    по 5 секунд, ``ramp:10:200`` — линейно от 10 до 200 за всё время прогона.
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "constant", kind
+        self.kind = kind
+        try:
+            if kind == "constant":
+                self._rates = [float(params)]
+            elif kind == "step":
+                rates, _, step = params.partition("@")
+                self._rates = [float(r) for r in rates.split(",")]
+                self._step = float(step) if step else None
+            elif kind == "ramp":
+                start, end = params.split(":")
+                self._rates = [float(start), float(end)]
+            else:
+                raise ValueError(kind)
+        except ValueError:
+            raise ValueError(f"Invalid arrival rate profile: {spec!r}")
+
+    def rate(self, t: float, duration: Optional[float]) -> float:
+        if self.kind == "constant":
+            return self._rates[0]
+        if self.kind == "step":
+            step = self._step or ((duration or 0.0) / len(self._rates)) or 1.0
+            return self._rates[min(int(t // step), len(self._rates) - 1)]
+        start, end = self._rates
+        if not duration:
+            return start
+        return start + (end - start) * min(1.0, t / duration)
+
+    def _next_active(self, t: float, duration: Optional[float]) -> Optional[float]:
+        """Ближайший момент не раньше ``t``, когда частота положительна;
+        ``None`` — дальше отправок не будет.
+        """
+        if self.rate(t, duration) > 0:
+            return t
+        if self.kind == "step":
+            step = self._step or ((duration or 0.0) / len(self._rates)) or 1.0
+            for i in range(int(t // step) + 1, len(self._rates)):
+                if self._rates[i] > 0:
+                    return i * step
+            return None
+        if self.kind == "ramp" and duration:
+            start, end = self._rates
+            if end <= 0 or end <= start:
+                return None
+            # частота растёт от нуля линейно: первая отправка — когда
+            # накопится одна итерация, через sqrt(2 / наклон)
+            zero = -start / (end - start) * duration
+            return max(t, zero) + math.sqrt(2 * duration / (end - start))
+        return None
+
+    def arrivals(self, duration: Optional[float], limit: Optional[int]) -> Iterator[float]:
+        """Смещения запланированных отправок от начала прогона, в секундах.
+        Участки с нулевой частотой пропускаются без отправок.
+        """
+        t = 0.0
+        n = 0
+        while limit is None or n < limit:
+            t = self._next_active(t, duration)
+            if t is None or (duration is not None and t >= duration):
+                return
+            yield t
+            n += 1
+            t += 1.0 / self.rate(t, duration)
+
+
+def _open_loop_bounds(cfg: LoadConfig):
+    total = None if cfg.requests is not None else cfg.warmup + (cfg.duration or 0.0)
+    return total, cfg.requests
+
+
+def run_sync_open_loop(
+    name: str,
+    client_factory: Callable[[], Any],
+    cfg: LoadConfig,
+    duration_hist,
+    errors_counter,
+    op_metrics: Optional[OperationMetrics] = None,
+) -> LoadResult:
+    """Open-loop нагрузка: итерации запускаются по расписанию независимо от
+    того, успел ли ответить сервер. Задержка считается от запланированного
+    времени, поэтому очередь перед пулом потоков попадает в хвосты.
+    """
+    profile = ArrivalProfile(cfg.rate or "constant:10")
+    result = LoadResult.for_config(name, cfg, rate=profile.spec)
+    result.concurrency = cfg.max_inflight
+    attributes = {"client.name": name, "client.type": "sync", "bench.mode": "open"}
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(cfg.max_inflight)
+    local = threading.local()
+    workers: List[Tuple[Any, LoadResult]] = []
+    started = time.perf_counter()
+    measure_from = started + cfg.warmup
+
+    def job(i: int, scheduled: float) -> None:
+        # у каждого потока пула свои клиент и гистограмма итераций
+        if not hasattr(local, "client"):
+            local.part = result.worker(cfg)
+            local.client = InstrumentedClient(
+                client_factory(), local.part.operations, op_metrics, attributes, measure_from
+            )
+            with lock:
+                workers.append((local.client, local.part))
+        try:
+            crud_iteration(local.client, i, cfg.payloads)
+            ok = True
+        except Exception as e:
+            logger.debug("[%s] error on iteration %d: %s", name, i, e)
+            ok = False
+        finally:
+            slots.release()
+        _record(local.part, measure_from, scheduled, ok, attributes, duration_hist, errors_counter)
+
+    duration, limit = _open_loop_bounds(cfg)
+    with ThreadPoolExecutor(max_workers=cfg.max_inflight) as pool:
+        for i, offset in enumerate(profile.arrivals(duration, limit)):
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not slots.acquire(blocking=False):
+                if scheduled >= measure_from:
+                    result.missed += 1
+                continue
+            pool.submit(job, i, scheduled)
+
+    for client, part in workers:
+        result.merge(part)
+        if hasattr(client, "close"):
+            client.close()
+
+    result.elapsed = max(0.0, time.perf_counter() - measure_from)
+    return result
+
+
+async def run_async_open_loop(
+    name: str,
+    client_cls: Callable[[], Any],
+    cfg: LoadConfig,
+    duration_hist,
+    errors_counter,
+    op_metrics: Optional[OperationMetrics] = None,
+) -> LoadResult:
+    """Open-loop нагрузка на asyncio: одна задача на запланированную итерацию."""
+    profile = ArrivalProfile(cfg.rate or "constant:10")
+    result = LoadResult.for_config(name, cfg, rate=profile.spec)
+    result.concurrency = cfg.max_inflight
+    attributes = {"client.name": name, "client.type": "async", "bench.mode": "open"}
+    started = time.perf_counter()
+    measure_from = started + cfg.warmup
+    inflight: set = set()
+
+    async with client_cls() as raw_client:
+        client = AsyncInstrumentedClient(
+            raw_client, result.operations, op_metrics, attributes, measure_from
+        )
+
+        async def job(i: int, scheduled: float) -> None:
+            try:
+                await crud_iteration_async(client, i, cfg.payloads)
+                ok = True
+            except Exception as e:
+                logger.debug("[%s] error on iteration %d: %s", name, i, e)
+                ok = False
+            _record(result, measure_from, scheduled, ok, attributes, duration_hist, errors_counter)
+
+        duration, limit = _open_loop_bounds(cfg)
+        for i, offset in enumerate(profile.arrivals(duration, limit)):
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(inflight) >= cfg.max_inflight:
+                if scheduled >= measure_from:
+                    result.missed += 1
+                continue
+            task = asyncio.create_task(job(i, scheduled))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+
+        if inflight:
+            await asyncio.gather(*inflight)
+
+    result.elapsed = max(0.0, time.perf_counter() - measure_from)
+    return result
+
+
+async def run_client_load(
+    spec,
+    cfg: LoadConfig,
+    duration_hist,
+    errors_counter,
+    op_metrics: Optional[OperationMetrics] = None,
+) -> LoadResult:
+    """Выбирает раннер по типу клиента (``ClientSpec``) и режиму нагрузки."""
+    if spec.is_async:
+        run = run_async_open_loop if cfg.rate else run_async_load
+        return await run(spec.name, spec.factory, cfg, duration_hist, errors_counter, op_metrics)
+    run = run_sync_open_loop if cfg.rate else run_sync_load
+    return await asyncio.to_thread(
+        run, spec.name, spec.factory, cfg, duration_hist, errors_counter, op_metrics
+    )
+
+
+def report(result: LoadResult) -> None:
+    hist = result.hist
+    if result.rate:
+        logger.info("--- %s open-loop summary (rate=%s) ---", result.name, result.rate)
+    else:
+        logger.info("--- %s load summary (concurrency=%d) ---", result.name, result.concurrency)
+    logger.info("  iterations: %d", result.total)
+    logger.info("  errors:     %d (%.2f%%)", result.errors, result.error_rate * 100)
+    if result.missed:
+        logger.info("  missed:     %d (max in-flight reached)", result.missed)
+    logger.info(
+        "  throughput: %.1f it/s (%.1f req/s)", result.rps, result.rps * CRUD_OPS
+    )
+    if hist.total_count:
+        for q, value in hist.percentiles((50, 95, 99, 99.9)).items():
+            logger.info("  p%-9s %.2f ms", f"{q:g}:", value)
@@ -0,0 +1,435 @@
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import logging
+import math
+import random
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+logger = logging.getLogger("mock_server")
+
+DEFAULT_PORT = 8100  # 3100 занят Loki из docker-compose.yml
+
+_REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+_MAX_HEADER = 64 * 1024
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _etag(payload: bytes) -> str:
+    # сильный валидатор по содержимому: тело не поменялось — ETag тот же
+    return f'"{zlib.crc32(payload):08x}-{len(payload):x}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+class LatencyModel:
+    """Задержка ответа в мс.
+
+    ``0`` — без задержки, ``const:5``, ``uniform:1:10``, ``exp:5`` (среднее),
+    ``lognormal:2:0.5`` — медиана 2 мс, sigma 0.5 (длинный хвост).
+    """
+
+    def __init__(self, spec: str = "0"):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "const", kind
+        self.kind = kind
+        try:
+            self._params = [float(p) for p in params.split(":")]
+            expected = {"const": 1, "uniform": 2, "exp": 1, "lognormal": 2}[kind]
+            if len(self._params) != expected or any(p < 0 for p in self._params):
+                raise ValueError(spec)
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid latency model: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        p = self._params
+        if self.kind == "const":
+            return p[0]
+        if self.kind == "uniform":
+            return rng.uniform(p[0], p[1])
+        if self.kind == "exp":
+            return rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return p[0] * math.exp(rng.gauss(0.0, p[1]))
+
+
+@dataclass
+class MockConfig:
+    host: str = "127.0.0.1"
+    port: int = DEFAULT_PORT
+    latency: str = "0"
+    error_rate: float = 0.0     # доля запросов, на которые отвечаем error_status
+    error_status: int = 503
+    payload_bytes: int = 0      # поле padding такого размера в каждой записи
+    seed_users: int = 0         # записей при старте
+    bulk: bool = True           # объявлять POST /users/bulk
+    max_bulk: int = 1000
+    seed: Optional[int] = None  # для воспроизводимых задержек и ошибок
+
+
+class UsersStore:
+    """Пользователи в порядке создания; id — растущие целые (в JSON строкой)."""
+
+    def __init__(self, payload_bytes: int = 0):
+        self._users: Dict[int, Dict[str, Any]] = {}
+        self._order: List[int] = []
+        self._ids = itertools.count(1)
+        self._padding = "x" * payload_bytes if payload_bytes else None
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _store(self, user_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        user = {**data, "id": str(user_id)}
+        if self._padding is not None:
+            user["padding"] = self._padding
+        self._users[user_id] = user
+        return user
+
+    def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = next(self._ids)
+        self._order.append(user_id)
+        return self._store(user_id, data)
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._users.get(user_id)
+
+    def update(self, user_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if user_id not in self._users:
+            return None
+        return self._store(user_id, data)
+
+    def delete(self, user_id: int) -> bool:
+        if self._users.pop(user_id, None) is None:
+            return False
+        del self._order[bisect.bisect_left(self._order, user_id)]
+        return True
+
+    def page(self, offset: int, limit: Optional[int]) -> List[Dict[str, Any]]:
+        ids = self._order[offset:] if limit is None else self._order[offset:offset + limit]
+        return [self._users[i] for i in ids]
+
+    def after(self, cursor: int, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        start = bisect.bisect_right(self._order, cursor)
+        ids = self._order[start:start + limit]
+        more = start + limit < len(self._order)
+        return [self._users[i] for i in ids], (str(ids[-1]) if more and ids else None)
+
+
+def _user_id(raw: str) -> Optional[int]:
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+class UsersApp:
+    """Маршрутизация ``/users``; возвращает (статус, тело или ``None``)."""
+
+    def __init__(self, cfg: MockConfig):
+        self.cfg = cfg
+        self.store = UsersStore(cfg.payload_bytes)
+        self.latency = LatencyModel(cfg.latency)
+        self.rng = random.Random(cfg.seed)
+        for i in range(cfg.seed_users):
+            self.store.create({"username": f"seed{i}", "email": f"seed{i}@example.com"})
+
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[int, Optional[bytes]]:
+        if self.cfg.error_rate and self.rng.random() < self.cfg.error_rate:
+            return self.cfg.error_status, _dumps({"error": "injected failure"})
+        parts = urlsplit(target)
+        path = parts.path.rstrip("/").split("/")
+        if len(path) < 2 or path[1] != "users":
+            return 404, _dumps({"error": "not found"})
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            return 400, _dumps({"error": "invalid JSON"})
+
+        if len(path) == 2:
+            return self._collection(method, parse_qs(parts.query), data)
+        if len(path) == 3 and path[2] == "bulk" and self.cfg.bulk:
+            if method != "POST":
+                return 405, _dumps({"error": "method not allowed"})
+            return self._bulk(data)
+        if len(path) == 3:
+            return self._item(method, _user_id(path[2]), data)
+        return 404, _dumps({"error": "not found"})
+
+    def _collection(self, method: str, query: Dict[str, List[str]], data: Any) -> Tuple[int, Optional[bytes]]:
+        if method == "POST":
+            if not isinstance(data, dict):
+                return 400, _dumps({"error": "expected JSON object"})
+            return 201, _dumps(self.store.create(data))
+        if method == "OPTIONS":
+            if not self.cfg.bulk:
+                return 204, None
+            return 200, _dumps({"bulk": "/bulk", "max_items": self.cfg.max_bulk})
+        if method != "GET":
+            return 405, _dumps({"error": "method not allowed"})
+        try:
+            limit = int(query["limit"][0]) if "limit" in query else None
+            offset = int(query["offset"][0]) if "offset" in query else None
+            cursor = query["cursor"][0] if "cursor" in query else None
+        except ValueError:
+            return 400, _dumps({"error": "invalid pagination parameters"})
+        # как в PageSpec: offset — массив, cursor (или limit без offset) — {"items", "next_cursor"}
+        if cursor is not None or (limit is not None and offset is None):
+            items, next_cursor = self.store.after(_user_id(cursor or "0") or 0, limit or 100)
+            return 200, _dumps({"items": items, "next_cursor": next_cursor})
+        return 200, _dumps(self.store.page(offset or 0, limit))
+
+    def _item(self, method: str, user_id: Optional[int], data: Any) -> Tuple[int, Optional[bytes]]:
+        if method == "DELETE":
+            if user_id is None or not self.store.delete(user_id):
+                return 404, _dumps({"error": "not found"})
+            return 204, None
+        if method == "GET":
+            user = self.store.get(user_id) if user_id is not None else None
+        elif method == "PUT":
+            if not isinstance(data, dict):
+                return 400, _dumps({"error": "expected JSON object"})
+            user = self.store.update(user_id, data) if user_id is not None else None
+        else:
+            return 405, _dumps({"error": "method not allowed"})
+        if user is None:
+            return 404, _dumps({"error": "not found"})
+        return 200, _dumps(user)
+
+    def _bulk(self, data: Any) -> Tuple[int, Optional[bytes]]:
+        if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+            return 400, _dumps({"error": "expected {\"op\", \"items\"}"})
+        items = data["items"]
+        if len(items) > self.cfg.max_bulk:
+            return 413, _dumps({"error": f"at most {self.cfg.max_bulk} items"})
+        op = data.get("op")
+        store = self.store
+        if op == "create":
+            results = [store.create(i) if isinstance(i, dict) else None for i in items]
+        elif op == "update":
+            results = [
+                store.update(_user_id(str(i.get("id"))) or 0, i.get("data") or {}) if isinstance(i, dict) else None
+                for i in items
+            ]
+        elif op == "delete":
+            results = [store.delete(_user_id(str(i)) or 0) for i in items]
+        else:
+            return 400, _dumps({"error": f"unknown op {op!r}"})
+        return 200, _dumps({"results": results})
+
+
+class _HttpConnection(asyncio.Protocol):
+    """Одно соединение. Ответы уходят строго в порядке запросов (pipelining),
+    даже если задержка у следующего меньше, чем у предыдущего.
+    """
+
+    def __init__(self, app: UsersApp):
+        self.app = app
+        self.loop = asyncio.get_running_loop()
+        self.transport: Optional[asyncio.Transport] = None
+        self._buf = bytearray()
+        self._queue: Deque[list] = deque()  # [готовый ответ или None, закрыть после]
+        self._closing = False
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def connection_lost(self, exc) -> None:
+        self.transport = None
+
+    def data_received(self, data: bytes) -> None:
+        self._buf += data
+        while not self._closing:
+            request = self._parse()
+            if request is None:
+                break
+            method, target, close, body, if_none_match = request
+            status, payload = self.app.handle(method, target, body)
+            etag = None
+            if method == "GET" and status == 200 and payload is not None:
+                etag = _etag(payload)
+                if _etag_matches(if_none_match, etag):
+                    status, payload = 304, None
+            slot = [None, close]
+            self._queue.append(slot)
+            response = self._response(status, payload, close, etag)
+            delay_ms = self.app.latency.sample(self.app.rng)
+            if delay_ms > 0:
+                self.loop.call_later(delay_ms / 1000, self._ready, slot, response)
+            else:
+                slot[0] = response
+            self._closing = close
+        self._flush()
+
+    def _parse(self) -> Optional[Tuple[str, str, bool, bytes, Optional[str]]]:
+        buf = self._buf
+        end = buf.find(b"\r\n\r\n")
+        if end < 0:
+            if len(buf) > _MAX_HEADER:
+                self._fail(413)
+            return None
+        try:
+            head = bytes(buf[:end]).decode("latin-1").split("\r\n")
+            method, target, version = head[0].split(" ", 2)
+            headers = {}
+            for line in head[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            self._fail(400)
+            return None
+        if len(buf) < end + 4 + length:
+            return None
+        body = bytes(buf[end + 4:end + 4 + length])
+        del buf[:end + 4 + length]
+        connection = headers.get("connection", "").lower()
+        close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+        return method, target, close, body, headers.get("if-none-match")
+
+    def _response(self, status: int, payload: Optional[bytes], close: bool, etag: Optional[str] = None) -> bytes:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+        if payload is not None:
+            lines.append("Content-Type: application/json")
+        if etag is not None:
+            lines.append(f"ETag: {etag}")
+        if status != 304:
+            # у 304 тела нет никогда, Content-Length ему не нужен
+            lines.append(f"Content-Length: {len(payload) if payload else 0}")
+        if close:
+            lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (payload or b"")
+
+    def _ready(self, slot: list, response: bytes) -> None:
+        slot[0] = response
+        self._flush()
+
+    def _flush(self) -> None:
+        while self._queue and self._queue[0][0] is not None:
+            response, close = self._queue.popleft()
+            if self.transport is None:
+                self._queue.clear()
+                return
+            self.transport.write(response)
+            if close:
+                self.transport.close()
+                self._queue.clear()
+                return
+
+    def _fail(self, status: int) -> None:
+        # запрос не разобрать — отвечаем сразу после уже принятых и закрываем
+        self._queue.append([self._response(status, _dumps({"error": _REASONS[status]}), True), True])
+        self._closing = True
+        self._buf.clear()
+
+
+async def start_server(cfg: MockConfig) -> asyncio.AbstractServer:
+    """Локальный users API для бенчмарков без внешних сервисов: in-memory CRUD
+    на голом ``asyncio.Protocol`` (HTTP/1.1, keep-alive, pipelining) с задержкой,
+    ошибками и размером записей из ``cfg``. Пагинация совместима с ``PageSpec``,
+    пакетный эндпоинт — с ``clients/bulk.py``.
+    """
+    app = UsersApp(cfg)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: _HttpConnection(app), cfg.host, cfg.port, reuse_address=True)
+    logger.info(
+        "mock users API on http://%s:%d/users (latency=%s, error_rate=%g, payload_bytes=%d, users=%d)",
+        cfg.host,
+        cfg.port,
+        cfg.latency,
+        cfg.error_rate,
+        cfg.payload_bytes,
+        len(app.store),
+    )
+    return server
+
+
+def add_server_arguments(parser: argparse.ArgumentParser, prefix: str = "") -> None:
+    """Параметры сервера; ``prefix`` нужен, когда они соседствуют с чужими."""
+    parser.add_argument(f"--{prefix}host", default="127.0.0.1")
+    parser.add_argument(f"--{prefix}port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        f"--{prefix}latency",
+        default="0",
+        help="response delay, ms: 0, const:5, uniform:1:10, exp:5, lognormal:MEDIAN:SIGMA",
+    )
+    parser.add_argument(f"--{prefix}error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument(f"--{prefix}error-status", type=int, default=503, help="status code of injected failures")
+    parser.add_argument(f"--{prefix}payload-bytes", type=int, default=0, help="padding added to every user record")
+    parser.add_argument(f"--{prefix}seed-users", type=int, default=0, help="users created at startup")
+    parser.add_argument(f"--{prefix}no-bulk", action="store_true", help="do not advertise the bulk endpoint")
+    parser.add_argument(f"--{prefix}max-bulk", type=int, default=1000, help="max items per bulk request")
+    parser.add_argument(f"--{prefix}seed", type=int, default=None, help="RNG seed for latency and failures")
+
+
+def config_from_args(args: argparse.Namespace, prefix: str = "") -> MockConfig:
+    attr = prefix.replace("-", "_")
+    value = lambda name: getattr(args, attr + name)  # noqa: E731
+    cfg = MockConfig(
+        host=value("host"),
+        port=value("port"),
+        latency=value("latency"),
+        error_rate=value("error_rate"),
+        error_status=value("error_status"),
+        payload_bytes=value("payload_bytes"),
+        seed_users=value("seed_users"),
+        bulk=not value("no_bulk"),
+        max_bulk=value("max_bulk"),
+        seed=value("seed"),
+    )
+    LatencyModel(cfg.latency)  # ValueError на неверной спецификации
+    if not 0.0 <= cfg.error_rate <= 1.0:
+        raise ValueError("error rate must be within [0, 1]")
+    return cfg
+
+
+async def serve(cfg: MockConfig) -> None:
+    server = await start_server(cfg)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="In-memory users API for client benchmarks")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        cfg = config_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s")
+    try:
+        asyncio.run(serve(cfg))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
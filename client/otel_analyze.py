@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from clients.hdr import LatencyHistogram
+from otel_files import read_records, read_signal, signal_files
+
+
+def _series_key(record: Dict[str, Any]) -> Tuple[str, str]:
+    return record["name"], json.dumps(record.get("attrs") or {}, sort_keys=True)
+
+
+def _bucket_quantile(q: float, bounds: Sequence[float], counts: Sequence[int], lo: float, hi: float) -> float:
+    """Квантиль по явным бакетам OTel: линейно внутри бакета, края — min и max."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    target = q / 100 * total
+    seen = 0
+    for i, c in enumerate(counts):
+        if c and seen + c >= target:
+            left = bounds[i - 1] if i > 0 else lo
+            right = bounds[i] if i < len(bounds) else hi
+            left, right = max(left, lo), min(right, hi)
+            return left + (right - left) * (target - seen) / c
+        seen += c
+    return hi
+
+
+def summarize_spans(directory: str) -> List[Dict[str, Any]]:
+    hists: Dict[str, LatencyHistogram] = {}
+    errors: Counter = Counter()
+    for span in read_signal(directory, "spans"):
+        name = span["name"]
+        hists.setdefault(name, LatencyHistogram()).record(span["ms"])
+        if span.get("status") == "ERROR":
+            errors[name] += 1
+    return [
+        {
+            "name": name,
+            "count": h.total_count,
+            "errors": errors[name],
+            "mean": h.mean,
+            "p50": h.value_at_percentile(50),
+            "p95": h.value_at_percentile(95),
+            "p99": h.value_at_percentile(99),
+            "max": h.max,
+        }
+        for name, h in sorted(hists.items())
+    ]
+
+
+def summarize_metrics(directory: str) -> List[Dict[str, Any]]:
+    """Итог по каждому ряду: последняя (кумулятивная) точка каждого процесса,
+    затем сумма по процессам.
+    """
+    totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for path in signal_files(directory, "metrics"):
+        last: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for point in read_records(path):
+            key = _series_key(point)
+            if key not in last or point["time"] >= last[key]["time"]:
+                last[key] = point
+        for key, point in last.items():
+            total = totals.get(key)
+            if total is None:
+                totals[key] = dict(point)
+            elif point["kind"] == "histogram":
+                total["count"] += point["count"]
+                total["sum"] += point["sum"]
+                total["min"] = min(total["min"], point["min"])
+                total["max"] = max(total["max"], point["max"])
+                total["counts"] = [a + b for a, b in zip(total["counts"], point["counts"])]
+            else:
+                total["value"] += point["value"]
+
+    rows = []
+    for (name, _), point in sorted(totals.items()):
+        row = {"name": name, "attrs": point.get("attrs") or {}, "unit": point.get("unit", ""), "kind": point["kind"]}
+        if point["kind"] == "histogram":
+            count = point["count"]
+            row.update(count=count, sum=point["sum"], mean=point["sum"] / count if count else 0.0)
+            for q in (50, 95, 99):
+                row[f"p{q}"] = _bucket_quantile(q, point["bounds"], point["counts"], point["min"], point["max"])
+            row["max"] = point["max"]
+        else:
+            row["value"] = point["value"]
+        rows.append(row)
+    return rows
+
+
+def summarize_logs(directory: str) -> Dict[str, Dict[str, int]]:
+    levels: Counter = Counter()
+    loggers: Counter = Counter()
+    for record in read_signal(directory, "logs"):
+        levels[record.get("level") or "UNSET"] += 1
+        loggers[record.get("logger") or "?"] += 1
+    return {"levels": dict(levels.most_common()), "loggers": dict(loggers.most_common())}
+
+
+def analyze(directory: str) -> Dict[str, Any]:
+    return {
+        "spans": summarize_spans(directory),
+        "metrics": summarize_metrics(directory),
+        "logs": summarize_logs(directory),
+    }
+
+
+def _attrs_label(attrs: Dict[str, Any]) -> str:
+    return ",".join(f"{k}={v}" for k, v in sorted(attrs.items()))
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = []
+    spans = report["spans"]
+    if spans:
+        width = max(len("span"), *(len(s["name"]) for s in spans))
+        header = f"{'span':<{width}} {'count':>8} {'errors':>7} {'mean ms':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        lines += [header, "-" * len(header)]
+        for s in spans:
+            lines.append(
+                f"{s['name']:<{width}} {s['count']:>8} {s['errors']:>7} {s['mean']:>9.2f} {s['p50']:>9.2f} "
+                f"{s['p95']:>9.2f} {s['p99']:>9.2f} {s['max']:>9.2f}"
+            )
+        lines.append("")
+
+    metrics = report["metrics"]
+    if metrics:
+        labels = [f"{m['name']}{{{_attrs_label(m['attrs'])}}}" for m in metrics]
+        width = max(len("metric"), *(len(label) for label in labels))
+        header = f"{'metric':<{width}} {'count/value':>12} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        lines += [header, "-" * len(header)]
+        for label, m in zip(labels, metrics):
+            if m["kind"] == "histogram":
+                lines.append(
+                    f"{label:<{width}} {m['count']:>12} {m['mean']:>9.2f} {m['p50']:>9.2f} {m['p95']:>9.2f} "
+                    f"{m['p99']:>9.2f} {m['max']:>9.2f}"
+                )
+            else:
+                lines.append(f"{label:<{width}} {m['value']:>12g}")
+        lines.append("")
+
+    logs = report["logs"]
+    if logs["levels"]:
+        lines.append("logs: " + ", ".join(f"{level} {n}" for level, n in logs["levels"].items()))
+        lines += [f"  {name}: {n}" for name, n in logs["loggers"].items()]
+    return "\n".join(lines) if lines else "no telemetry found"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Summarize telemetry written by benchmark_otel.py --telemetry file: span latencies, metrics, logs"
+    )
+    parser.add_argument("directory", help="the --telemetry-dir of the benchmark run")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+
+    report = analyze(args.directory)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,354 @@
+import argparse
+import dataclasses
 import logging
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 
 from opentelemetry import trace, metrics
+from opentelemetry.trace import get_current_span
 from opentelemetry.sdk.resources import Resource
 
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_OFF,
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 
 from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader, PeriodicExportingMetricReader
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
-from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+from opentelemetry.sdk._logs.export import BatchLogRecordProcessor, InMemoryLogRecordExporter
 from opentelemetry.exporter.otlp.proto.grpc._log_exporter import OTLPLogExporter
 
+from otel_files import JsonLinesLogExporter, JsonLinesMetricExporter, JsonLinesSpanExporter
+
 
 logger = logging.getLogger(__name__)
 
+# куда уходит телеметрия: otlp / otlp-http — OTLP в коллектор по gRPC или
+# HTTP; file — JSON lines в каталог (см. otel_analyze.py); memory — в память
+# процесса; noop — SDK установлен, но ничего не пишет; disabled — без SDK
+EXPORTERS = ("otlp", "otlp-http", "file", "memory", "noop", "disabled")
+DEFAULT_ENDPOINTS = {"otlp": "localhost:4317", "otlp-http": "http://localhost:4318"}
+DEFAULT_DIRECTORY = "telemetry"
 
-def configure_opentelemetry(service_name: str = "http-clients-benchmark") -> None:
-    resource = Resource.create({"service.name": service_name})
 
+class _SpanRatioSampler(Sampler):
+    """Каждый дочерний span пишется с вероятностью ``ratio`` независимо от
+    остальных; корневые span'ы (прогон, клиент) пишутся всегда. У бенчмарка
+    все итерации — одна трасса, и выборка по trace id взяла бы или отбросила
+    её целиком.
+    """
+
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        parent = get_current_span(parent_context).get_span_context()
+        if not parent.is_valid or random.random() < self.ratio:
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes, trace_state)
+        return SamplingResult(Decision.DROP, None, trace_state)
+
+    def get_description(self) -> str:
+        return f"SpanRatioSampler{{{self.ratio}}}"
+
+
+@dataclass(frozen=True)
+class TelemetryConfig:
+    """Насколько подробно и как часто экспортируется телеметрия.
+
+    ``sample_ratio`` — доля записываемых трасс (head sampling по trace id),
+    дочерние span'ы следуют решению родителя; без ``parent_based`` —
+    доля дочерних span'ов, каждый выбирается отдельно.
+    Параметры batch-процессора (те же, что у ``OTEL_BSP_*``) применяются
+    к span'ам и к логам. ``iteration_logs=False`` убирает INFO-лог на каждую
+    итерацию бенчмарка. ``exporter`` — одно из ``EXPORTERS``.
+    """
+
+    exporter: str = "otlp"
+    endpoint: str = ""                   # пусто — DEFAULT_ENDPOINTS[exporter]
+    directory: str = DEFAULT_DIRECTORY   # для exporter="file"
+
+    sample_ratio: float = 1.0
+    parent_based: bool = True
+    max_queue_size: int = 2048
+    schedule_delay_ms: float = 5000.0
+    max_export_batch_size: int = 512
+    metric_interval_ms: float = 10000.0
+    iteration_logs: bool = True
+
+    def __post_init__(self):
+        if self.exporter not in EXPORTERS:
+            raise ValueError(f"exporter must be one of {', '.join(EXPORTERS)}, got {self.exporter!r}")
+        if not 0.0 <= self.sample_ratio <= 1.0:
+            raise ValueError(f"sample_ratio must be in [0, 1], got {self.sample_ratio}")
+        if self.max_queue_size < 1 or self.max_export_batch_size < 1:
+            raise ValueError("max_queue_size and max_export_batch_size must be >= 1")
+        if self.max_export_batch_size > self.max_queue_size:
+            raise ValueError("max_export_batch_size must be <= max_queue_size")
+        if self.schedule_delay_ms <= 0 or self.metric_interval_ms <= 0:
+            raise ValueError("schedule_delay_ms and metric_interval_ms must be > 0")
+
+    def with_options(self, raw: Dict[str, str]) -> "TelemetryConfig":
+        """Копия с полями из строк ``key=value``; типы — по текущим значениям."""
+        names = {f.name for f in dataclasses.fields(self)}
+        changes = {}
+        for key, value in raw.items():
+            if key not in names:
+                raise ValueError(f"Unknown telemetry option {key!r}; available: {', '.join(sorted(names))}")
+            current = getattr(self, key)
+            if isinstance(current, bool):
+                if value.lower() not in ("1", "0", "true", "false", "yes", "no", "on", "off"):
+                    raise ValueError(f"Invalid value for {key}: {value!r}")
+                changes[key] = value.lower() in ("1", "true", "yes", "on")
+            else:
+                try:
+                    changes[key] = type(current)(value)
+                except ValueError:
+                    raise ValueError(f"Invalid value for {key}: {value!r}")
+        return dataclasses.replace(self, **changes)
+
+    @property
+    def otlp_endpoint(self) -> str:
+        return self.endpoint or DEFAULT_ENDPOINTS.get(self.exporter, "")
 
-    trace_exporter = OTLPSpanExporter(
-        endpoint="localhost:4317",
-        insecure=True,
+    @property
+    def destination(self) -> str:
+        if self.exporter.startswith("otlp"):
+            return f"-> {self.otlp_endpoint} OTEL Collector"
+        if self.exporter == "file":
+            return f"-> {self.directory}/"
+        return self.exporter
+
+    def sampler(self) -> Sampler:
+        if not self.parent_based:
+            return ALWAYS_ON if self.sample_ratio >= 1.0 else _SpanRatioSampler(self.sample_ratio)
+        if self.sample_ratio >= 1.0:
+            root = ALWAYS_ON
+        elif self.sample_ratio <= 0.0:
+            root = ALWAYS_OFF
+        else:
+            root = TraceIdRatioBased(self.sample_ratio)
+        return ParentBased(root)
+
+    def span_processor(self, exporter) -> BatchSpanProcessor:
+        return BatchSpanProcessor(
+            exporter,
+            max_queue_size=self.max_queue_size,
+            schedule_delay_millis=self.schedule_delay_ms,
+            max_export_batch_size=self.max_export_batch_size,
+        )
+
+    def log_processor(self, exporter) -> BatchLogRecordProcessor:
+        return BatchLogRecordProcessor(
+            exporter,
+            max_queue_size=self.max_queue_size,
+            schedule_delay_millis=self.schedule_delay_ms,
+            max_export_batch_size=self.max_export_batch_size,
+        )
+
+    def metric_reader(self, exporter) -> PeriodicExportingMetricReader:
+        return PeriodicExportingMetricReader(exporter, export_interval_millis=self.metric_interval_ms)
+
+
+def add_telemetry_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = TelemetryConfig()
+    group = parser.add_argument_group("telemetry")
+    group.add_argument(
+        "--telemetry",
+        choices=EXPORTERS,
+        default=defaults.exporter,
+        help="otlp/otlp-http: export to the collector over gRPC/HTTP; file: JSON lines in --telemetry-dir; "
+        "memory: keep in process; noop: SDK that records nothing; disabled: no SDK (default: %(default)s)",
+    )
+    group.add_argument(
+        "--otlp-endpoint",
+        default=defaults.endpoint,
+        help=f"collector address (default: {DEFAULT_ENDPOINTS['otlp']} for otlp, {DEFAULT_ENDPOINTS['otlp-http']} for otlp-http)",
+    )
+    group.add_argument(
+        "--telemetry-dir", default=defaults.directory, help="directory for --telemetry file (default: %(default)s)"
+    )
+    group.add_argument(
+        "--sample-ratio",
+        type=float,
+        default=defaults.sample_ratio,
+        help="fraction of traces recorded, 0..1 (default: %(default)s)",
+    )
+    group.add_argument(
+        "--no-parent-sampling",
+        dest="parent_based",
+        action="store_false",
+        help="sample each child span (e.g. iteration) on its own; root spans are always kept",
+    )
+    group.add_argument("--bsp-max-queue-size", type=int, default=defaults.max_queue_size, help="span/log batch queue size")
+    group.add_argument(
+        "--bsp-schedule-delay-ms", type=float, default=defaults.schedule_delay_ms, help="span/log batch export interval"
+    )
+    group.add_argument(
+        "--bsp-max-export-batch-size", type=int, default=defaults.max_export_batch_size, help="spans/logs per export"
+    )
+    group.add_argument(
+        "--metric-interval-ms", type=float, default=defaults.metric_interval_ms, help="metric export interval"
+    )
+    group.add_argument(
+        "--no-iteration-logs",
+        dest="iteration_logs",
+        action="store_false",
+        help="do not log every benchmark iteration at INFO",
     )
-    tracer_provider = TracerProvider(resource=resource)
-    tracer_provider.add_span_processor(BatchSpanProcessor(trace_exporter))
-    trace.set_tracer_provider(tracer_provider)
 
 
-    metric_exporter = OTLPMetricExporter(
-        endpoint="localhost:4317",
-        insecure=True,
+def telemetry_config_from_args(args: argparse.Namespace) -> TelemetryConfig:
+    return TelemetryConfig(
+        exporter=args.telemetry,
+        endpoint=args.otlp_endpoint,
+        directory=args.telemetry_dir,
+        sample_ratio=args.sample_ratio,
+        parent_based=args.parent_based,
+        max_queue_size=args.bsp_max_queue_size,
+        schedule_delay_ms=args.bsp_schedule_delay_ms,
+        max_export_batch_size=args.bsp_max_export_batch_size,
+        metric_interval_ms=args.metric_interval_ms,
+        iteration_logs=args.iteration_logs,
     )
-    reader = PeriodicExportingMetricReader(
-        metric_exporter,
-        export_interval_millis=10000,
+
+
+def telemetry_argv(cfg: TelemetryConfig) -> List[str]:
+    """Обратное ``telemetry_config_from_args``: аргументы для дочернего процесса."""
+    argv = [
+        "--telemetry", cfg.exporter,
+        "--otlp-endpoint", cfg.endpoint,
+        "--telemetry-dir", cfg.directory,
+        "--sample-ratio", str(cfg.sample_ratio),
+        "--bsp-max-queue-size", str(cfg.max_queue_size),
+        "--bsp-schedule-delay-ms", str(cfg.schedule_delay_ms),
+        "--bsp-max-export-batch-size", str(cfg.max_export_batch_size),
+        "--metric-interval-ms", str(cfg.metric_interval_ms),
+    ]
+    if not cfg.parent_based:
+        argv.append("--no-parent-sampling")
+    if not cfg.iteration_logs:
+        argv.append("--no-iteration-logs")
+    return argv
+
+
+@dataclass
+class Telemetry:
+    """Установленные ``configure_opentelemetry`` провайдеры. ``shutdown``
+    дожидается экспорта всего накопленного — его нужно вызвать перед выходом.
+    """
+
+    exporter: str
+    tracer_provider: Optional[TracerProvider] = None
+    meter_provider: Optional[MeterProvider] = None
+    log_provider: Optional[LoggerProvider] = None
+    handler: Optional[logging.Handler] = None
+
+    def _providers(self):
+        return [p for p in (self.tracer_provider, self.meter_provider, self.log_provider) if p is not None]
+
+    def force_flush(self, timeout_millis: int = 10000) -> bool:
+        flushed = True
+        for provider in self._providers():
+            flushed = provider.force_flush(timeout_millis) is not False and flushed
+        if not flushed:
+            logger.warning("OpenTelemetry %s export did not finish in %d ms", self.exporter, timeout_millis)
+        return flushed
+
+    def shutdown(self, timeout_millis: int = 10000) -> None:
+        self.force_flush(timeout_millis)
+        if self.handler is not None:
+            logging.getLogger().removeHandler(self.handler)
+            self.handler = None
+        for provider in self._providers():
+            provider.shutdown()
+        self.tracer_provider = self.meter_provider = self.log_provider = None
+
+
+def _otlp_http_exporters(endpoint: str):
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as HttpSpanExporter
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter as HttpMetricExporter
+        from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter as HttpLogExporter
+    except ImportError as e:
+        raise RuntimeError(
+            "exporter otlp-http needs opentelemetry-exporter-otlp-proto-http (pip install it)"
+        ) from e
+    base = endpoint.rstrip("/")
+    return (
+        HttpSpanExporter(endpoint=f"{base}/v1/traces"),
+        HttpMetricExporter(endpoint=f"{base}/v1/metrics"),
+        HttpLogExporter(endpoint=f"{base}/v1/logs"),
     )
-    meter_provider = MeterProvider(resource=resource, metric_readers=[reader])
+
+
+def _exporters(cfg: "TelemetryConfig"):
+    """``(span exporter, metric reader, log exporter)``; ``None`` — сигнал никуда не уходит."""
+    if cfg.exporter == "otlp":
+        span_exporter = OTLPSpanExporter(
+            endpoint=cfg.otlp_endpoint,
+            insecure=True,
+        )
+        metric_exporter = OTLPMetricExporter(
+            endpoint=cfg.otlp_endpoint,
+            insecure=True,
+        )
+        log_exporter = OTLPLogExporter(
+            endpoint=cfg.otlp_endpoint,
+            insecure=True,
+        )
+    elif cfg.exporter == "otlp-http":
+        span_exporter, metric_exporter, log_exporter = _otlp_http_exporters(cfg.otlp_endpoint)
+    elif cfg.exporter == "file":
+        span_exporter = JsonLinesSpanExporter(cfg.directory)
+        metric_exporter = JsonLinesMetricExporter(cfg.directory)
+        log_exporter = JsonLinesLogExporter(cfg.directory)
+    elif cfg.exporter == "memory":
+        return InMemorySpanExporter(), InMemoryMetricReader(), InMemoryLogRecordExporter()
+    else:
+        return None, None, None
+    return span_exporter, cfg.metric_reader(metric_exporter), log_exporter
+
+
+def configure_opentelemetry(
+    service_name: str = "http-clients-benchmark", cfg: Optional[TelemetryConfig] = None
+) -> Telemetry:
+    cfg = cfg or TelemetryConfig()
+    if cfg.exporter == "disabled":
+        # глобальные провайдеры не ставятся: API отдаёт no-op tracer/meter
+        logger.info("OpenTelemetry disabled")
+        return Telemetry(cfg.exporter)
+    resource = Resource.create({"service.name": service_name})
+    span_exporter, metric_reader, log_exporter = _exporters(cfg)
+
+
+    # noop: SDK работает, но span'ы не сэмплируются, а метрики и логи никуда не уходят
+    sampler = ALWAYS_OFF if cfg.exporter == "noop" else cfg.sampler()
+    tracer_provider = TracerProvider(resource=resource, sampler=sampler)
+    if span_exporter is not None:
+        tracer_provider.add_span_processor(cfg.span_processor(span_exporter))
+    trace.set_tracer_provider(tracer_provider)
+
+
+    meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader] if metric_reader else [])
     metrics.set_meter_provider(meter_provider)
 
 
-    log_exporter = OTLPLogExporter(
-        endpoint="localhost:4317",
-        insecure=True,
-    )
     log_provider = LoggerProvider(resource=resource)
-    log_provider.add_log_record_processor(BatchLogRecordProcessor(log_exporter))
+    if log_exporter is not None:
+        log_provider.add_log_record_processor(cfg.log_processor(log_exporter))
 
     handler = LoggingHandler(level=logging.INFO, logger_provider=log_provider)
 
@@ -57,7 +356,13 @@ def configure_opentelemetry(service_name: str = "http-clients-benchmark") -> Non
     root_logger.setLevel(logging.INFO)
     root_logger.addHandler(handler)
 
-    logger.info("OpenTelemetry tracing + metrics + logs configured (-> localhost:4317 OTEL Collector)")
+    logger.info(
+        "OpenTelemetry tracing + metrics + logs configured (%s), sample ratio %g%s",
+        cfg.destination,
+        cfg.sample_ratio,
+        " parent-based" if cfg.parent_based else "",
+    )
+    return Telemetry(cfg.exporter, tracer_provider, meter_provider, log_provider, handler)
 
 
 def get_tracer(name: str):
@@ -66,4 +371,3 @@ def get_tracer(name: str):
 
 def get_meter(name: str):
     return metrics.get_meter(name)
-
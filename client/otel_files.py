@@ -0,0 +1,175 @@
+import glob
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from opentelemetry.sdk._logs.export import LogRecordExporter, LogRecordExportResult
+from opentelemetry.sdk.metrics.export import (
+    Histogram,
+    MetricExporter,
+    MetricExportResult,
+    MetricsData,
+)
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+
+# в каталоге — по файлу на сигнал и процесс: воркеры --isolate subprocess
+# пишут параллельно и не мешают друг другу
+SIGNALS = ("spans", "metrics", "logs")
+
+
+def signal_path(directory: str, signal: str, pid: Optional[int] = None) -> str:
+    return os.path.join(directory, f"{signal}-{pid or os.getpid()}.jsonl")
+
+
+def signal_files(directory: str, signal: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"{signal}-*.jsonl")))
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Записи одного файла; битые строки (процесс убит посреди записи) пропускаются."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def read_signal(directory: str, signal: str) -> Iterator[Dict[str, Any]]:
+    """Записи сигнала из всех файлов каталога."""
+    for path in signal_files(directory, signal):
+        yield from read_records(path)
+
+
+def _attrs(attributes) -> Dict[str, Any]:
+    return {k: (list(v) if isinstance(v, tuple) else v) for k, v in (attributes or {}).items()}
+
+
+class _JsonLinesWriter:
+    def __init__(self, directory: str, signal: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = signal_path(directory, signal)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, records) -> None:
+        lines = "".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False) + "\n" for r in records)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(lines)
+
+    def flush(self) -> bool:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Span'ы одной строкой JSON: имя, id, родитель, длительность в мс,
+    статус, атрибуты и число событий.
+    """
+
+    def __init__(self, directory: str):
+        self._writer = _JsonLinesWriter(directory, "spans")
+
+    def export(self, spans) -> SpanExportResult:
+        self._writer.write(
+            {
+                "name": span.name,
+                "trace": format(span.context.trace_id, "032x"),
+                "span": format(span.context.span_id, "016x"),
+                "parent": format(span.parent.span_id, "016x") if span.parent else None,
+                "start": span.start_time,
+                "ms": (span.end_time - span.start_time) / 1e6,
+                "status": span.status.status_code.name,
+                "attrs": _attrs(span.attributes),
+                "events": len(span.events),
+            }
+            for span in spans
+        )
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._writer.flush()
+
+    def shutdown(self) -> None:
+        self._writer.close()
+
+
+class JsonLinesMetricExporter(MetricExporter):
+    """Точки метрик на момент сбора: сумма/значение или, для гистограмм,
+    count/sum/min/max и бакеты. Агрегация кумулятивная — для итога берётся
+    последняя точка каждого ряда.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self._writer = _JsonLinesWriter(directory, "metrics")
+
+    def export(self, metrics_data: MetricsData, timeout_millis: float = 10000, **kwargs) -> MetricExportResult:
+        records = []
+        for rm in metrics_data.resource_metrics:
+            for sm in rm.scope_metrics:
+                for metric in sm.metrics:
+                    for point in metric.data.data_points:
+                        record = {
+                            "name": metric.name,
+                            "unit": metric.unit,
+                            "time": point.time_unix_nano,
+                            "attrs": _attrs(point.attributes),
+                        }
+                        if isinstance(metric.data, Histogram):
+                            record.update(
+                                kind="histogram",
+                                count=point.count,
+                                sum=point.sum,
+                                min=point.min,
+                                max=point.max,
+                                bounds=list(point.explicit_bounds),
+                                counts=list(point.bucket_counts),
+                            )
+                        else:
+                            record.update(kind=type(metric.data).__name__.lower(), value=point.value)
+                        records.append(record)
+        self._writer.write(records)
+        return MetricExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: float = 10000) -> bool:
+        return self._writer.flush()
+
+    def shutdown(self, timeout_millis: float = 30000, **kwargs) -> None:
+        self._writer.close()
+
+
+class JsonLinesLogExporter(LogRecordExporter):
+    """Записи логов: время, уровень, текст и trace/span id, если лог был внутри span'а."""
+
+    def __init__(self, directory: str):
+        self._writer = _JsonLinesWriter(directory, "logs")
+
+    def export(self, batch: Sequence) -> LogRecordExportResult:
+        self._writer.write(
+            {
+                "time": r.log_record.timestamp,
+                "level": r.log_record.severity_text,
+                "body": str(r.log_record.body),
+                "logger": r.instrumentation_scope.name if r.instrumentation_scope else None,
+                "trace": format(r.log_record.trace_id, "032x") if r.log_record.trace_id else None,
+                "span": format(r.log_record.span_id, "016x") if r.log_record.span_id else None,
+            }
+            for r in batch
+        )
+        return LogRecordExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._writer.flush()
+
+    def shutdown(self) -> None:
+        self._writer.close()
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from statistics import mean
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bench_local import wait_ready
+from load import CRUD_OPS
+from mock_server import DEFAULT_PORT as MOCK_PORT
+from otel_config import EXPORTERS
+from otlp_sink import DEFAULT_PORT as SINK_PORT
+from planner import RunSample, SubprocessRunner
+
+
+logger = logging.getLogger("benchmark_otel.matrix")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK = os.path.join(HERE, "benchmark_otel.py")
+# от дешёвого к дорогому; первый — база для разниц
+DEFAULT_MODES = ("disabled", "noop", "memory", "otlp")
+
+
+def _per_request(samples: Sequence[RunSample], value) -> float:
+    requests = sum(s.hist.total_count for s in samples) * CRUD_OPS
+    return sum(value(s) for s in samples) / requests if requests else 0.0
+
+
+def _cells(samples: Sequence[RunSample]) -> Dict[str, float]:
+    return {
+        "it/s": mean(s.throughput for s in samples),
+        "p50 ms": mean(s.hist.value_at_percentile(50) for s in samples),
+        "p99 ms": mean(s.hist.value_at_percentile(99) for s in samples),
+        "cpu us/req": _per_request(samples, lambda s: s.cpu) * 1e6,
+        "gc objs/req": _per_request(samples, lambda s: s.gc_allocs),
+    }
+
+
+def format_matrix(results: Dict[Tuple[str, str], List[RunSample]], clients: Sequence[str], modes: Sequence[str]) -> str:
+    """Клиент x режим телеметрии; в скобках — разница с первым режимом."""
+    metrics = ("it/s", "p50 ms", "p99 ms", "cpu us/req", "gc objs/req")
+    width = 20
+    name_width = max([10] + [len(c) for c in clients]) + 2
+    mode_width = max(len(m) for m in modes) + 2
+    lines = ["client".ljust(name_width) + "mode".ljust(mode_width) + "".join(m.rjust(width) for m in metrics)]
+    for client in clients:
+        base = None
+        for mode in modes:
+            samples = results.get((client, mode))
+            if not samples:
+                continue
+            cells = _cells(samples)
+            base = base or cells
+            row = []
+            for metric in metrics:
+                value, delta = cells[metric], cells[metric] - base[metric]
+                if cells is base:
+                    row.append(f"{value:.2f}")
+                elif metric == "it/s" and base[metric]:
+                    row.append(f"{value:.2f} ({delta / base[metric] * 100:+.1f}%)")
+                else:
+                    row.append(f"{value:.2f} ({delta:+.2f})")
+            lines.append(client.ljust(name_width) + mode.ljust(mode_width) + "".join(c.rjust(width) for c in row))
+    return "\n".join(lines)
+
+
+async def _start(script: str, argv: Sequence[str], port: int, what: str):
+    proc = await asyncio.create_subprocess_exec(sys.executable, os.path.join(HERE, script), *argv)
+    try:
+        await wait_ready("127.0.0.1", port, proc, what=what)
+    except Exception:
+        proc.terminate()
+        await proc.wait()
+        raise
+    return proc
+
+
+async def run_matrix(
+    bench_argv: Sequence[str],
+    clients: Sequence[str],
+    modes: Sequence[str],
+    repetitions: int,
+    sink_port: int,
+    mock_port: Optional[int],
+    cpus: Optional[List[int]],
+) -> Dict[Tuple[str, str], List[RunSample]]:
+    """Каждый клиент в каждом режиме телеметрии отдельным процессом
+    (глобальные провайдеры OTel не переустановить). Режимы одного клиента
+    идут подряд, чтобы сравнение не зависело от дрейфа машины между клиентами.
+    """
+    helpers = []
+    try:
+        if "otlp" in modes:
+            helpers.append(await _start("otlp_sink.py", ["--port", str(sink_port)], sink_port, "OTLP sink"))
+        if mock_port is not None:
+            helpers.append(await _start("mock_server.py", ["--port", str(mock_port)], mock_port, "mock server"))
+
+        results: Dict[Tuple[str, str], List[RunSample]] = {}
+        total = repetitions * len(clients) * len(modes)
+        n = 0
+        for repetition in range(repetitions):
+            for client in clients:
+                for mode in modes:
+                    n += 1
+                    logger.info("run %d/%d: %s, telemetry %s (repetition %d)", n, total, client, mode, repetition + 1)
+                    runner = SubprocessRunner(
+                        BENCHMARK,
+                        [*bench_argv, "--telemetry", mode, "--otlp-endpoint", f"127.0.0.1:{sink_port}"],
+                        cpus,
+                    )
+                    results.setdefault((client, mode), []).append(await runner(client, repetition))
+        return results
+    finally:
+        for proc in reversed(helpers):
+            if proc.returncode is None:
+                proc.terminate()
+                await proc.wait()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run every client under each telemetry mode (disabled, noop SDK, in-memory export, "
+            "OTLP export to a local sink) and report throughput, latency, CPU and GC deltas. "
+            "Unknown options are passed to benchmark_otel.py."
+        )
+    )
+    parser.add_argument(
+        "--telemetry-modes",
+        default=",".join(DEFAULT_MODES),
+        help="comma-separated subset of %(default)s; the first one is the baseline",
+    )
+    parser.add_argument("--matrix-repetitions", type=int, default=1, help="runs per client and mode")
+    parser.add_argument("--sink-port", type=int, default=SINK_PORT, help="port for the local OTLP sink")
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help=f"start mock_server.py on port {MOCK_PORT} and benchmark against it",
+    )
+    args, bench_argv = parser.parse_known_args(argv)
+    modes = [m.strip() for m in args.telemetry_modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in EXPORTERS]
+    if unknown or not modes:
+        parser.error(f"unknown telemetry modes {unknown}; available: {', '.join(EXPORTERS)}")
+    if args.matrix_repetitions < 1:
+        parser.error("--matrix-repetitions must be >= 1")
+    if args.mock and "--base-url" in bench_argv:
+        parser.error("--base-url is set by --mock")
+    for owned in ("--telemetry", "--otlp-endpoint", "--isolate", "--repetitions"):
+        if owned in bench_argv:
+            parser.error(f"{owned} is set by the matrix")
+
+    # импорт здесь: benchmark_otel при загрузке ищет клиенты и настраивает логирование
+    import benchmark_otel
+
+    if args.mock:
+        bench_argv = [*bench_argv, "--base-url", f"http://127.0.0.1:{MOCK_PORT}/users"]
+    bench_args = benchmark_otel.parse_args(bench_argv)
+    if bench_args.mode not in ("iterations", "load", "open"):
+        parser.error(f"--mode {bench_args.mode} is not supported: results are per CRUD iteration")
+
+    results = asyncio.run(
+        run_matrix(
+            benchmark_otel._worker_argv(bench_args),
+            bench_args.clients,
+            modes,
+            args.matrix_repetitions,
+            args.sink_port,
+            MOCK_PORT if args.mock else None,
+            bench_args.cpus,
+        )
+    )
+    logger.info(
+        "--- telemetry overhead (%s mode), mean of %d run(s), deltas vs %s ---\n%s",
+        bench_args.mode,
+        args.matrix_repetitions,
+        modes[0],
+        format_matrix(results, bench_args.clients, modes),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk._logs.export import LogRecordExporter, LogRecordExportResult
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import MetricExporter, MetricExportResult
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+from benchmark_otel import _IterationRecorder
+from clients import ClientSpec
+from instrument import InstrumentedClient, OperationMetrics
+from load import CRUD_OPS, crud_iteration
+from otel_config import TelemetryConfig
+
+
+logger = logging.getLogger("benchmark_otel.overhead")
+
+# сравниваются с базовой линией без телеметрии; ключи — поля TelemetryConfig
+DEFAULT_SETTINGS = (
+    "",
+    "iteration_logs=false",
+    "sample_ratio=0.1",
+    "sample_ratio=0.1;parent_based=false",
+    "sample_ratio=0.1;parent_based=false;iteration_logs=false",
+    "sample_ratio=0",
+    "sample_ratio=0;iteration_logs=false",
+    "max_queue_size=8192;schedule_delay_ms=500;max_export_batch_size=2048",
+)
+
+
+class _NullClient:
+    """CRUD без сети: в замер попадает только инструментирование."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": str(next(self._ids)), **user_data}
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        return {"id": user_id}
+
+    def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": user_id, **user_data}
+
+    def delete_user(self, user_id: str) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class _CountingSpanExporter(SpanExporter):
+    def __init__(self):
+        self.count = 0
+
+    def export(self, spans) -> SpanExportResult:
+        self.count += len(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _CountingLogExporter(LogRecordExporter):
+    def __init__(self):
+        self.count = 0
+
+    def export(self, batch) -> LogRecordExportResult:
+        self.count += len(batch)
+        return LogRecordExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class _DiscardMetricExporter(MetricExporter):
+    def export(self, metrics_data, timeout_millis: float = 10000, **kwargs) -> MetricExportResult:
+        return MetricExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: float = 10000) -> bool:
+        return True
+
+    def shutdown(self, timeout_millis: float = 30000, **kwargs) -> None:
+        pass
+
+
+@dataclass
+class OverheadResult:
+    label: str
+    iterations: int
+    wall: float           # seconds
+    cpu: float            # seconds, весь процесс, включая потоки экспорта
+    spans: int = 0
+    logs: int = 0
+
+    def per_request_us(self, seconds: float) -> float:
+        return seconds / (self.iterations * CRUD_OPS) * 1e6
+
+
+_SPEC = ClientSpec(name="null", factory=_NullClient, is_async=False)
+
+
+def _measure(label: str, iterations: int, cfg: Optional[TelemetryConfig]) -> OverheadResult:
+    """``iterations`` CRUD-итераций тем же кодом, что в режиме iterations
+    бенчмарка; ``cfg=None`` — без телеметрии. Провайдеры локальные (глобальные
+    не трогаются), экспорт — в никуда, поэтому видна цена самого SDK:
+    span'ов, метрик, логов и batch-процессоров. ``force_flush`` входит в замер.
+    """
+    client = _NullClient()
+    if cfg is None:
+        started, cpu_started = time.perf_counter(), time.process_time()
+        for i in range(iterations):
+            crud_iteration(client, i)
+        return OverheadResult(label, iterations, time.perf_counter() - started, time.process_time() - cpu_started)
+
+    resource = Resource.create({"service.name": "otel-overhead"})
+    spans, logs = _CountingSpanExporter(), _CountingLogExporter()
+    tracer_provider = TracerProvider(resource=resource, sampler=cfg.sampler())
+    tracer_provider.add_span_processor(cfg.span_processor(spans))
+    meter_provider = MeterProvider(resource=resource, metric_readers=[cfg.metric_reader(_DiscardMetricExporter())])
+    log_provider = LoggerProvider(resource=resource)
+    log_provider.add_log_record_processor(cfg.log_processor(logs))
+
+    meter = meter_provider.get_meter("otel_overhead")
+    recorder = _IterationRecorder(
+        _SPEC,
+        tracer_provider.get_tracer("otel_overhead"),
+        meter.create_histogram("http_client_iteration_ms", unit="ms"),
+        meter.create_counter("http_client_errors_total", unit="1"),
+        significant_digits=2,
+        log_iterations=cfg.iteration_logs,
+    )
+    instrumented = InstrumentedClient(client, recorder.operations, OperationMetrics.create(meter), recorder.attributes)
+
+    # в OTel идут те же записи, что и в бенчмарке; консоль в замер не входит
+    root = logging.getLogger()
+    handler = LoggingHandler(level=logging.INFO, logger_provider=log_provider)
+    console = [(h, h.level) for h in root.handlers]
+    for h, _ in console:
+        h.setLevel(logging.WARNING)
+    root.addHandler(handler)
+    try:
+        started, cpu_started = time.perf_counter(), time.process_time()
+        with recorder.tracer.start_as_current_span("benchmark.null"):
+            for i in range(iterations):
+                with recorder.iteration(i) as span_iter:
+                    span_iter.set_attribute("user.id", crud_iteration(instrumented, i))
+        tracer_provider.force_flush()
+        log_provider.force_flush()
+        meter_provider.force_flush()
+        wall, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    finally:
+        root.removeHandler(handler)
+        for h, level in console:
+            h.setLevel(level)
+        tracer_provider.shutdown()
+        meter_provider.shutdown()
+        log_provider.shutdown()
+    return OverheadResult(label, iterations, wall, cpu, spans.count, logs.count)
+
+
+def format_overhead_table(baseline: OverheadResult, results: Sequence[OverheadResult]) -> str:
+    """Накладные расходы на HTTP-запрос относительно прогона без телеметрии."""
+    rows = [baseline, *results]
+    width = max(len("setting"), *(len(r.label) for r in rows))
+    header = f"{'setting':<{width}} {'wall us/req':>11} {'+wall':>8} {'cpu us/req':>10} {'+cpu':>8} {'spans':>7} {'logs':>7}"
+    lines = [header, "-" * len(header)]
+    base_wall = baseline.per_request_us(baseline.wall)
+    base_cpu = baseline.per_request_us(baseline.cpu)
+    for r in rows:
+        wall, cpu = r.per_request_us(r.wall), r.per_request_us(r.cpu)
+        lines.append(
+            f"{r.label:<{width}} {wall:>11.2f} {wall - base_wall:>+8.2f} {cpu:>10.2f} {cpu - base_cpu:>+8.2f} "
+            f"{r.spans:>7} {r.logs:>7}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_setting(raw: str) -> TelemetryConfig:
+    options = {}
+    for item in filter(None, (p.strip() for p in raw.split(";"))):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"invalid setting {item!r}, expected key=value")
+        options[key.strip()] = value.strip()
+    return TelemetryConfig().with_options(options)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure OpenTelemetry instrumentation overhead per HTTP request: the benchmark's "
+            "per-iteration spans, metrics and logs around a client that does no I/O."
+        )
+    )
+    parser.add_argument("--iterations", type=int, default=5000, help="CRUD iterations per setting")
+    parser.add_argument("--repetitions", type=int, default=3, help="runs per setting; the fastest is reported")
+    parser.add_argument(
+        "--setting",
+        action="append",
+        default=None,
+        metavar="KEY=V;KEY=V",
+        help="TelemetryConfig fields to try, e.g. 'sample_ratio=0.1;iteration_logs=false'; repeatable",
+    )
+    args = parser.parse_args(argv)
+    try:
+        settings = [(raw or "defaults", _parse_setting(raw)) for raw in (args.setting or DEFAULT_SETTINGS)]
+    except ValueError as e:
+        parser.error(str(e))
+
+    def best(label: str, cfg: Optional[TelemetryConfig]) -> OverheadResult:
+        # минимум по повторам меньше всего зависит от шума
+        return min((_measure(label, args.iterations, cfg) for _ in range(args.repetitions)), key=lambda r: r.wall)
+
+    _measure("warm-up", min(args.iterations, 500), TelemetryConfig())
+    baseline = best("no telemetry", None)
+    results = [best(label, cfg) for label, cfg in settings]
+    logger.info(
+        "--- instrumentation overhead, %d iterations x %d requests, best of %d ---\n%s",
+        args.iterations,
+        CRUD_OPS,
+        args.repetitions,
+        format_overhead_table(baseline, results),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import logging
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import grpc
+from opentelemetry.proto.collector.logs.v1 import logs_service_pb2, logs_service_pb2_grpc
+from opentelemetry.proto.collector.metrics.v1 import metrics_service_pb2, metrics_service_pb2_grpc
+from opentelemetry.proto.collector.trace.v1 import trace_service_pb2, trace_service_pb2_grpc
+
+
+logger = logging.getLogger("otlp_sink")
+
+DEFAULT_PORT = 14317  # 4317 занят коллектором из docker-compose.yml
+
+
+class SinkCounters:
+    """Принятые запросы экспорта и элементы в них, по сигналам."""
+
+    def __init__(self):
+        self.requests: Dict[str, int] = {"traces": 0, "metrics": 0, "logs": 0}
+        self.items: Dict[str, int] = {"traces": 0, "metrics": 0, "logs": 0}
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, signal_name: str, items: int, size: int) -> None:
+        with self._lock:
+            self.requests[signal_name] += 1
+            self.items[signal_name] += items
+            self.bytes += size
+
+    def summary(self) -> str:
+        return (
+            f"{self.items['traces']} spans, {self.items['metrics']} metric points, "
+            f"{self.items['logs']} log records in {sum(self.requests.values())} exports, "
+            f"{self.bytes / 1024:.1f} KiB"
+        )
+
+
+class _TraceSink(trace_service_pb2_grpc.TraceServiceServicer):
+    def __init__(self, counters: SinkCounters):
+        self.counters = counters
+
+    def Export(self, request, context):
+        items = sum(len(ss.spans) for rs in request.resource_spans for ss in rs.scope_spans)
+        self.counters.add("traces", items, request.ByteSize())
+        return trace_service_pb2.ExportTraceServiceResponse()
+
+
+class _MetricsSink(metrics_service_pb2_grpc.MetricsServiceServicer):
+    def __init__(self, counters: SinkCounters):
+        self.counters = counters
+
+    def Export(self, request, context):
+        items = 0
+        for rm in request.resource_metrics:
+            for sm in rm.scope_metrics:
+                for metric in sm.metrics:
+                    kind = metric.WhichOneof("data")  # gauge, sum, histogram, ...
+                    if kind:
+                        items += len(getattr(metric, kind).data_points)
+        self.counters.add("metrics", items, request.ByteSize())
+        return metrics_service_pb2.ExportMetricsServiceResponse()
+
+
+class _LogsSink(logs_service_pb2_grpc.LogsServiceServicer):
+    def __init__(self, counters: SinkCounters):
+        self.counters = counters
+
+    def Export(self, request, context):
+        items = sum(len(sl.log_records) for rl in request.resource_logs for sl in rl.scope_logs)
+        self.counters.add("logs", items, request.ByteSize())
+        return logs_service_pb2.ExportLogsServiceResponse()
+
+
+def start_sink(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = 4):
+    """Заглушка OTLP/gRPC-коллектора: принимает трассы, метрики и логи,
+    считает их и отбрасывает. Нужна, чтобы экспорт в бенчмарке шёл по сети
+    как обычно, но без docker-compose стека и без повторов при отказе.
+    Возвращает ``(grpc.Server, SinkCounters)``.
+    """
+    counters = SinkCounters()
+    server = grpc.server(ThreadPoolExecutor(max_workers=workers, thread_name_prefix="otlp-sink"))
+    trace_service_pb2_grpc.add_TraceServiceServicer_to_server(_TraceSink(counters), server)
+    metrics_service_pb2_grpc.add_MetricsServiceServicer_to_server(_MetricsSink(counters), server)
+    logs_service_pb2_grpc.add_LogsServiceServicer_to_server(_LogsSink(counters), server)
+    if server.add_insecure_port(f"{host}:{port}") == 0:
+        raise RuntimeError(f"cannot listen on {host}:{port}")
+    server.start()
+    return server, counters
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Local OTLP/gRPC sink: accepts and counts telemetry, stores nothing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4, help="gRPC server threads")
+    args = parser.parse_args(argv)
+
+    server, counters = start_sink(args.host, args.port, args.workers)
+    logger.info("OTLP sink on %s:%d", args.host, args.port)
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    stop.wait()
+    server.stop(grace=1).wait()
+    logger.info("OTLP sink received %s", counters.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import logging
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from statistics import mean
+from typing import Any, Dict, List, Optional, Sequence
+
+from load import LoadConfig, LoadResult, run_client_load
+from workload import SHAPES, PayloadSet, format_size, parse_size
+
+
+logger = logging.getLogger("benchmark_otel.payload")
+
+DEFAULT_SIZES = "64,1k,16k,256k,1m,4m"
+# тел в одной CRUD-итерации: запрос и ответ create, ответ get, запрос и ответ update
+BODIES_PER_ITERATION = 5
+
+
+def parse_sizes(raw: str) -> List[int]:
+    sizes = [parse_size(s) for s in raw.split(",") if s.strip()]
+    if not sizes:
+        raise ValueError("no payload sizes given")
+    return sizes
+
+
+def parse_shapes(raw: str) -> List[str]:
+    shapes = [s.strip() for s in raw.split(",") if s.strip()]
+    unknown = [s for s in shapes if s not in SHAPES]
+    if unknown or not shapes:
+        raise ValueError(f"unknown payload shapes {unknown}; available: {', '.join(SHAPES)}")
+    return shapes
+
+
+@dataclass
+class PayloadConfig:
+    sizes: Sequence[int] = field(default_factory=lambda: parse_sizes(DEFAULT_SIZES))
+    shapes: Sequence[str] = SHAPES
+    concurrency: int = 1
+    requests: int = 50            # CRUD-итераций на каждый размер и форму
+    seed: Optional[int] = None
+    significant_digits: int = 2
+
+
+@dataclass
+class PayloadPoint:
+    """Одна точка развёртки: размер и форма тела -> пропускная способность."""
+
+    size: int
+    shape: str
+    bytes: int           # фактический размер тела создания, JSON
+    iterations: int
+    errors: int
+    elapsed: float       # seconds
+    p50: float           # ms на CRUD-итерацию
+    p99: float
+
+    @property
+    def rps(self) -> float:
+        return self.iterations / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.rps * BODIES_PER_ITERATION * self.bytes / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PayloadPoint":
+        return cls(**data)
+
+
+@dataclass
+class PayloadResult(LoadResult):
+    points: List[PayloadPoint] = field(default_factory=list)
+
+
+@lru_cache(maxsize=None)
+def payload_set(size: int, shape: str, seed: Optional[int]) -> PayloadSet:
+    # тела одинаковы для всех клиентов процесса: генерируются один раз
+    return PayloadSet(size, shape, seed=seed)
+
+
+async def run_payload_sweep(
+    spec, cfg: PayloadConfig, duration_hist, errors_counter, op_metrics=None
+) -> PayloadResult:
+    """Сценарий «payload sweep»: для каждой формы и размера тела — ``requests``
+    CRUD-итераций closed-loop нагрузкой ``concurrency`` (как в режиме load).
+    Тела генерируются заранее, до первого замера.
+    """
+    sets = [payload_set(size, shape, cfg.seed) for shape in cfg.shapes for size in cfg.sizes]
+    result = PayloadResult.for_config(
+        spec.name, LoadConfig(concurrency=cfg.concurrency, significant_digits=cfg.significant_digits)
+    )
+    for payloads in sets:
+        load_cfg = LoadConfig(
+            concurrency=cfg.concurrency,
+            duration=None,
+            requests=cfg.requests,
+            significant_digits=cfg.significant_digits,
+            payloads=payloads,
+        )
+        part = await run_client_load(spec, load_cfg, duration_hist, errors_counter, op_metrics)
+        point = PayloadPoint(
+            size=payloads.size,
+            shape=payloads.shape,
+            bytes=payloads.bytes,
+            iterations=part.successes,
+            errors=part.errors,
+            elapsed=part.elapsed,
+            p50=part.hist.value_at_percentile(50),
+            p99=part.hist.value_at_percentile(99),
+        )
+        logger.info(
+            "[%s] payload %s (%d bytes): %.1f it/s, %.2f MB/s, p50 %.2f ms, %d errors",
+            spec.name,
+            payloads.label,
+            point.bytes,
+            point.rps,
+            point.mb_per_s,
+            point.p50,
+            point.errors,
+        )
+        result.merge(part)
+        result.elapsed += part.elapsed
+        result.points.append(point)
+    return result
+
+
+def _averaged(points: Sequence[PayloadPoint]) -> Dict[tuple, Dict[str, float]]:
+    """Среднее по повторностям для каждой пары (форма, размер)."""
+    grouped: Dict[tuple, List[PayloadPoint]] = {}
+    for p in points:
+        grouped.setdefault((p.shape, p.size), []).append(p)
+    return {
+        key: {
+            "bytes": mean(p.bytes for p in runs),
+            "rps": mean(p.rps for p in runs),
+            "mb_per_s": mean(p.mb_per_s for p in runs),
+            "p50": mean(p.p50 for p in runs),
+            "errors": sum(p.errors for p in runs),
+        }
+        for key, runs in grouped.items()
+    }
+
+
+def format_payload_chart(points_by_client: Dict[str, Sequence[PayloadPoint]], width: int = 40) -> str:
+    """Пропускная способность от размера тела: по форме тела — размеры x клиенты,
+    полоса — МБ/с относительно лучшего клиента на этой форме. Где полоса
+    перестаёт расти с размером, упор уже в JSON и обработку тела, а не в запросы.
+    """
+    averaged = {client: _averaged(points) for client, points in points_by_client.items()}
+    keys = sorted({key for per_client in averaged.values() for key in per_client}, key=lambda k: (SHAPES.index(k[0]), k[1]))
+    name_width = max([6] + [len(c) for c in averaged])
+    lines = []
+    for shape in [s for s in SHAPES if any(k[0] == s for k in keys)]:
+        shape_keys = [k for k in keys if k[0] == shape]
+        best = max(
+            (averaged[c][k]["mb_per_s"] for c in averaged for k in shape_keys if k in averaged[c]), default=0.0
+        )
+        lines.append(f"{shape}:")
+        lines.append(
+            f"  {'size':>6} {'client':<{name_width}} {'it/s':>9} {'MB/s':>8} {'p50 ms':>8}  throughput"
+        )
+        for key in shape_keys:
+            for client, per_client in averaged.items():
+                if key not in per_client:
+                    continue
+                row = per_client[key]
+                bar = "#" * (round(row["mb_per_s"] / best * width) if best > 0 else 0)
+                errors = f"  {row['errors']:d} errors" if row["errors"] else ""
+                lines.append(
+                    f"  {format_size(key[1]):>6} {client:<{name_width}} {row['rps']:>9.1f} {row['mb_per_s']:>8.2f} "
+                    f"{row['p50']:>8.2f}  {bar}{errors}"
+                )
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def report_payload(result: PayloadResult, cfg: PayloadConfig) -> None:
+    logger.info(
+        "--- %s payload sweep summary (concurrency=%d, %d iterations per point) ---\n%s",
+        result.name,
+        cfg.concurrency,
+        cfg.requests,
+        format_payload_chart({result.name: result.points}),
+    )
@@ -0,0 +1,256 @@
+import asyncio
+import gc
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from statistics import mean, stdev
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from clients.hdr import LatencyHistogram
+from instrument import OperationStats
+
+
+logger = logging.getLogger("benchmark_otel.planner")
+
+
+@dataclass
+class RunSample:
+    """Результат одного прогона одного клиента (одной повторности)."""
+
+    client: str
+    repetition: int
+    hist: LatencyHistogram
+    errors: int = 0
+    missed: int = 0
+    elapsed: float = 0.0  # seconds, без прогрева
+    operations: OperationStats = field(default_factory=OperationStats)
+    cpu: float = 0.0      # seconds процессорного времени процесса за прогон
+    gc_allocs: int = 0    # см. gc_allocations()
+    points: List[Dict[str, Any]] = field(default_factory=list)  # payload: точки развёртки
+
+    @property
+    def throughput(self) -> float:
+        return self.hist.total_count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "client": self.client,
+            "repetition": self.repetition,
+            "hist": self.hist.to_dict(),
+            "errors": self.errors,
+            "missed": self.missed,
+            "elapsed": self.elapsed,
+            "operations": self.operations.to_dict(),
+            "cpu": self.cpu,
+            "gc_allocs": self.gc_allocs,
+            "points": self.points,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunSample":
+        return cls(
+            client=data["client"],
+            repetition=data["repetition"],
+            hist=LatencyHistogram.from_dict(data["hist"]),
+            errors=data["errors"],
+            missed=data["missed"],
+            elapsed=data["elapsed"],
+            operations=OperationStats.from_dict(data["operations"]),
+            cpu=data.get("cpu", 0.0),
+            gc_allocs=data.get("gc_allocs", 0),
+            points=data.get("points", []),
+        )
+
+
+@dataclass
+class RunPlan:
+    """Порядок прогонов: каждый клиент отдельно, ``repetitions`` раз,
+    при ``shuffle`` — в случайном порядке внутри каждой повторности,
+    с паузой ``cooldown`` секунд между прогонами.
+    """
+
+    clients: Sequence[str]
+    repetitions: int = 1
+    shuffle: bool = False
+    seed: Optional[int] = None
+    cooldown: float = 0.0
+
+    def schedule(self) -> List[Tuple[int, str]]:
+        rng = random.Random(self.seed)
+        runs = []
+        for repetition in range(self.repetitions):
+            order = list(self.clients)
+            if self.shuffle:
+                rng.shuffle(order)
+            runs.extend((repetition, client) for client in order)
+        return runs
+
+    async def execute(
+        self, run_one: Callable[[str, int], Awaitable[RunSample]]
+    ) -> List[RunSample]:
+        runs = self.schedule()
+        samples = []
+        for n, (repetition, client) in enumerate(runs):
+            logger.info("run %d/%d: %s (repetition %d)", n + 1, len(runs), client, repetition + 1)
+            samples.append(await run_one(client, repetition))
+            if self.cooldown > 0 and n + 1 < len(runs):
+                await asyncio.sleep(self.cooldown)
+        return samples
+
+
+def gc_allocations() -> int:
+    """Сколько отслеживаемых GC объектов создано с начала процесса. Сборка
+    поколения 0 запускается после ``threshold0`` аллокаций за вычетом
+    освобождений, поэтому счёт чистый: объекты, умершие до ближайшей сборки,
+    не видны. Общего счётчика аллокаций у CPython нет; это оценка того,
+    сколько объектов переживает запрос (очереди span'ов, буферы логов).
+    """
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    return collections * gc.get_threshold()[0] + gc.get_count()[0]
+
+
+def pin_cpus(cpus: Optional[Sequence[int]], pid: int = 0) -> None:
+    if not cpus:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        raise RuntimeError("CPU affinity is not supported on this platform")
+    os.sched_setaffinity(pid, set(cpus))
+
+
+class SubprocessRunner:
+    """Запускает каждый прогон в новом интерпретаторе: ни пулов соединений,
+    ни прогретого JIT-кэша, ни мусора от предыдущего клиента.
+    Ребёнок пишет ``RunSample`` в JSON-файл (``--worker-output``).
+    """
+
+    def __init__(self, script: str, argv: Sequence[str], cpus: Optional[Sequence[int]] = None):
+        self.script = script
+        self.argv = list(argv)
+        self.cpus = list(cpus) if cpus else None
+
+    async def __call__(self, client: str, repetition: int) -> RunSample:
+        fd, output = tempfile.mkstemp(prefix=f"bench-{client}-", suffix=".json")
+        os.close(fd)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable,
+                self.script,
+                *self.argv,
+                "--clients", client,
+                "--repetitions", "1",
+                "--isolate", "inline",
+                "--worker-output", output,
+                "--worker-repetition", str(repetition),
+                preexec_fn=(lambda: pin_cpus(self.cpus)) if self.cpus else None,
+            )
+            code = await proc.wait()
+            if code != 0:
+                raise RuntimeError(f"benchmark worker for {client} exited with code {code}")
+            with open(output, "r", encoding="utf-8") as f:
+                return RunSample.from_dict(json.load(f))
+        finally:
+            os.unlink(output)
+
+
+# двусторонние критические значения t-распределения для 95 %, df = 1..30
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def confidence_interval(values: Sequence[float]) -> Tuple[float, float]:
+    """Среднее и полуширина 95 % доверительного интервала (t-распределение)."""
+    if not values:
+        return 0.0, 0.0
+    m = mean(values)
+    if len(values) < 2:
+        return m, math.nan
+    df = len(values) - 1
+    t = _T95[df - 1] if df <= len(_T95) else 1.96
+    return m, t * stdev(values) / math.sqrt(len(values))
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # цепная дробь для неполной бета-функции (метод Лентца)
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1) < 1e-12:
+            break
+    return h
+
+
+def _incomplete_beta(a: float, b: float, x: float) -> float:
+    """Регуляризованная неполная бета-функция I_x(a, b)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1 - front * _betacf(b, a, 1 - x) / b
+
+
+def welch_t_test(a: Sequence[float], b: Sequence[float]) -> float:
+    """Двусторонний p-value t-теста Уэлча (дисперсии не предполагаются
+    равными); ``nan``, если в какой-то выборке меньше двух значений.
+    """
+    if len(a) < 2 or len(b) < 2:
+        return math.nan
+    va, vb = stdev(a) ** 2 / len(a), stdev(b) ** 2 / len(b)
+    if va + vb == 0:
+        return 1.0 if mean(a) == mean(b) else 0.0
+    t = (mean(a) - mean(b)) / math.sqrt(va + vb)
+    df = (va + vb) ** 2 / (va**2 / (len(a) - 1) + vb**2 / (len(b) - 1))
+    return _incomplete_beta(df / 2, 0.5, df / (df + t * t))
+
+
+CI_METRICS: Dict[str, Callable[[RunSample], float]] = {
+    "mean ms": lambda s: s.hist.mean,
+    "p50 ms": lambda s: s.hist.value_at_percentile(50),
+    "p99 ms": lambda s: s.hist.value_at_percentile(99),
+    "it/s": lambda s: s.throughput,
+}
+
+
+def by_client(samples: Sequence[RunSample]) -> Dict[str, List[RunSample]]:
+    grouped: Dict[str, List[RunSample]] = {}
+    for sample in samples:
+        grouped.setdefault(sample.client, []).append(sample)
+    return grouped
+
+
+def format_ci_table(samples: Sequence[RunSample]) -> str:
+    """Клиенты x метрики: ``среднее ± полуширина 95 % ДИ`` по повторностям."""
+    grouped = by_client(samples)
+    width = 20
+    name_width = max([10] + [len(n) for n in grouped])
+    lines = [
+        "".ljust(name_width) + "   n" + "".join(m.rjust(width) for m in CI_METRICS)
+    ]
+    for client, runs in grouped.items():
+        cells = []
+        for metric in CI_METRICS.values():
+            m, half = confidence_interval([metric(s) for s in runs])
+            cells.append(f"{m:.2f}" if math.isnan(half) else f"{m:.2f} ± {half:.2f}")
+        lines.append(client.ljust(name_width) + f"{len(runs):4d}" + "".join(c.rjust(width) for c in cells))
+    return "\n".join(lines)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from load import LoadConfig, LoadResult, _Budget
+from workload import ZipfKeys, make_user_payload
+
+
+logger = logging.getLogger("benchmark_otel.reads")
+
+
+@dataclass
+class ReadConfig:
+    keys: int = 1000                  # пользователей, создаваемых под чтение
+    zipf_s: float = 1.1               # перекос распределения ключей, 0 — равномерно
+    concurrency: int = 10             # одновременных читателей на одном клиенте
+    duration: Optional[float] = 10.0  # seconds; игнорируется, если задан requests
+    requests: Optional[int] = None    # всего чтений на клиента
+    seed: Optional[int] = None
+    significant_digits: int = 2
+
+
+@dataclass
+class ReadResult(LoadResult):
+    coalesced: int = 0    # чтений, присоединившихся к чужому запросу
+    cache_hits: int = 0   # чтений из кэша без запроса
+
+    @property
+    def sent(self) -> int:
+        """GET-запросов, ушедших на сервер."""
+        return max(0, self.total - self.coalesced - self.cache_hits)
+
+
+class _Reader:
+    """Чтения ``get_user`` по Zipf-распределённым ключам; один клиент на всех
+    читателей, иначе одновременные одинаковые запросы не встретятся.
+    """
+
+    def __init__(self, cfg: ReadConfig, result: ReadResult, ids: List[Any], attributes: Dict[str, Any], errors_counter):
+        self.result = result
+        self.ids = ids
+        self.keys = ZipfKeys(len(ids), cfg.zipf_s, cfg.seed)
+        self.budget = _Budget(LoadConfig(duration=cfg.duration, requests=cfg.requests), time.perf_counter())
+        self.attributes = attributes
+        self.errors_counter = errors_counter
+        self._lock = threading.Lock()
+
+    def next_id(self) -> Optional[Any]:
+        if self.budget.next() is None:
+            return None
+        return self.ids[self.keys.sample()]
+
+    def record(self, started: float, user: Any) -> None:
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            if user is not None:
+                self.result.hist.record(duration_ms)
+                self.result.operations.hist("get_user").record(duration_ms)
+            else:
+                self.result.errors += 1
+                self.errors_counter.add(1, attributes={**self.attributes, "operation": "get_user"})
+
+    def finish(self, client, started: float) -> None:
+        self.result.elapsed = time.perf_counter() - started
+        flight = getattr(client, "flight", None)
+        cache = getattr(client, "cache", None)
+        self.result.coalesced = flight.shared if flight is not None else 0
+        self.result.cache_hits = cache.hits if cache is not None else 0
+
+
+def _created_ids(created) -> List[Any]:
+    return [c["id"] for c in created if c and "id" in c]
+
+
+def _read_sync(client, cfg: ReadConfig, result: ReadResult, attributes, errors_counter) -> None:
+    users = [make_user_payload(i) for i in range(cfg.keys)]
+    ids = _created_ids(client.create_users(users, concurrency=cfg.concurrency))
+    if not ids:
+        logger.error("[%s] could not create users to read", result.name)
+        return
+    reader = _Reader(cfg, result, ids, attributes, errors_counter)
+
+    def worker() -> None:
+        while (user_id := reader.next_id()) is not None:
+            started = time.perf_counter()
+            try:
+                user = client.get_user(user_id)
+            except Exception as e:
+                logger.debug("[%s] error reading %s: %s", result.name, user_id, e)
+                user = None
+            reader.record(started, user)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=cfg.concurrency) as pool:
+        for f in [pool.submit(worker) for _ in range(cfg.concurrency)]:
+            f.result()
+    reader.finish(client, started)
+    client.delete_users(ids, concurrency=cfg.concurrency)
+
+
+async def _read_async(client, cfg: ReadConfig, result: ReadResult, attributes, errors_counter) -> None:
+    users = [make_user_payload(i) for i in range(cfg.keys)]
+    ids = _created_ids(await client.create_users(users, concurrency=cfg.concurrency))
+    if not ids:
+        logger.error("[%s] could not create users to read", result.name)
+        return
+    reader = _Reader(cfg, result, ids, attributes, errors_counter)
+
+    async def worker() -> None:
+        while (user_id := reader.next_id()) is not None:
+            started = time.perf_counter()
+            try:
+                user = await client.get_user(user_id)
+            except Exception as e:
+                logger.debug("[%s] error reading %s: %s", result.name, user_id, e)
+                user = None
+            reader.record(started, user)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(cfg.concurrency)))
+    reader.finish(client, started)
+    await client.delete_users(ids, concurrency=cfg.concurrency)
+
+
+def _run_sync(spec, cfg: ReadConfig, result: ReadResult, attributes, errors_counter) -> None:
+    client = spec.factory()
+    try:
+        _read_sync(client, cfg, result, attributes, errors_counter)
+    finally:
+        client.close()
+
+
+async def run_skewed_reads(spec, cfg: ReadConfig, errors_counter) -> ReadResult:
+    """Сценарий «skewed reads»: ``keys`` пользователей создаются пакетно, затем
+    ``concurrency`` читателей вызывают ``get_user`` с Zipf-распределёнными id.
+    С ``coalesce=true`` / ``cache=true`` у клиента видно, сколько запросов
+    удалось не отправить; в конце пользователи удаляются.
+    """
+    result = ReadResult.for_config(
+        spec.name,
+        LoadConfig(concurrency=cfg.concurrency, significant_digits=cfg.significant_digits),
+    )
+    attributes = {"client.name": spec.name, "client.type": spec.kind, "bench.mode": "reads"}
+    if spec.is_async:
+        async with spec.factory() as client:
+            await _read_async(client, cfg, result, attributes, errors_counter)
+    else:
+        await asyncio.to_thread(_run_sync, spec, cfg, result, attributes, errors_counter)
+    return result
+
+
+def report_reads(result: ReadResult, cfg: ReadConfig) -> None:
+    logger.info(
+        "--- %s skewed reads summary (concurrency=%d, zipf s=%g over %d keys) ---",
+        result.name,
+        result.concurrency,
+        cfg.zipf_s,
+        cfg.keys,
+    )
+    logger.info("  reads:      %d", result.total)
+    logger.info("  errors:     %d (%.2f%%)", result.errors, result.error_rate * 100)
+    logger.info("  throughput: %.1f reads/s", result.rps)
+    if result.total:
+        logger.info(
+            "  sent:       %d GETs (%.1f%% saved: %d coalesced, %d cache hits)",
+            result.sent,
+            (1 - result.sent / result.total) * 100,
+            result.coalesced,
+            result.cache_hits,
+        )
+    if result.hist.total_count:
+        for q, value in result.hist.percentiles((50, 95, 99)).items():
+            logger.info("  p%-9s %.2f ms", f"{q:g}:", value)
@@ -0,0 +1,166 @@
+import datetime
+import json
+import os
+import platform
+import socket
+import subprocess
+from dataclasses import dataclass, field
+from importlib import metadata
+from typing import Any, Dict, List, Optional
+
+from planner import RunSample
+
+
+FORMAT_VERSION = 1
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# версии пакетов, от которых зависят цифры
+PACKAGES = (
+    "requests",
+    "httpx",
+    "h2",
+    "aiohttp",
+    "urllib3",
+    "orjson",
+    "opentelemetry-sdk",
+    "opentelemetry-exporter-otlp-proto-grpc",
+)
+
+# параметры benchmark_otel, определяющие сценарий; остальное — способ запуска
+SCENARIO_ARGS = (
+    "mode",
+    "base_url",
+    "iterations",
+    "warmup_iterations",
+    "concurrency",
+    "duration",
+    "requests",
+    "warmup",
+    "rate",
+    "max_inflight",
+    "bulk_items",
+    "bulk_size",
+    "read_keys",
+    "zipf",
+    "seed",
+    "payload_sizes",
+    "payload_shapes",
+)
+
+
+def git_revision(path: str = HERE) -> Dict[str, Any]:
+    """Коммит дерева с бенчмарком и есть ли незакоммиченные изменения."""
+    try:
+        commit = subprocess.run(
+            ["git", "-C", path, "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "-C", path, "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": bool(status.strip())}
+
+
+def _package_versions() -> Dict[str, str]:
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    return versions
+
+
+def environment(cpus: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Отпечаток машины и окружения: сравнивать имеет смысл прогоны с одинаковым."""
+    env = {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "cpus": list(cpus) if cpus else None,
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "packages": _package_versions(),
+    }
+    if hasattr(os, "getloadavg"):
+        env["loadavg"] = [round(v, 2) for v in os.getloadavg()]
+    return env
+
+
+@dataclass
+class BenchmarkResult:
+    """Результат одного запуска бенчмарка: сценарий, окружение, ревизия
+    и все прогоны со своими гистограммами.
+    """
+
+    scenario: Dict[str, Any]
+    samples: List[RunSample]
+    environment: Dict[str, Any] = field(default_factory=environment)
+    git: Dict[str, Any] = field(default_factory=git_revision)
+    created: str = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"))
+
+    @property
+    def clients(self) -> List[str]:
+        return list(dict.fromkeys(s.client for s in self.samples))
+
+    @property
+    def label(self) -> str:
+        commit = (self.git.get("commit") or "unknown")[:10]
+        return f"{commit}{'+' if self.git.get('dirty') else ''} {self.created}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": FORMAT_VERSION,
+            "created": self.created,
+            "scenario": self.scenario,
+            "environment": self.environment,
+            "git": self.git,
+            "samples": [s.to_dict() for s in self.samples],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkResult":
+        if data.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported result format {data.get('format')!r}")
+        return cls(
+            scenario=data["scenario"],
+            samples=[RunSample.from_dict(s) for s in data["samples"]],
+            environment=data["environment"],
+            git=data["git"],
+            created=data["created"],
+        )
+
+    def dump(self, directory: str) -> str:
+        """Пишет ``<directory>/<время>-<режим>.json`` и возвращает путь."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.created.replace(":", "").replace("-", "").split("+")[0]
+        path = os.path.join(directory, f"{stamp}-{self.scenario.get('mode', 'run')}.json")
+        n = 1
+        while os.path.exists(path):
+            n += 1
+            path = os.path.join(directory, f"{stamp}-{self.scenario.get('mode', 'run')}-{n}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "BenchmarkResult":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def scenario_from_args(args) -> Dict[str, Any]:
+    scenario = {name: getattr(args, name) for name in SCENARIO_ARGS}
+    scenario.update(
+        repetitions=args.repetitions,
+        isolate=args.isolate,
+        telemetry=args.telemetry.exporter,
+        sample_ratio=args.telemetry.sample_ratio,
+    )
+    return scenario
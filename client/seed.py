@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from load import LoadConfig, LoadResult
+from workload import make_user_payload, make_update_payload
+
+
+logger = logging.getLogger("benchmark_otel.seed")
+
+
+@dataclass
+class BulkConfig:
+    items: int = 1000          # пользователей на прогон
+    concurrency: int = 16      # одновременных запросов (одиночных или пачек)
+    bulk_size: int = 500       # элементов в пачке, если сервер умеет пакетный эндпоинт
+    significant_digits: int = 2
+
+
+class _BatchRecorder:
+    """Колбэк ``on_batch`` для пакетных методов клиента. В гистограмму идёт
+    время запроса, поделённое на число элементов в нём (мс на элемент),
+    с весом по успешным элементам — так ``hist.total_count / elapsed``
+    даёт элементы в секунду.
+    """
+
+    def __init__(self, result: LoadResult, attributes: Dict[str, Any], errors_counter):
+        self.result = result
+        self.attributes = attributes
+        self.errors_counter = errors_counter
+        self._lock = threading.Lock()  # синхронные клиенты зовут колбэк из пула потоков
+
+    def on_batch(self, operation: str):
+        def record(items: int, ok: int, duration_ms: float) -> None:
+            per_item_ms = duration_ms / items
+            with self._lock:
+                if ok:
+                    self.result.hist.record(per_item_ms, ok)
+                    self.result.operations.hist(operation).record(per_item_ms, ok)
+                if ok < items:
+                    self.result.errors += items - ok
+                    self.errors_counter.add(items - ok, attributes={**self.attributes, "operation": operation})
+
+        return record
+
+    def phase(self, operation: str, ok: int, seconds: float) -> None:
+        self.result.elapsed += seconds
+        logger.info(
+            "[%s] bulk %s: %d items in %.2fs (%.1f items/s)",
+            self.result.name,
+            operation,
+            ok,
+            seconds,
+            ok / seconds if seconds > 0 else 0.0,
+        )
+
+
+def _updates(created: Sequence[Optional[Dict[str, Any]]], users: List[Dict[str, Any]]):
+    return [(c["id"], make_update_payload(u)) for c, u in zip(created, users) if c and "id" in c]
+
+
+def _seed_sync(client, cfg: BulkConfig, recorder: _BatchRecorder) -> None:
+    users = [make_user_payload(i) for i in range(cfg.items)]
+    opts = {"concurrency": cfg.concurrency, "bulk_size": cfg.bulk_size}
+
+    started = time.perf_counter()
+    created = client.create_users(users, on_batch=recorder.on_batch("create"), **opts)
+    recorder.phase("create", sum(c is not None for c in created), time.perf_counter() - started)
+
+    updates = _updates(created, users)
+    started = time.perf_counter()
+    updated = client.update_users(updates, on_batch=recorder.on_batch("update"), **opts)
+    recorder.phase("update", sum(u is not None for u in updated), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    deleted = client.delete_users([user_id for user_id, _ in updates], on_batch=recorder.on_batch("delete"), **opts)
+    recorder.phase("delete", sum(deleted), time.perf_counter() - started)
+
+
+async def _seed_async(client, cfg: BulkConfig, recorder: _BatchRecorder) -> None:
+    users = [make_user_payload(i) for i in range(cfg.items)]
+    opts = {"concurrency": cfg.concurrency, "bulk_size": cfg.bulk_size}
+
+    started = time.perf_counter()
+    created = await client.create_users(users, on_batch=recorder.on_batch("create"), **opts)
+    recorder.phase("create", sum(c is not None for c in created), time.perf_counter() - started)
+
+    updates = _updates(created, users)
+    started = time.perf_counter()
+    updated = await client.update_users(updates, on_batch=recorder.on_batch("update"), **opts)
+    recorder.phase("update", sum(u is not None for u in updated), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    deleted = await client.delete_users(
+        [user_id for user_id, _ in updates], on_batch=recorder.on_batch("delete"), **opts
+    )
+    recorder.phase("delete", sum(deleted), time.perf_counter() - started)
+
+
+def _run_sync(spec, cfg: BulkConfig, recorder: _BatchRecorder) -> None:
+    client = spec.factory()
+    try:
+        _seed_sync(client, cfg, recorder)
+    finally:
+        client.close()
+
+
+async def run_bulk_seed(spec, cfg: BulkConfig, errors_counter) -> LoadResult:
+    """Сценарий «bulk seed»: ``items`` пользователей создаются, обновляются
+    и удаляются пакетными методами клиента; каждая фаза замеряется отдельно.
+    """
+    result = LoadResult.for_config(
+        spec.name,
+        LoadConfig(concurrency=cfg.concurrency, significant_digits=cfg.significant_digits),
+    )
+    attributes = {"client.name": spec.name, "client.type": spec.kind}
+    recorder = _BatchRecorder(result, attributes, errors_counter)
+    if spec.is_async:
+        async with spec.factory() as client:
+            await _seed_async(client, cfg, recorder)
+    else:
+        await asyncio.to_thread(_run_sync, spec, cfg, recorder)
+    return result
+
+
+def report_bulk(result: LoadResult) -> None:
+    logger.info("--- %s bulk seed summary (concurrency=%d) ---", result.name, result.concurrency)
+    logger.info("  items:      %d", result.total)
+    logger.info("  errors:     %d (%.2f%%)", result.errors, result.error_rate * 100)
+    logger.info("  throughput: %.1f items/s", result.rps)
+    if result.hist.total_count:
+        for q, value in result.hist.percentiles((50, 99)).items():
+            logger.info("  p%-9s %.3f ms/item", f"{q:g}:", value)
@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_server import MockConfig, start_server  # noqa: E402
+
+
+@pytest.fixture
+def users_api():
+    """Mock users API в отдельном потоке со своим циклом событий:
+    синхронные клиенты ходят в него по настоящему TCP.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def serve():
+        server = await start_server(MockConfig(port=0))
+        state["server"] = server
+        state["port"] = server.sockets[0].getsockname()[1]
+        started.set()
+        async with server:
+            await server.serve_forever()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(serve())
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(5), "mock server did not start"
+    try:
+        yield f"http://127.0.0.1:{state['port']}/users"
+    finally:
+        loop.call_soon_threadsafe(state["server"].close)
+        thread.join(5)
+        loop.close()
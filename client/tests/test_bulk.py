@@ -0,0 +1,164 @@
+import itertools
+
+import pytest
+
+from clients.bulk import AsyncBulkUsers, BulkUsers
+from clients.urllib_client import UrllibUserClient
+
+
+class FakeServer:
+    """Пакетный эндпоинт в памяти; ``capabilities`` — ответы на OPTIONS по очереди."""
+
+    def __init__(self, *capabilities):
+        self.capabilities = list(capabilities)
+        self.requests = []
+        self.invalidated = []
+        self._ids = itertools.count(1)
+
+    def request(self, method, path, data=None):
+        self.requests.append((method, path, len(data["items"]) if data else None))
+        if method == "OPTIONS":
+            return self.capabilities.pop(0) if self.capabilities else None
+        op = data["op"]
+        if op == "create":
+            return {"results": [{**item, "id": str(next(self._ids))} for item in data["items"]]}
+        if op == "update":
+            return {"results": [{**item["data"], "id": item["id"]} for item in data["items"]]}
+        return {"results": [True for _ in data["items"]]}
+
+    def bulk_posts(self):
+        return [n for method, _, n in self.requests if method == "POST"]
+
+
+class SyncClient(BulkUsers):
+    def __init__(self, server):
+        self.server = server
+        self.singles = []
+
+    def _request(self, method, path, data=None):
+        return self.server.request(method, path, data)
+
+    def _invalidate(self, *paths):
+        self.server.invalidated.append(paths)
+
+    def create_user(self, user):
+        self.singles.append(user)
+        return {**user, "id": f"single-{len(self.singles)}"}
+
+    def update_user(self, user_id, data):
+        self.singles.append(user_id)
+        return {**data, "id": user_id}
+
+    def delete_user(self, user_id):
+        self.singles.append(user_id)
+        return True
+
+
+class AsyncClient(AsyncBulkUsers):
+    def __init__(self, server):
+        self.server = server
+        self.singles = []
+
+    async def _request(self, method, path, data=None):
+        return self.server.request(method, path, data)
+
+    def _invalidate(self, *paths):
+        self.server.invalidated.append(paths)
+
+    async def create_user(self, user):
+        self.singles.append(user)
+        return {**user, "id": f"single-{len(self.singles)}"}
+
+
+BULK = {"bulk": "/bulk", "max_items": 3}
+USERS = [{"name": f"u{i}"} for i in range(7)]
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_chunks_respect_server_max_items(concurrency):
+    server = FakeServer(BULK)
+    client = SyncClient(server)
+    batches = []
+
+    created = client.create_users(USERS, concurrency=concurrency, bulk_size=5, on_batch=lambda *b: batches.append(b))
+
+    assert sorted(server.bulk_posts()) == [1, 3, 3]
+    assert [u["name"] for u in created] == [u["name"] for u in USERS]  # порядок входа
+    assert sorted((n, ok) for n, ok, _ in batches) == [(1, 1), (3, 3), (3, 3)]
+    assert client.singles == []
+
+
+def test_update_and_delete_through_bulk_endpoint():
+    server = FakeServer(BULK)
+    client = SyncClient(server)
+
+    updated = client.update_users([("1", {"name": "a"}), ("2", {"name": "b"})], bulk_size=10)
+    assert updated == [{"name": "a", "id": "1"}, {"name": "b", "id": "2"}]
+    assert client.delete_users(["1", "2"]) == [True, True]
+    assert server.invalidated[-1] == ("/1", "/2", "")
+
+
+def test_unmatched_bulk_response_fails_every_item():
+    server = FakeServer(BULK)
+    server.request = lambda method, path, data=None: BULK if method == "OPTIONS" else {"results": [True]}
+    client = SyncClient(server)
+
+    assert client.delete_users(["1", "2"]) == [False, False]
+    assert client.create_users([{"name": "a"}, {"name": "b"}]) == [None, None]
+
+
+def test_falls_back_to_single_requests_without_bulk_endpoint():
+    server = FakeServer({})  # сервер ответил, пакетного эндпоинта нет
+    client = SyncClient(server)
+    batches = []
+
+    created = client.create_users(USERS[:3], concurrency=2, on_batch=lambda *b: batches.append(b))
+
+    assert len(client.singles) == 3
+    assert all(u["id"].startswith("single-") for u in created)
+    assert server.bulk_posts() == []
+    assert [(n, ok) for n, ok, _ in batches] == [(1, 1)] * 3
+
+    client.create_users(USERS[:1])
+    assert [r[0] for r in server.requests].count("OPTIONS") == 1  # ответ запомнен
+
+
+def test_failed_probe_is_retried_on_next_call():
+    server = FakeServer(None, BULK)  # первый OPTIONS не удался
+    client = SyncClient(server)
+
+    client.create_users(USERS[:2])
+    assert server.bulk_posts() == []
+    assert len(client.singles) == 2
+
+    client.create_users(USERS[:2])
+    assert server.bulk_posts() == [2]
+    assert [r[0] for r in server.requests].count("OPTIONS") == 2
+
+
+@pytest.mark.asyncio
+async def test_async_chunks_and_fallback():
+    server = FakeServer(None, BULK)
+    client = AsyncClient(server)
+
+    created = await client.create_users(USERS, concurrency=2)
+    assert len(client.singles) == 7 and len(created) == 7
+
+    created = await client.create_users(USERS, bulk_size=2)
+    assert sorted(server.bulk_posts()) == [1, 2, 2, 2]
+    assert [u["name"] for u in created] == [u["name"] for u in USERS]
+
+
+def test_bulk_round_trip_against_mock_server(users_api):
+    client = UrllibUserClient(users_api)
+    try:
+        created = client.create_users([{"name": f"u{i}", "email": f"u{i}@x"} for i in range(5)], bulk_size=2)
+        ids = [u["id"] for u in created]
+        assert len(set(ids)) == 5
+
+        updated = client.update_users([(i, {"name": "new", "email": "new@x"}) for i in ids])
+        assert all(u["name"] == "new" for u in updated)
+        assert client.delete_users(ids + ["missing"]) == [True] * 5 + [False]
+        assert client.get_all_users() == []
+    finally:
+        client.close()
@@ -0,0 +1,120 @@
+import pytest
+
+from clients.cache import CacheEntry, ResponseCache, Revalidation
+from clients.aiohttp_client import AiohttpUserClient
+from clients.urllib_client import UrllibUserClient
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_etag_revalidation_against_mock_server(users_api, pooled):
+    # ttl=0: каждое чтение — условный GET с If-None-Match
+    client = UrllibUserClient(users_api, pooled=pooled, cache=True, cache_ttl=0.0)
+    try:
+        user = client.create_user({"name": "Ann", "email": "ann@example.com"})
+        path = f"/{user['id']}"
+
+        assert client.get_user(user["id"]) == user
+        assert client.cache.lookup(path).etag
+        assert (client.cache.misses, client.cache.revalidated) == (1, 0)
+
+        assert client.get_user(user["id"]) == user  # 304, тело из кэша
+        assert (client.cache.misses, client.cache.revalidated) == (1, 1)
+
+        client.update_user(user["id"], {"name": "Bob", "email": "bob@example.com"})
+        assert client.get_user(user["id"])["name"] == "Bob"
+        assert client.cache.misses == 2
+    finally:
+        client.close()
+
+
+def test_changed_resource_gets_new_etag(users_api):
+    client = UrllibUserClient(users_api, cache=True, cache_ttl=0.0)
+    other = UrllibUserClient(users_api)
+    try:
+        user = client.create_user({"name": "Ann", "email": "ann@example.com"})
+        client.get_user(user["id"])
+        etag = client.cache.lookup(f"/{user['id']}").etag
+
+        # изменение мимо кэша: валидатор больше не совпадает, приходит 200
+        other.update_user(user["id"], {"name": "Eve", "email": "eve@example.com"})
+        assert client.get_user(user["id"])["name"] == "Eve"
+        assert client.cache.lookup(f"/{user['id']}").etag != etag
+        assert client.cache.revalidated == 0
+    finally:
+        client.close()
+        other.close()
+
+
+def test_fresh_entry_is_served_without_request():
+    cache = ResponseCache("t", ttl=60.0)
+    cache.store("/1", CacheEntry({"id": "1"}, etag='"a"'))
+
+    value, revalidation = cache.begin("/1")
+    assert value == {"id": "1"} and revalidation is None
+    assert cache.hits == 1
+
+
+def test_stale_entry_sends_validators_and_304_extends_it():
+    cache = ResponseCache("t", ttl=0.0)
+    cache.store("/1", CacheEntry({"id": "1"}, etag='"a"', last_modified="Mon"))
+
+    entry, revalidation = cache.begin("/1")
+    assert revalidation.request_headers() == {"If-None-Match": '"a"', "If-Modified-Since": "Mon"}
+
+    revalidation.not_modified = True
+    assert cache.finish("/1", entry, revalidation, None) == {"id": "1"}
+    assert cache.revalidated == 1
+    assert cache.lookup("/1").etag == '"a"'
+
+
+def test_error_response_drops_entry():
+    cache = ResponseCache("t", ttl=0.0)
+    cache.store("/1", CacheEntry({"id": "1"}, etag='"a"'))
+    entry, revalidation = cache.begin("/1")
+
+    assert cache.finish("/1", entry, Revalidation(), None) is None
+    assert cache.lookup("/1") is None
+
+
+def test_lru_eviction():
+    cache = ResponseCache("t", max_entries=2)
+    cache.store("/1", CacheEntry(1))
+    cache.store("/2", CacheEntry(2))
+    cache.lookup("/1")  # /1 теперь самая свежая
+    cache.store("/3", CacheEntry(3))
+
+    assert cache.lookup("/2") is None
+    assert cache.lookup("/1").value == 1 and len(cache) == 2
+
+
+def test_bulk_operations_invalidate_cache(users_api):
+    client = UrllibUserClient(users_api, cache=True, cache_ttl=60.0)
+    try:
+        user = client.create_user({"name": "Ann", "email": "ann@example.com"})
+        assert client.get_user(user["id"])["name"] == "Ann"
+        assert len(client.get_all_users()) == 1
+
+        client.update_users([(user["id"], {"name": "Bob", "email": "bob@example.com"})])
+        assert client.get_user(user["id"])["name"] == "Bob"
+
+        client.create_users([{"name": "Cid", "email": "cid@example.com"}])
+        assert len(client.get_all_users()) == 2
+
+        client.delete_users([user["id"]])
+        assert client.get_user(user["id"]) is None
+        assert len(client.get_all_users()) == 1
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_operations_invalidate_cache(users_api):
+    async with AiohttpUserClient(users_api, cache=True, cache_ttl=60.0) as client:
+        user = await client.create_user({"name": "Ann", "email": "ann@example.com"})
+        assert (await client.get_user(user["id"]))["name"] == "Ann"
+
+        await client.update_users([(user["id"], {"name": "Bob", "email": "bob@example.com"})])
+        assert (await client.get_user(user["id"]))["name"] == "Bob"
+
+        await client.delete_users([user["id"]])
+        assert await client.get_user(user["id"]) is None
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from clients.coalesce import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_request():
+    flight = SingleFlight("t")
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"id": "1"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, "/1", fetch) for _ in range(8)]
+        # все, кроме лидера, должны встать в ожидание
+        while flight.shared < 7:
+            threading.Event().wait(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert (flight.leaders, flight.shared) == (1, 7)
+    assert all(r is results[0] for r in results)
+
+
+def test_error_reaches_every_waiter_and_key_is_freed():
+    flight = SingleFlight("t")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "/1", fail) for _ in range(3)]
+        while flight.shared < 2:
+            threading.Event().wait(0.001)
+        release.set()
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result()
+
+    # следующий вызов отправляет новый запрос
+    assert flight.do("/1", lambda: "fresh") == "fresh"
+    assert flight.leaders == 2
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight("t")
+    assert flight.do("/1", lambda: 1) == 1
+    assert flight.do("/2", lambda: 2) == 2
+    assert (flight.leaders, flight.shared) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_async_calls_share_one_request():
+    flight = AsyncSingleFlight("t")
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return {"id": "1"}
+
+    tasks = [asyncio.create_task(flight.do("/1", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert (flight.leaders, flight.shared) == (1, 4)
+    assert all(r is results[0] for r in results)
+    assert flight._calls == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelling_leader_does_not_cancel_followers():
+    flight = AsyncSingleFlight("t")
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "ok"
+
+    leader = asyncio.create_task(flight.do("/1", fetch))
+    follower = asyncio.create_task(flight.do("/1", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == "ok"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
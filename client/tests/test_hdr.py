@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from clients.hdr import LatencyHistogram, mann_whitney
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, int(q / 100 * len(ordered) + 0.5)) - 1]
+
+
+@pytest.mark.parametrize("digits", [1, 2, 3])
+def test_percentiles_within_relative_error(digits):
+    rng = random.Random(digits)
+    values = [rng.lognormvariate(1.0, 1.5) for _ in range(20_000)]
+    hist = LatencyHistogram(significant_digits=digits)
+    for v in values:
+        hist.record(v)
+
+    quantiles = hist.percentiles((1, 50, 90, 99, 99.9))
+    for q, value in quantiles.items():
+        exact = _exact(values, q)
+        # плюс микросекунда: внутри значения хранятся целыми микросекундами
+        assert abs(value - exact) <= exact * 10 ** -digits + 0.001
+        assert value == hist.value_at_percentile(q)
+    assert hist.total_count == len(values)
+    assert hist.max == pytest.approx(max(values), abs=0.001)
+
+
+def test_percentiles_keep_requested_order_and_empty():
+    hist = LatencyHistogram()
+    assert hist.percentiles((99, 50)) == {99: 0.0, 50: 0.0}
+
+    for v in range(1, 101):
+        hist.record(v)
+    assert list(hist.percentiles((99, 50, 100))) == [99, 50, 100]
+    assert hist.percentiles((100,))[100] == 100.0
+
+
+def test_overflow_is_clamped():
+    hist = LatencyHistogram(highest_us=1_000_000)
+    hist.record(5_000)  # 5 s, выше диапазона
+
+    assert hist.overflow == 1
+    assert hist.max == 1_000.0
+
+
+def test_merge_equals_single_histogram():
+    rng = random.Random(7)
+    values = [rng.expovariate(0.1) for _ in range(5_000)]
+    whole = LatencyHistogram()
+    parts = [LatencyHistogram() for _ in range(4)]
+    for i, v in enumerate(values):
+        whole.record(v)
+        parts[i % 4].record(v)
+
+    merged = LatencyHistogram.merged(parts)
+    assert merged.to_dict() == whole.to_dict()
+    assert merged.percentiles() == whole.percentiles()
+
+
+def test_merge_rejects_different_parameters():
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_digits=2).merge(LatencyHistogram(significant_digits=3))
+
+
+def test_serialize_round_trip(tmp_path):
+    hist = LatencyHistogram(significant_digits=3)
+    for v in (0.5, 1.0, 12.25, 480.0, 480.0):
+        hist.record(v)
+
+    restored = LatencyHistogram.from_dict(hist.to_dict())
+    assert restored.to_dict() == hist.to_dict()
+    assert restored.percentiles() == hist.percentiles()
+    assert (restored.min, restored.max, restored.mean) == (hist.min, hist.max, hist.mean)
+
+    path = tmp_path / "h.hdr.json"
+    hist.dump(str(path))
+    assert LatencyHistogram.load(str(path)).to_dict() == hist.to_dict()
+
+    empty = LatencyHistogram.from_dict(LatencyHistogram().to_dict())
+    assert empty.total_count == 0 and empty.min == 0.0
+
+
+def test_mann_whitney_detects_shift():
+    rng = random.Random(1)
+    a, b, same = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for _ in range(2_000):
+        a.record(rng.gauss(20, 2))
+        b.record(rng.gauss(22, 2))
+        same.record(rng.gauss(20, 2))
+
+    p, prob = mann_whitney(b, a)
+    assert p < 1e-6 and prob > 0.7
+    assert mann_whitney(same, a)[0] > 0.001
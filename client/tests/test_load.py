@@ -0,0 +1,264 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from clients import ClientSpec
+from clients.aiohttp_client import AiohttpUserClient
+from clients.urllib_client import UrllibUserClient
+from load import (
+    CRUD_OPS,
+    ArrivalProfile,
+    LoadConfig,
+    run_async_load,
+    run_async_open_loop,
+    run_client_load,
+    run_sync_load,
+    run_sync_open_loop,
+)
+
+
+class Recorder:
+    """Вместо OTel-гистограммы и счётчика: запоминает записи."""
+
+    def __init__(self):
+        self.values = []
+        self._lock = threading.Lock()
+
+    def record(self, value, attributes=None):
+        with self._lock:
+            self.values.append(value)
+
+    def add(self, value, attributes=None):
+        self.record(value, attributes)
+
+
+class FakeClient:
+    """CRUD без сети; каждая ``fail_every``-я итерация падает на create."""
+
+    calls = itertools.count(1)
+
+    def __init__(self, delay=0.0, fail_every=0):
+        self.delay = delay
+        self.fail_every = fail_every
+        self.closed = False
+
+    def create_user(self, payload):
+        n = next(self.calls)
+        time.sleep(self.delay)
+        if self.fail_every and n % self.fail_every == 0:
+            return None
+        return {"id": str(n)}
+
+    def get_user(self, user_id):
+        return {"id": user_id}
+
+    def update_user(self, user_id, payload):
+        return {"id": user_id}
+
+    def delete_user(self, user_id):
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncFakeClient:
+    calls = itertools.count(1)
+
+    def __init__(self, delay=0.0, fail_every=0):
+        self.delay = delay
+        self.fail_every = fail_every
+        self.active = 0
+        self.peak = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def create_user(self, payload):
+        n = next(self.calls)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.fail_every and n % self.fail_every == 0:
+            return None
+        return {"id": str(n)}
+
+    async def get_user(self, user_id):
+        return {"id": user_id}
+
+    async def update_user(self, user_id, payload):
+        return {"id": user_id}
+
+    async def delete_user(self, user_id):
+        return True
+
+
+def test_constant_rate_arrivals():
+    offsets = list(ArrivalProfile("constant:20").arrivals(1.0, None))
+    assert len(offsets) == 20
+    assert offsets[1] == pytest.approx(0.05)
+    assert list(ArrivalProfile("50").arrivals(None, 3)) == pytest.approx([0.0, 0.02, 0.04])
+
+
+def test_zero_rate_step_pauses_sending():
+    offsets = list(ArrivalProfile("step:0,50@0.5").arrivals(1.0, None))
+    assert len(offsets) == 25
+    assert offsets[0] == pytest.approx(0.5)
+
+    # пауза посреди профиля: вторая ступень без отправок
+    offsets = list(ArrivalProfile("step:8,0,8@1").arrivals(3.0, None))
+    assert len(offsets) == 16
+    assert not [t for t in offsets if 1.0 <= t < 2.0]
+
+    # нулевая последняя ступень — отправки заканчиваются, даже без длительности
+    assert len(list(ArrivalProfile("step:5,0@1").arrivals(None, None))) == 5
+    assert list(ArrivalProfile("constant:0").arrivals(1.0, None)) == []
+
+
+def test_ramp_from_zero():
+    offsets = list(ArrivalProfile("ramp:0:100").arrivals(2.0, None))
+    assert 90 <= len(offsets) <= 100  # интеграл частоты — 100
+    assert offsets[0] > 0
+
+
+def test_invalid_profile():
+    with pytest.raises(ValueError):
+        ArrivalProfile("wave:1")
+
+
+def test_sync_open_loop_counts_errors():
+    cfg = LoadConfig(max_inflight=4, duration=None, requests=30, rate="constant:1000")
+    durations, errors = Recorder(), Recorder()
+
+    result = run_sync_open_loop("fake", lambda: FakeClient(fail_every=3), cfg, durations, errors)
+
+    assert result.total + result.missed == 30
+    assert result.errors == len(errors.values) > 0
+    assert result.successes == len(durations.values)
+    assert result.operations.hist("create").total_count == result.total
+
+
+def test_sync_open_loop_misses_sends_over_inflight_cap():
+    cfg = LoadConfig(max_inflight=2, duration=None, requests=20, rate="constant:1000")
+
+    result = run_sync_open_loop("fake", lambda: FakeClient(delay=0.05), cfg, Recorder(), Recorder())
+
+    assert result.missed > 0
+    assert result.successes + result.missed == 20
+    assert result.concurrency == 2
+
+
+@pytest.mark.asyncio
+async def test_async_open_loop_follows_schedule():
+    cfg = LoadConfig(max_inflight=100, duration=0.3, rate="constant:100")
+    client = AsyncFakeClient(delay=0.02, fail_every=5)
+
+    started = time.perf_counter()
+    result = await run_async_open_loop("fake", lambda: client, cfg, Recorder(), Recorder())
+
+    # отправки не ждут ответов: за 0.3 с — около 30 итераций
+    assert 25 <= result.total <= 31
+    assert 0 < result.errors < result.total
+    assert client.peak >= 2
+    assert time.perf_counter() - started < 1.0
+
+
+def test_sync_load_runs_requests_on_concurrent_workers():
+    clients = []
+    threads = set()
+
+    def factory():
+        client = FakeClient(delay=0.001)
+        original = client.create_user
+
+        def create_user(payload):
+            threads.add(threading.get_ident())
+            return original(payload)
+
+        client.create_user = create_user
+        clients.append(client)
+        return client
+
+    durations, errors = Recorder(), Recorder()
+    cfg = LoadConfig(concurrency=4, duration=None, requests=40)
+    result = run_sync_load("fake", factory, cfg, durations, errors)
+
+    assert result.total == 40 and result.errors == 0
+    assert len(durations.values) == 40
+    assert len(clients) == 4 and all(c.closed for c in clients)
+    assert len(threads) > 1
+    # гистограммы операций общие на все потоки и видят каждую итерацию
+    for op in ("create", "get", "update", "delete"):
+        assert result.operations.hist(op).total_count == 40
+    assert result.rps > 0
+
+
+def test_sync_load_counts_errors():
+    errors = Recorder()
+    cfg = LoadConfig(concurrency=2, duration=None, requests=30)
+    result = run_sync_load("fake", lambda: FakeClient(fail_every=3), cfg, Recorder(), errors)
+
+    assert result.errors == len(errors.values) == 10
+    assert result.successes == 20
+    assert result.error_rate == pytest.approx(1 / 3)
+
+
+def test_sync_load_stops_after_duration_and_discards_warmup():
+    durations = Recorder()
+    cfg = LoadConfig(concurrency=2, duration=0.2, warmup=0.1)
+
+    started = time.perf_counter()
+    result = run_sync_load("fake", lambda: FakeClient(delay=0.01), cfg, durations, Recorder())
+    elapsed = time.perf_counter() - started
+
+    assert 0.3 <= elapsed < 0.6
+    assert result.elapsed == pytest.approx(0.2, abs=0.1)
+    # ~2 потока x 30 итераций, из них около трети — прогрев
+    assert 20 <= result.total <= 45
+    assert result.total == len(durations.values)
+
+
+@pytest.mark.asyncio
+async def test_async_load_keeps_concurrency_tasks_in_flight():
+    client = AsyncFakeClient(delay=0.005, fail_every=4)
+    errors = Recorder()
+    cfg = LoadConfig(concurrency=5, duration=None, requests=40)
+
+    result = await run_async_load("fake", lambda: client, cfg, Recorder(), errors)
+
+    assert result.total == 40
+    assert result.errors == len(errors.values) == 10
+    assert client.peak == 5
+    assert result.operations.hist("create").total_count == 40
+
+
+@pytest.mark.asyncio
+async def test_async_load_stops_after_duration():
+    client = AsyncFakeClient(delay=0.01)
+    cfg = LoadConfig(concurrency=3, duration=0.2)
+
+    result = await run_async_load("fake", lambda: client, cfg, Recorder(), Recorder())
+
+    assert 30 <= result.total <= 63
+    assert result.elapsed == pytest.approx(0.2, abs=0.1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cls, is_async", [(UrllibUserClient, False), (AiohttpUserClient, True)])
+async def test_client_load_against_mock_server(users_api, cls, is_async):
+    spec = ClientSpec(cls.__name__, cls, is_async).with_base_url(users_api)
+    cfg = LoadConfig(concurrency=3, duration=None, requests=12)
+
+    result = await run_client_load(spec, cfg, Recorder(), Recorder())
+
+    assert (result.successes, result.errors) == (12, 0)
+    assert sum(h.total_count for (_, phase), h in result.operations.hists.items() if phase == "total") == 12 * CRUD_OPS
@@ -0,0 +1,142 @@
+import json
+import logging
+
+import pytest
+from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
+from opentelemetry.sdk._logs.export import SimpleLogRecordProcessor
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.trace import Status, StatusCode
+
+import otel_analyze
+from otel_analyze import _bucket_quantile, analyze, format_report
+from otel_files import (
+    JsonLinesLogExporter,
+    JsonLinesMetricExporter,
+    JsonLinesSpanExporter,
+    read_records,
+    read_signal,
+    signal_files,
+)
+
+
+@pytest.fixture
+def telemetry_dir(tmp_path):
+    """Каталог с телеметрией небольшого прогона: span'ы, метрики и логи
+    через настоящие провайдеры SDK (не глобальные).
+    """
+    directory = str(tmp_path / "telemetry")
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(JsonLinesSpanExporter(directory)))
+    reader = PeriodicExportingMetricReader(JsonLinesMetricExporter(directory), export_interval_millis=60_000)
+    meter_provider = MeterProvider(metric_readers=[reader])
+    logger_provider = LoggerProvider()
+    logger_provider.add_log_record_processor(SimpleLogRecordProcessor(JsonLinesLogExporter(directory)))
+
+    log = logging.getLogger("bench.test")
+    handler = LoggingHandler(logger_provider=logger_provider)
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    try:
+        tracer = tracer_provider.get_tracer("bench")
+        meter = meter_provider.get_meter("bench")
+        hist = meter.create_histogram("op_ms", unit="ms")
+        errors = meter.create_counter("errors_total")
+
+        for i in range(10):
+            with tracer.start_as_current_span("iteration") as span:
+                span.set_attribute("i", i)
+                with tracer.start_as_current_span("get"):
+                    pass
+                if i == 9:
+                    span.set_status(Status(StatusCode.ERROR))
+                    log.warning("iteration %d failed", i)
+            hist.record(float(i + 1), attributes={"client": "httpx"})
+        errors.add(2, attributes={"client": "httpx"})
+        log.info("outside of any span")
+    finally:
+        log.removeHandler(handler)
+        tracer_provider.shutdown()
+        meter_provider.shutdown()
+        logger_provider.shutdown()
+    return directory
+
+
+def test_spans_are_written_one_per_line(telemetry_dir):
+    [path] = signal_files(telemetry_dir, "spans")
+    spans = list(read_records(path))
+
+    assert len(spans) == 20
+    iterations = [s for s in spans if s["name"] == "iteration"]
+    children = [s for s in spans if s["name"] == "get"]
+    assert {s["attrs"]["i"] for s in iterations} == set(range(10))
+    assert {c["parent"] for c in children} == {s["span"] for s in iterations}
+    assert sum(s["status"] == "ERROR" for s in iterations) == 1
+    assert all(s["ms"] >= 0 and len(s["trace"]) == 32 for s in spans)
+
+
+def test_logs_carry_trace_and_span_ids(telemetry_dir):
+    logs = list(read_signal(telemetry_dir, "logs"))
+    spans = {s["span"]: s for s in read_signal(telemetry_dir, "spans")}
+
+    failed = next(r for r in logs if r["body"] == "iteration 9 failed")
+    assert spans[failed["span"]]["name"] == "iteration"
+    assert spans[failed["span"]]["trace"] == failed["trace"]
+
+    outside = next(r for r in logs if r["body"] == "outside of any span")
+    assert outside["trace"] is None and outside["span"] is None
+
+
+def test_broken_lines_are_skipped(telemetry_dir):
+    [path] = signal_files(telemetry_dir, "spans")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"name": "cut in ha')  # процесс убит посреди записи
+    assert len(list(read_records(path))) == 20
+
+
+def test_analyze_summarizes_all_signals(telemetry_dir):
+    report = analyze(telemetry_dir)
+
+    spans = {s["name"]: s for s in report["spans"]}
+    assert (spans["iteration"]["count"], spans["iteration"]["errors"]) == (10, 1)
+
+    metrics = {m["name"]: m for m in report["metrics"]}
+    op = metrics["op_ms"]
+    assert (op["count"], op["sum"], op["max"]) == (10, 55.0, 10.0)
+    assert 4.0 <= op["p50"] <= 6.0
+    assert metrics["errors_total"]["value"] == 2
+
+    assert sum(report["logs"]["levels"].values()) == 2
+    assert report["logs"]["loggers"] == {"bench.test": 2}
+
+    text = format_report(report)
+    assert "iteration" in text and "op_ms{client=httpx}" in text
+
+
+def test_metrics_from_several_processes_are_summed(telemetry_dir):
+    [path] = signal_files(telemetry_dir, "metrics")
+    # второй процесс с теми же рядами
+    with open(path, "r", encoding="utf-8") as src, open(path.replace("metrics-", "metrics-1"), "w") as dst:
+        dst.write(src.read())
+
+    metrics = {m["name"]: m for m in analyze(telemetry_dir)["metrics"]}
+    assert metrics["op_ms"]["count"] == 20
+    assert metrics["errors_total"]["value"] == 4
+
+
+def test_bucket_quantile_interpolates_within_bucket():
+    bounds, counts = [10.0, 20.0], [0, 10, 0]
+    assert _bucket_quantile(50, bounds, counts, 12.0, 18.0) == pytest.approx(15.0)
+    assert _bucket_quantile(100, bounds, counts, 12.0, 18.0) == pytest.approx(18.0)
+    assert _bucket_quantile(50, bounds, [0, 0, 0], 0.0, 0.0) == 0.0
+
+
+def test_cli_prints_json(telemetry_dir, capsys):
+    otel_analyze.main([telemetry_dir, "--json"])
+    data = json.loads(capsys.readouterr().out)
+    assert set(data) == {"spans", "metrics", "logs"}
+
+    with pytest.raises(SystemExit):
+        otel_analyze.main([telemetry_dir + "-missing"])
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from clients.paging import JsonArrayStream, PaginationError, iter_json_array
+from clients.urllib_client import UrllibUserClient
+
+
+RECORDS = [
+    {"id": "1", "name": "a", "tags": []},
+    {"id": "2", "name": "quote \" and ] } , inside", "nested": {"deep": [[1, 2], {"x": None}]}},
+    {"id": "3", "name": "backslash \\", "escaped": "\\\"]"},
+    [1, [2, [3]]],
+    "plain string",
+    12.5,
+    True,
+    None,
+]
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_split_point(indent):
+    body = json.dumps(RECORDS, indent=indent, ensure_ascii=False).encode()
+    for cut in range(len(body) + 1):
+        stream = JsonArrayStream(json.loads)
+        items = stream.feed(body[:cut]) + stream.feed(body[cut:])
+        stream.close()
+        assert items == RECORDS, cut
+
+
+def test_byte_by_byte():
+    body = json.dumps(RECORDS).encode()
+    assert list(iter_json_array(_chunks(body, 1), json.loads)) == RECORDS
+
+
+def test_items_are_returned_as_soon_as_complete():
+    stream = JsonArrayStream(json.loads)
+    assert stream.feed(b'[{"id": "1"}, {"id"') == [{"id": "1"}]
+    assert stream.feed(b': "2"') == []
+    assert stream.feed(b"}") == [{"id": "2"}]
+    assert not stream.done
+    assert stream.feed(b"]") == []
+    assert stream.done
+
+
+def test_buffer_keeps_only_unfinished_element():
+    stream = JsonArrayStream(json.loads)
+    stream.feed(b'[{"a": 1}, {"b": 2}, {"c"')
+    assert bytes(stream._buf) == b'{"c"'
+
+
+def test_deeply_nested_records_are_linear():
+    records = [{"id": i, "items": [{"n": j, "s": "x,]}"} for j in range(8000)]} for i in range(2)]
+    body = json.dumps(records).encode()
+    calls = []
+
+    def loads(raw):
+        calls.append(len(raw))
+        return json.loads(raw)
+
+    assert list(iter_json_array(_chunks(body, 4096), loads)) == records
+    assert len(calls) == len(records)
+
+
+def test_empty_array():
+    assert list(iter_json_array([b" [ ", b"] "], json.loads)) == []
+
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}', b'[{"a": "]', b"[1,"])
+def test_truncated_body_raises(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array([body], json.loads))
+
+
+def test_not_an_array_raises():
+    with pytest.raises(ValueError):
+        JsonArrayStream(json.loads).feed(b'{"a": 1}')
+
+
+@pytest.mark.parametrize("pooled", [False, True])
+def test_unpaged_stream_error_is_pagination_error(users_api, pooled):
+    client = UrllibUserClient(users_api.replace("/users", "/missing"), pooled=pooled)
+    try:
+        with pytest.raises(PaginationError, match="HTTP 404"):
+            list(client.iter_users(page_size=None))
+    finally:
+        client.close()
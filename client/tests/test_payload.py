@@ -0,0 +1,171 @@
+import json
+import threading
+
+import pytest
+
+from clients import ClientSpec
+from clients.urllib_client import UrllibUserClient
+from payload import (
+    PayloadConfig,
+    PayloadPoint,
+    format_payload_chart,
+    parse_shapes,
+    parse_sizes,
+    run_payload_sweep,
+)
+from workload import SHAPES, PayloadSet, format_size, make_sized_payload, parse_size
+
+
+class Recorder:
+    def record(self, value, attributes=None):
+        pass
+
+    def add(self, value, attributes=None):
+        pass
+
+
+class SizingClient:
+    """CRUD без сети; запоминает размер JSON каждого тела создания."""
+
+    sizes = []
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self._next = 0
+
+    def create_user(self, payload):
+        with self._lock:
+            self.sizes.append(len(json.dumps(payload, separators=(",", ":"))))
+            self._next += 1
+            return {"id": str(self._next)}
+
+    def get_user(self, user_id):
+        return {"id": user_id}
+
+    def update_user(self, user_id, payload):
+        return {"id": user_id}
+
+    def delete_user(self, user_id):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize(
+    "raw, size",
+    [("512", 512), ("0", 0), ("4k", 4096), ("4KB", 4096), (" 1.5m ", 1536 * 1024), ("2mb", 2 * 1024**2), ("10b", 10)],
+)
+def test_parse_size(raw, size):
+    assert parse_size(raw) == size
+
+
+@pytest.mark.parametrize("raw", ["", "k", "4g", "abc", "1..5k", "-1k"])
+def test_parse_size_rejects_garbage(raw):
+    with pytest.raises(ValueError):
+        parse_size(raw)
+
+
+def test_format_size_round_trips_whole_units():
+    assert [format_size(s) for s in (64, 1024, 1536, 16 * 1024, 1024**2)] == ["64", "1k", "1536", "16k", "1m"]
+    for raw in ("64", "1k", "16k", "256k", "1m", "4m"):
+        assert format_size(parse_size(raw)) == raw
+
+
+def test_parse_sizes_and_shapes():
+    assert parse_sizes("64, 1k,,4m") == [64, 1024, 4 * 1024**2]
+    assert parse_shapes("flat,arrays") == ["flat", "arrays"]
+    with pytest.raises(ValueError):
+        parse_sizes(" , ")
+    with pytest.raises(ValueError):
+        parse_shapes("flat,deep")
+    with pytest.raises(ValueError):
+        parse_shapes("")
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("size", [1024, 16 * 1024, 256 * 1024])
+def test_sized_payload_is_close_to_target(shape, size):
+    payload = make_sized_payload(3, size, shape)
+    actual = len(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    # добавляются целые блоки формы: недолёт или перелёт не больше блока
+    assert abs(actual - size) <= max(0.1 * size, 1600)
+    assert payload["email"].startswith("user3_")
+
+
+def test_small_target_keeps_plain_user():
+    assert make_sized_payload(0, 10, "nested") == {"username": "ivan", "email": "user0_ivan@example.com"}
+    with pytest.raises(ValueError):
+        make_sized_payload(0, 1024, "deep")
+
+
+def test_payload_set_is_reproducible_and_unique():
+    first, second = PayloadSet(4096, "arrays", seed=1), PayloadSet(4096, "arrays", seed=1)
+    assert first.user(5) == second.user(5)
+    assert first.user(1)["email"] != first.user(5)["email"]
+    assert first.update(2)["username"].endswith("_updated")
+    assert first.label == "4k:arrays"
+    assert abs(first.bytes - 4096) <= 410
+
+
+@pytest.mark.asyncio
+async def test_payload_sweep_runs_every_size_and_shape():
+    SizingClient.sizes = []
+    cfg = PayloadConfig(sizes=[256, 8192], shapes=["flat", "nested"], concurrency=2, requests=6, seed=7)
+    spec = ClientSpec("fake", SizingClient, False)
+
+    result = await run_payload_sweep(spec, cfg, Recorder(), Recorder())
+
+    assert [(p.shape, p.size) for p in result.points] == [
+        ("flat", 256), ("flat", 8192), ("nested", 256), ("nested", 8192)
+    ]
+    assert all(p.iterations == 6 and p.errors == 0 and p.elapsed > 0 for p in result.points)
+    assert result.successes == 24
+    # тела каждой точки — нужного размера, в порядке развёртки
+    for k, point in enumerate(result.points):
+        sent = SizingClient.sizes[k * 6:(k + 1) * 6]
+        assert all(abs(s - point.size) <= max(0.1 * point.size, 1600) for s in sent)
+
+
+@pytest.mark.asyncio
+async def test_payload_sweep_against_mock_server(users_api):
+    cfg = PayloadConfig(sizes=[1024], shapes=["arrays"], concurrency=1, requests=3)
+    spec = ClientSpec("urllib", UrllibUserClient, False).with_base_url(users_api)
+
+    result = await run_payload_sweep(spec, cfg, Recorder(), Recorder())
+
+    [point] = result.points
+    assert (point.iterations, point.errors) == (3, 0)
+    assert point.mb_per_s > 0 and point.p50 > 0
+
+
+def _point(size, shape, elapsed, errors=0):
+    return PayloadPoint(size=size, shape=shape, bytes=size, iterations=100, errors=errors,
+                        elapsed=elapsed, p50=1.0, p99=2.0)
+
+
+def test_payload_point_round_trip():
+    point = _point(1024, "flat", 2.0)
+    assert PayloadPoint.from_dict(point.to_dict()) == point
+    assert point.rps == 50.0
+    assert point.mb_per_s == pytest.approx(50 * 5 * 1024 / 1e6)
+
+
+def test_payload_chart_bars_are_relative_to_best_client():
+    chart = format_payload_chart(
+        {
+            "fast": [_point(1024, "nested", 1.0), _point(1024, "nested", 1.0)],
+            "slow": [_point(1024, "nested", 2.0, errors=1)],
+            "flat-only": [_point(64, "flat", 1.0)],
+        },
+        width=10,
+    )
+    lines = chart.splitlines()
+
+    assert lines.index("flat:") < lines.index("nested:")
+    fast = next(l for l in lines if " fast " in l)
+    slow = next(l for l in lines if " slow " in l)
+    assert fast.rstrip().endswith("#" * 10)
+    assert "#" * 5 in slow and "#" * 6 not in slow
+    assert slow.endswith("1 errors")
+    assert format_payload_chart({}) == ""
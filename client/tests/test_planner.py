@@ -0,0 +1,111 @@
+import math
+from statistics import stdev
+
+import pytest
+
+from clients.hdr import LatencyHistogram
+from instrument import OperationStats
+from planner import (
+    _T95,
+    RunPlan,
+    RunSample,
+    _incomplete_beta,
+    by_client,
+    confidence_interval,
+    format_ci_table,
+    welch_t_test,
+)
+
+
+def _sample(client, repetition, values, elapsed=1.0, errors=0):
+    hist = LatencyHistogram()
+    operations = OperationStats()
+    for v in values:
+        hist.record(v)
+        operations.record("get", v, {"ttfb": v / 2})
+    return RunSample(client, repetition, hist, errors=errors, elapsed=elapsed, operations=operations)
+
+
+def test_schedule_runs_every_client_once_per_repetition():
+    plan = RunPlan(["a", "b", "c"], repetitions=3, shuffle=True, seed=42)
+    runs = plan.schedule()
+
+    assert len(runs) == 9
+    for repetition in range(3):
+        assert sorted(c for r, c in runs if r == repetition) == ["a", "b", "c"]
+    assert RunPlan(["a", "b", "c"], repetitions=3, shuffle=True, seed=42).schedule() == runs
+    assert RunPlan(["a", "b"], repetitions=2).schedule() == [(0, "a"), (0, "b"), (1, "a"), (1, "b")]
+
+
+@pytest.mark.asyncio
+async def test_execute_runs_clients_one_at_a_time():
+    active = []
+
+    async def run_one(client, repetition):
+        active.append(client)
+        assert len(active) == 1  # прогоны не пересекаются
+        active.pop()
+        return _sample(client, repetition, [1.0])
+
+    samples = await RunPlan(["a", "b"], repetitions=2).execute(run_one)
+    assert [(s.client, s.repetition) for s in samples] == [("a", 0), ("b", 0), ("a", 1), ("b", 1)]
+
+
+def test_confidence_interval_uses_t_distribution():
+    m, half = confidence_interval([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert m == 3.0
+    assert half == pytest.approx(2.776 * stdev([1, 2, 3, 4, 5]) / math.sqrt(5))
+
+    m, half = confidence_interval([7.0])
+    assert m == 7.0 and math.isnan(half)
+    assert confidence_interval([]) == (0.0, 0.0)
+
+
+def test_incomplete_beta_identities():
+    for x in (0.1, 0.5, 0.9):
+        assert _incomplete_beta(1, 1, x) == pytest.approx(x)
+        assert _incomplete_beta(3, 1, x) == pytest.approx(x**3)
+    assert _incomplete_beta(4.5, 4.5, 0.5) == pytest.approx(0.5)
+    assert _incomplete_beta(2, 3, 0.0) == 0.0 and _incomplete_beta(2, 3, 1.0) == 1.0
+
+
+@pytest.mark.parametrize("n", [2, 4, 6, 11, 16])
+def test_welch_matches_t_table_at_critical_value(n):
+    # равные размеры и дисперсии: df = 2n - 2, сдвиг ровно на критическое t
+    a = [float(i) for i in range(n)]
+    df = 2 * n - 2
+    shift = _T95[df - 1] * math.sqrt(2 * stdev(a) ** 2 / n)
+    b = [v + shift for v in a]
+
+    assert welch_t_test(a, b) == pytest.approx(0.05, abs=5e-4)
+    assert welch_t_test(b, a) == pytest.approx(0.05, abs=5e-4)
+
+
+def test_welch_edge_cases():
+    assert welch_t_test([1.0, 2.0, 3.0], [1.0, 2.0, 3.0]) == pytest.approx(1.0)
+    assert math.isnan(welch_t_test([1.0], [1.0, 2.0]))
+    assert welch_t_test([2.0, 2.0], [2.0, 2.0]) == 1.0
+    assert welch_t_test([2.0, 2.0], [3.0, 3.0]) == 0.0
+    # разные дисперсии: t = -1.264, df Уэлча ~4.01 (а не 8), p ~0.275
+    assert welch_t_test([10, 11, 9, 10, 10], [20, 40, 0, 35, 5]) == pytest.approx(0.275, abs=0.005)
+
+
+def test_run_sample_round_trip():
+    sample = _sample("httpx", 2, [1.0, 2.0, 30.0], elapsed=0.5, errors=1)
+    sample.cpu, sample.gc_allocs = 0.25, 1000
+
+    restored = RunSample.from_dict(sample.to_dict())
+    assert restored.to_dict() == sample.to_dict()
+    assert restored.throughput == pytest.approx(6.0)
+    assert restored.operations.hist("get", "ttfb").total_count == 3
+
+
+def test_ci_table_groups_repetitions_by_client():
+    samples = [_sample("a", r, [10.0 + r]) for r in range(3)] + [_sample("b", 0, [5.0])]
+    assert list(by_client(samples)) == ["a", "b"]
+
+    lines = format_ci_table(samples).splitlines()
+    a_row = next(line for line in lines if line.startswith("a "))
+    b_row = next(line for line in lines if line.startswith("b "))
+    assert "±" in a_row and " 3" in a_row
+    assert "±" not in b_row  # одна повторность — интервала нет
@@ -0,0 +1,86 @@
+from urllib.parse import urlsplit
+
+import pytest
+
+from clients.pool import ConnectionPool, PoolManager, PoolTimeout
+
+
+def _pool(url, **kwargs):
+    parts = urlsplit(url)
+    return ConnectionPool(parts.scheme, parts.hostname, parts.port, **kwargs)
+
+
+def _get(lease, path="/users"):
+    lease.conn.request("GET", path)
+    resp = lease.conn.getresponse()
+    resp.read()
+    return resp.status
+
+
+def test_connection_is_reused(users_api):
+    pool = _pool(users_api)
+    try:
+        with pool.connection() as lease:
+            assert _get(lease) == 200
+            assert not lease.reused
+            first = lease.conn
+        with pool.connection() as lease:
+            assert _get(lease) == 200
+            assert lease.reused
+            assert lease.conn is first
+        assert pool.size == 1
+    finally:
+        pool.close()
+    assert pool.size == 0
+
+
+def test_idle_connections_are_evicted(users_api):
+    pool = _pool(users_api, idle_timeout=0.0)
+    try:
+        with pool.connection() as lease:
+            _get(lease)
+            first = lease.conn
+        with pool.connection() as lease:
+            assert not lease.reused
+            assert lease.conn is not first
+        assert pool.size == 1
+    finally:
+        pool.close()
+
+
+def test_failed_or_dropped_lease_is_not_returned(users_api):
+    pool = _pool(users_api)
+    try:
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                raise RuntimeError("broken response")
+        assert pool.size == 0
+
+        with pool.connection() as lease:
+            lease.keep = False
+        assert pool.size == 0
+    finally:
+        pool.close()
+
+
+def test_exhausted_pool_times_out(users_api):
+    pool = _pool(users_api, max_size=1, checkout_timeout=0.05)
+    try:
+        with pool.connection():
+            with pytest.raises(PoolTimeout):
+                with pool.connection():
+                    pass
+        # после возврата соединение снова выдаётся
+        with pool.connection() as lease:
+            assert lease.reused
+    finally:
+        pool.close()
+
+
+def test_pool_manager_keeps_one_pool_per_origin():
+    manager = PoolManager(max_size=3)
+    a = manager.pool("http", "127.0.0.1", 3100)
+    assert manager.pool("http", "127.0.0.1", 3100) is a
+    assert manager.pool("http", "127.0.0.1", 3101) is not a
+    assert a.max_size == 3
+    manager.close()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import math
+import random
+
+import pytest
+
+import compare_results
+from clients.hdr import LatencyHistogram
+from compare_results import Comparison, compare
+from planner import RunSample
+from results import SCENARIO_ARGS, BenchmarkResult, scenario_from_args
+
+
+GIT = {"commit": "0123456789abcdef", "dirty": False}
+ENV = {"host": "bench", "python": "CPython 3.11", "loadavg": [0.1, 0.2, 0.3]}
+
+
+def _samples(client, center, repetitions=3, elapsed=1.0, seed=0):
+    rng = random.Random(seed)
+    samples = []
+    for r in range(repetitions):
+        hist = LatencyHistogram()
+        for _ in range(500):
+            hist.record(rng.gauss(center, center / 20))
+        samples.append(RunSample(client, r, hist, elapsed=elapsed))
+    return samples
+
+
+def _result(samples, **scenario):
+    return BenchmarkResult(
+        scenario={"mode": "load", **scenario}, samples=samples, environment=dict(ENV), git=dict(GIT)
+    )
+
+
+def test_round_trip_through_file(tmp_path):
+    result = _result(_samples("httpx", 10.0) + _samples("aiohttp", 8.0))
+    path = result.dump(str(tmp_path))
+
+    loaded = BenchmarkResult.load(path)
+    assert loaded.to_dict() == result.to_dict()
+    assert loaded.clients == ["httpx", "aiohttp"]
+    assert loaded.label.startswith("0123456789 ")
+
+    # второй результат с тем же временем не затирает первый
+    assert result.dump(str(tmp_path)) != path
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    data = _result(_samples("httpx", 10.0)).to_dict()
+    data["format"] = 99
+    path = tmp_path / "r.json"
+    path.write_text(json.dumps(data))
+
+    with pytest.raises(ValueError):
+        BenchmarkResult.load(str(path))
+
+
+def test_scenario_from_args():
+    args = argparse.Namespace(**{name: f"v-{name}" for name in SCENARIO_ARGS})
+    args.repetitions, args.isolate = 3, "subprocess"
+    args.telemetry = argparse.Namespace(exporter="noop", sample_ratio=0.1)
+
+    scenario = scenario_from_args(args)
+    assert scenario["mode"] == "v-mode"
+    assert (scenario["repetitions"], scenario["telemetry"], scenario["sample_ratio"]) == (3, "noop", 0.1)
+
+
+def test_regression_is_significant_and_in_the_right_direction():
+    base = _result(_samples("httpx", 10.0, seed=1))
+    slower = _result(_samples("httpx", 12.0, elapsed=1.2, seed=2))
+    by_metric = {c.metric: c for c in compare(base, slower)}
+
+    assert by_metric["mean ms"].change == pytest.approx(20, abs=1)
+    assert by_metric["mean ms"].test == "welch"
+    assert by_metric["mean ms"].verdict(5.0, 0.05) == "REGRESSION"
+    # пропускная способность упала: для it/s хуже — меньше
+    assert by_metric["it/s"].change < 0
+    assert by_metric["it/s"].verdict(5.0, 0.05) == "REGRESSION"
+
+    faster = {c.metric: c for c in compare(slower, base)}
+    assert faster["p50 ms"].verdict(5.0, 0.05) == "improved"
+    assert faster["it/s"].verdict(5.0, 0.05) == "improved"
+
+
+def test_single_run_uses_u_test_for_latency_only():
+    base = _result(_samples("httpx", 10.0, repetitions=1, seed=1))
+    new = _result(_samples("httpx", 11.0, repetitions=1, seed=2))
+    by_metric = {c.metric: c for c in compare(base, new)}
+
+    assert by_metric["p99 ms"].test == "u-test"
+    assert by_metric["p99 ms"].verdict(5.0, 0.05) == "REGRESSION"
+    assert by_metric["it/s"].test == "-" and math.isnan(by_metric["it/s"].p_value)
+
+
+def test_verdict_thresholds():
+    c = Comparison("x", "mean ms", 10.0, 10.3, 0.001, "welch")
+    assert c.verdict(5.0, 0.05) == ""  # ниже порога
+    c = Comparison("x", "mean ms", 10.0, 12.0, 0.2, "welch")
+    assert c.verdict(5.0, 0.05) == ""  # выше порога, но незначимо
+    c = Comparison("x", "mean ms", 10.0, 12.0, math.nan, "-")
+    assert c.verdict(5.0, 0.05) == "REGRESSION?"
+
+
+def test_main_exit_code(tmp_path, capsys):
+    base = _result(_samples("httpx", 10.0, seed=1)).dump(str(tmp_path / "base"))
+    same = _result(_samples("httpx", 10.0, seed=2)).dump(str(tmp_path / "same"))
+    worse = _result(_samples("httpx", 13.0, seed=3), concurrency=20).dump(str(tmp_path / "worse"))
+
+    compare_results.main([base, same])
+    assert "REGRESSION" not in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as exc:
+        compare_results.main([base, worse])
+    assert exc.value.code == 1
+    out = capsys.readouterr().out
+    assert "REGRESSION" in out
+    assert "scenario differs" in out and "concurrency" in out
+    assert "environment differs" not in out  # loadavg не сравнивается
+
+    with pytest.raises(SystemExit) as exc:
+        compare_results.main([base])
+    assert exc.value.code == 2
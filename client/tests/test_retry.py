@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from clients.phases import collect_phases, record_phase
+from clients.retry import AsyncResilience, HedgePolicy, Resilience, RetryBudget, RetryPolicy, TransientError
+
+
+def _flaky(failures, error=None):
+    calls = itertools.count()
+
+    def attempt():
+        n = next(calls)
+        if n < failures:
+            raise error or TransientError("503", status=503)
+        return n
+
+    attempt.calls = calls
+    return attempt
+
+
+def test_budget_limits_withdrawals():
+    budget = RetryBudget(ratio=0.5, reserve=2.0)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_retries_until_success():
+    r = Resilience("t", RetryPolicy(retries=2, base_delay=0.0))
+    assert r.call("GET", "/users", _flaky(2)) == 2
+
+
+def test_gives_up_after_policy_retries():
+    r = Resilience("t", RetryPolicy(retries=2, base_delay=0.0))
+    attempt = _flaky(10)
+    assert r.call("GET", "/users", attempt) is None
+    assert next(attempt.calls) == 3
+
+
+def test_post_is_retried_only_if_not_sent():
+    r = Resilience("t", RetryPolicy(retries=2, base_delay=0.0))
+    sent = _flaky(1)
+    assert r.call("POST", "/users", sent) is None
+    assert next(sent.calls) == 1
+
+    refused = _flaky(1, TransientError("connection refused", sent=False))
+    assert r.call("POST", "/users", refused) == 1
+
+
+def test_exhausted_budget_stops_retries():
+    r = Resilience("t", RetryPolicy(retries=5, base_delay=0.0), RetryBudget(ratio=0.0, reserve=1.0))
+    first = _flaky(10)
+    assert r.call("GET", "/users", first) is None
+    assert next(first.calls) == 2  # одна попытка и один повтор из резерва
+
+    second = _flaky(10)
+    assert r.call("GET", "/users", second) is None
+    assert next(second.calls) == 1
+
+
+def _hedged(cls, budget=None):
+    r = cls("t", RetryPolicy(retries=0), budget, HedgePolicy(delay_ms=0.0, min_samples=1))
+    r._hedge_delay = 0.02  # как будто p95 уже набран
+    return r
+
+
+def test_sync_hedge_keeps_slow_primary_sample_and_winner_phases():
+    r = _hedged(Resilience)
+    delays = iter([0.15, 0.001])
+
+    def attempt():
+        delay = next(delays)
+        record_phase("ttfb", delay * 1000)
+        time.sleep(delay)
+        return delay
+
+    try:
+        with collect_phases() as phases:
+            assert r.call("GET", "/users/1", attempt) == 0.001
+        assert phases == {"ttfb": 1.0}  # только фазы выигравшей копии
+
+        # проигравшая основная попытка дорабатывает в пуле и попадает в выборку
+        deadline = time.monotonic() + 2
+        while not r._latency.total_count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert r._latency.total_count == 1
+        assert r._latency.max >= 150
+    finally:
+        r.close()
+
+
+def test_sync_hedge_is_not_sent_without_budget():
+    r = _hedged(Resilience, RetryBudget(ratio=0.0, reserve=0.0))
+    attempt = _flaky(0)
+
+    def slow():
+        time.sleep(0.05)
+        return attempt()
+
+    try:
+        assert r.call("GET", "/users/1", slow) == 0
+        assert next(attempt.calls) == 1
+        assert r._latency.total_count == 1
+    finally:
+        r.close()
+
+
+@pytest.mark.asyncio
+async def test_async_hedge_records_cancelled_primary_and_winner_phases():
+    r = _hedged(AsyncResilience)
+    delays = iter([1.0, 0.001])
+
+    async def attempt():
+        delay = next(delays)
+        record_phase("ttfb", delay * 1000)
+        await asyncio.sleep(delay)
+        return delay
+
+    with collect_phases() as phases:
+        assert await r.call("GET", "/users/1", attempt) == 0.001
+    await asyncio.sleep(0)
+    assert phases == {"ttfb": 1.0}
+
+    # основная попытка отменена: записано прошедшее время, не меньше задержки хеджа
+    assert r._latency.total_count == 1
+    assert 20 <= r._latency.max < 1000
+
+
+@pytest.mark.asyncio
+async def test_adaptive_delay_follows_observed_latency():
+    r = AsyncResilience("t", RetryPolicy(retries=0), hedge=HedgePolicy(delay_ms=0.0, min_samples=5))
+
+    async def attempt():
+        return None
+
+    for _ in range(4):
+        await r.call("GET", "/users/1", attempt)
+    assert r._hedge_after("GET") is None
+    await r.call("GET", "/users/1", attempt)
+    assert r._hedge_after("GET") is not None
+    assert r._hedge_after("POST") is None
@@ -0,0 +1,164 @@
+import itertools
+import json
+import random
+from typing import Dict, Any, List, Optional
+
+
+TEST_USERS = [
+    {"username": "ivan", "email": "ivan@example.com"},
+    {"username": "maria", "email": "maria@example.com"},
+    {"username": "petr", "email": "petr@example.com"},
+]
+
+
+def make_user_payload(i: int) -> Dict[str, Any]:
+    user_payload = TEST_USERS[i % len(TEST_USERS)].copy()
+    user_payload["email"] = f"user{i}_{user_payload['email']}"
+    return user_payload
+
+
+def make_update_payload(user_payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {**user_payload, "username": user_payload["username"] + "_updated"}
+
+
+# форма тела: flat — несколько полей и длинная строка (дорого передать, дёшево
+# разобрать); nested — дерево вложенных объектов; arrays — длинные массивы
+# мелких записей и чисел (дорого разобрать)
+SHAPES = ("flat", "nested", "arrays")
+_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024**2, "mb": 1024**2}
+_WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+)
+
+
+def parse_size(raw: str) -> int:
+    """``512``, ``4k``, ``1.5m``, ``2MB`` -> байты (k и m двоичные)."""
+    text = raw.strip().lower()
+    number = text.rstrip("bkm")
+    unit = text[len(number):]
+    if unit not in _UNITS or not number:
+        raise ValueError(f"invalid payload size {raw!r}, expected e.g. 512, 4k, 1m")
+    try:
+        size = int(float(number) * _UNITS[unit])
+    except ValueError:
+        raise ValueError(f"invalid payload size {raw!r}, expected e.g. 512, 4k, 1m")
+    if size < 0:
+        raise ValueError(f"payload size must be >= 0, got {raw!r}")
+    return size
+
+
+def format_size(size: int) -> str:
+    for unit, factor in (("m", 1024**2), ("k", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def _json_len(obj: Any) -> int:
+    return len(json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def _text(rng: random.Random, length: int) -> str:
+    words = []
+    total = 0
+    while total < length:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def _nested(rng: random.Random, depth: int) -> Dict[str, Any]:
+    if depth == 0:
+        return {"name": rng.choice(_WORDS), "value": rng.randint(0, 10**6), "active": rng.random() < 0.5}
+    return {f"{rng.choice(_WORDS)}_{k}": _nested(rng, depth - 1) for k in range(3)}
+
+
+def _array_unit(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "ts": rng.randint(1_600_000_000, 1_700_000_000),
+        "event": rng.choice(_WORDS),
+        "value": round(rng.random() * 1000, 3),
+        "tags": [rng.choice(_WORDS) for _ in range(3)],
+        "scores": [rng.randint(0, 100) for _ in range(8)],
+    }
+
+
+def make_sized_payload(i: int, size: int, shape: str = "flat", rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """Пользователь ``make_user_payload(i)``, дополненный до ~``size`` байт JSON.
+    Размер приблизительный: добавляются целые блоки своей формы.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"unknown payload shape {shape!r}; available: {', '.join(SHAPES)}")
+    rng = rng or random.Random(i)
+    user = make_user_payload(i)
+    room = size - _json_len(user)
+    if room <= 0:
+        return user
+    if shape == "flat":
+        if room > 64:
+            user.update(age=rng.randint(18, 90), city=rng.choice(_WORDS), verified=True)
+        user["bio"] = _text(rng, max(0, size - _json_len(user) - len(',"bio":""')))
+    elif shape == "nested":
+        # блок — дерево глубины 3 из 27 листьев, около 1,5 КБ
+        sections: Dict[str, Any] = {}
+        user["profile"] = sections
+        room -= len(',"profile":{}')
+        while room > 0:
+            unit = _nested(rng, 3) if room >= 1024 else _nested(rng, 1)
+            key = f"section_{len(sections)}"
+            sections[key] = unit
+            room -= _json_len({key: unit})
+    else:
+        events: List[Dict[str, Any]] = []
+        user["events"] = events
+        unit_len = _json_len(_array_unit(rng)) + 1
+        events.extend(_array_unit(rng) for _ in range(room // unit_len))
+    return user
+
+
+class PayloadSet:
+    """Заранее сгенерированные тела создания и обновления одного размера
+    и формы, чтобы генерация не попадала в замер. ``user(i)`` — неглубокая
+    копия одного из ``variants`` шаблонов с уникальным email.
+    """
+
+    def __init__(self, size: int, shape: str = "flat", variants: int = 4, seed: Optional[int] = None):
+        rng = random.Random(seed)
+        self.size = size
+        self.shape = shape
+        self._users = [make_sized_payload(k, size, shape, rng) for k in range(variants)]
+        self._updates = [make_update_payload(u) for u in self._users]
+        self.bytes = sum(_json_len(u) for u in self._users) // len(self._users)
+
+    @property
+    def label(self) -> str:
+        return f"{format_size(self.size)}:{self.shape}"
+
+    def user(self, i: int) -> Dict[str, Any]:
+        return {**self._users[i % len(self._users)], "email": f"user{i}@example.com"}
+
+    def update(self, i: int) -> Dict[str, Any]:
+        return self._updates[i % len(self._updates)]
+
+
+class ZipfKeys:
+    """Индексы ``0..n-1`` с вероятностью ~ ``1 / (k + 1) ** s``: при ``s`` около 1
+    небольшая доля горячих ключей получает большую часть обращений; ``s=0`` —
+    равномерно.
+    """
+
+    def __init__(self, n: int, s: float = 1.1, seed: Optional[int] = None):
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        if s < 0:
+            raise ValueError("s must be >= 0")
+        self.n = n
+        self.s = s
+        self._population = range(n)
+        self._cum_weights = list(itertools.accumulate(1 / (k + 1) ** s for k in range(n)))
+        self._rng = random.Random(seed)
+
+    def sample(self) -> int:
+        return self._rng.choices(self._population, cum_weights=self._cum_weights)[0]
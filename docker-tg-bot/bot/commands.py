@@ -0,0 +1,163 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Awaitable, Callable, Optional
+
+from telegram import Update
+from telegram.ext import (
+    ApplicationHandlerStop,
+    CommandHandler,
+    ContextTypes,
+    TypeHandler,
+)
+
+from .config import Config
+
+Handler = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable]
+
+# роли по возрастанию прав
+ROLES = ("viewer", "operator", "admin")
+
+
+@dataclass(frozen=True)
+class Arg:
+    name: str
+    type: type = str
+    optional: bool = False
+    variadic: bool = False
+
+    def __str__(self) -> str:
+        text = self.name + ("..." if self.variadic else "")
+        return f"[{text}]" if self.optional else f"<{text}>"
+
+
+@dataclass(frozen=True)
+class Command:
+    name: str
+    callback: Handler
+    description: str = ""
+    emoji: str = "•"
+    args: tuple[Arg, ...] = ()
+    role: str = "viewer"
+    rate_limit: Optional[tuple[int, float]] = None  # (вызовов, за секунд)
+    block: bool = True
+
+    @property
+    def usage(self) -> str:
+        return " ".join([f"/{self.name}", *(str(a) for a in self.args)])
+
+    def check_args(self, args: list[str]) -> bool:
+        required = sum(1 for a in self.args if not a.optional)
+        variadic = any(a.variadic for a in self.args)
+        if len(args) < required or (not variadic and len(args) > len(self.args)):
+            return False
+        for spec, value in zip(self.args, args):
+            try:
+                spec.type(value)
+            except ValueError:
+                return False
+        return True
+
+
+class Authorizer:
+    """Роли чатов. Чаты из ``allowed_chat_ids`` без явной роли — admin."""
+
+    def __init__(self, cfg: Config):
+        roles = {chat_id: "admin" for chat_id in cfg.allowed_chat_ids}
+        roles.update(cfg.chat_roles)
+        unknown = set(roles.values()) - set(ROLES)
+        if unknown:
+            raise ValueError(f"Unknown roles: {', '.join(sorted(unknown))}")
+        self._levels = {chat_id: ROLES.index(role) for chat_id, role in roles.items()}
+        self.chat_ids = frozenset(self._levels)
+
+    def allows(self, chat_id: Optional[int], role: str = "viewer") -> bool:
+        level = self._levels.get(chat_id)
+        return level is not None and level >= ROLES.index(role)
+
+
+class RateLimiter:
+    """Скользящее окно вызовов на пару (чат, команда)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._calls: dict[tuple[int, str], deque[float]] = {}
+
+    def retry_after(self, chat_id: int, command: str, limit: tuple[int, float]) -> float:
+        """0, если вызов разрешён (и учтён), иначе сколько секунд ждать."""
+        calls, period = limit
+        now = self._clock()
+        window = self._calls.setdefault((chat_id, command), deque())
+        while window and now - window[0] >= period:
+            window.popleft()
+        if len(window) >= calls:
+            return period - (now - window[0])
+        window.append(now)
+        return 0.0
+
+
+@dataclass
+class CommandRegistry:
+    """Команды бота, объявленные один раз вместе с метаданными.
+
+    Из реестра строятся обёрнутые обработчики (роль, схема аргументов,
+    rate limit), регистрация в приложении и текст справки.
+    """
+
+    cfg: Config
+    commands: dict[str, Command] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.auth = Authorizer(self.cfg)
+        self.limiter = RateLimiter()
+        self._handlers: dict[str, Handler] = {}
+
+    def command(self, name: str, **meta) -> Callable[[Handler], Handler]:
+        def decorator(func: Handler) -> Handler:
+            self.commands[name] = Command(name=name, callback=func, **meta)
+            self._handlers[name] = self._wrap(self.commands[name])
+            return self._handlers[name]
+
+        return decorator
+
+    def _wrap(self, cmd: Command) -> Handler:
+        @wraps(cmd.callback)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            chat_id = update.effective_chat.id if update.effective_chat else None
+            if not self.auth.allows(chat_id, cmd.role):
+                return
+            if not cmd.check_args(context.args or []):
+                await update.message.reply_text(f"Usage: {cmd.usage}")
+                return
+            if cmd.rate_limit:
+                wait = self.limiter.retry_after(chat_id, cmd.name, cmd.rate_limit)
+                if wait:
+                    await update.message.reply_text(
+                        f"Too many /{cmd.name} requests, retry in {wait:.0f}s"
+                    )
+                    return
+            return await cmd.callback(update, context)
+
+        return wrapper
+
+    def handlers(self) -> dict[str, Handler]:
+        return dict(self._handlers)
+
+    def visible_to(self, chat_id: Optional[int]) -> list[Command]:
+        return [c for c in self.commands.values() if self.auth.allows(chat_id, c.role)]
+
+    async def _drop_unauthorized(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ):
+        chat = update.effective_chat
+        if chat is None or chat.id not in self.auth.chat_ids:
+            raise ApplicationHandlerStop
+
+    def register(self, app) -> None:
+        # группа -1 отрабатывает раньше всех: чужие апдейты дальше не идут
+        app.add_handler(TypeHandler(Update, self._drop_unauthorized), group=-1)
+        for cmd in self.commands.values():
+            app.add_handler(
+                CommandHandler(cmd.name, self._handlers[cmd.name], block=cmd.block)
+            )
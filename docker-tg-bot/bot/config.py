@@ -1,20 +1,52 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+
+def _parse_pairs(raw: str, var: str) -> dict[str, str]:
+    # "web1=tcp://10.0.0.1:2375,web2=ssh://deploy@10.0.0.2"
+    pairs: dict[str, str] = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip() or not value.strip():
+            raise RuntimeError(f"Invalid {var} entry: {item!r}")
+        pairs[key.strip()] = value.strip()
+    return pairs
+
 
 @dataclass
 class Config:
     telegram_token: str
     allowed_chat_ids: list[int]
+    # chat_id -> viewer / operator / admin; без записи разрешённый чат — admin
+    chat_roles: dict[int, str] = field(default_factory=dict)
 
     autoscale_interval: int = 30  # seconds
     cpu_threshold: float = 0.7    # 70% CPU
     max_replicas: int = 5
     min_replicas: int = 1
 
+    cpu_aggregation: str = "mean"  # mean / median / pNN / trimmedNN / max
+    cpu_window: int = 1            # замеров в окне каждой реплики
+    cpu_warmup: int = 0            # seconds, молодые реплики не учитываются
+    unhealthy_replace_after: int = 3  # unhealthy-проверок подряд, 0 — не заменять
+
     compose_project: str = "tg-scale-lab"
     compose_service: str = "web"
     compose_project_dir: str = "/tg-scale-lab"
 
+    # имя хоста -> адрес Docker API; первый хост используется по умолчанию
+    docker_hosts: dict[str, str] = field(
+        default_factory=lambda: {"local": "unix:///var/run/docker.sock"}
+    )
+    docker_host_timeout: float = 5.0  # seconds на запрос к одному хосту
+
+    # /exec: разрешённые программы (пусто — команда выключена)
+    exec_allowed_commands: list[str] = field(default_factory=list)
+    exec_timeout: int = 30              # seconds
+    exec_file_threshold: int = 3500     # bytes, больше — отправляем файлом
+
     @classmethod
     def from_env(cls) -> "Config":
         token = os.environ.get("TELEGRAM_TOKEN", "")
@@ -23,18 +55,46 @@ class Config:
 
         chat_ids_raw = os.environ.get("TELEGRAM_ALLOWED_CHATS", "")
         allowed_ids = [int(x) for x in chat_ids_raw.split(",") if x.strip()]
-        if not allowed_ids:
+        chat_roles = {
+            int(chat_id): role
+            for chat_id, role in _parse_pairs(
+                os.environ.get("TELEGRAM_CHAT_ROLES", ""), "TELEGRAM_CHAT_ROLES"
+            ).items()
+        }
+        if not allowed_ids and not chat_roles:
             raise RuntimeError("TELEGRAM_ALLOWED_CHATS is required")
 
+        docker_hosts = _parse_pairs(os.environ.get("DOCKER_HOSTS", ""), "DOCKER_HOSTS")
+        if not docker_hosts:
+            docker_hosts = {
+                "local": os.environ.get("DOCKER_HOST", "unix:///var/run/docker.sock")
+            }
+
         return cls(
             telegram_token=token,
             allowed_chat_ids=allowed_ids,
+            chat_roles=chat_roles,
             autoscale_interval=int(os.environ.get("AUTOSCALE_INTERVAL", "30")),
             cpu_threshold=float(os.environ.get("CPU_THRESHOLD", "0.7")),
             max_replicas=int(os.environ.get("MAX_REPLICAS", "5")),
             min_replicas=int(os.environ.get("MIN_REPLICAS", "1")),
+            cpu_aggregation=os.environ.get("CPU_AGGREGATION", "mean"),
+            cpu_window=int(os.environ.get("CPU_WINDOW", "1")),
+            cpu_warmup=int(os.environ.get("CPU_WARMUP", "0")),
+            unhealthy_replace_after=int(
+                os.environ.get("UNHEALTHY_REPLACE_AFTER", "3")
+            ),
             compose_project=os.environ.get("COMPOSE_PROJECT", "tg-scale-lab"),
             compose_service=os.environ.get("COMPOSE_SERVICE", "web"),
             compose_project_dir=os.environ.get("COMPOSE_PROJECT_DIR", "/tg-scale-lab"),
+            docker_hosts=docker_hosts,
+            docker_host_timeout=float(os.environ.get("DOCKER_HOST_TIMEOUT", "5")),
+            exec_allowed_commands=[
+                x.strip()
+                for x in os.environ.get("EXEC_ALLOWED_COMMANDS", "").split(",")
+                if x.strip()
+            ],
+            exec_timeout=int(os.environ.get("EXEC_TIMEOUT", "30")),
+            exec_file_threshold=int(os.environ.get("EXEC_FILE_THRESHOLD", "3500")),
         )
 
@@ -1,45 +1,84 @@
+import asyncio
+import inspect
+import math
 import os
-from typing import List, Optional
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
 
 import aiodocker
 
 
+# запас сверх timeout, за который coreutils/busybox timeout успевает убить процесс
+EXEC_KILL_GRACE = 5.0
+_KILLED = 128 + 9  # код выхода процесса, убитого SIGKILL
+
+
+class ExecTimeout(asyncio.TimeoutError):
+    """Команда не уложилась в таймаут. ``killed`` — процесс в контейнере
+    убит; иначе он мог остаться работать (в образе нет ``timeout``).
+    """
+
+    def __init__(self, timeout: float, killed: bool):
+        super().__init__(f"exec timed out after {timeout}s")
+        self.timeout = timeout
+        self.killed = killed
+
+
+async def _first_stat(container) -> Optional[dict]:
+    # aiodocker при stream=False отдаёт корутину со списком,
+    # старые версии и тестовые заглушки — асинхронный итератор
+    stats = container.stats(stream=False)
+    if inspect.isawaitable(stats):
+        result = await stats
+        return result[0] if result else None
+    async for stat in stats:
+        return stat
+    return None
+
+
 class DockerClient:
-    def __init__(self):
-        self._base_url = os.environ.get("DOCKER_HOST", "unix:///var/run/docker.sock")
+    def __init__(self, base_url: Optional[str] = None):
+        self._base_url = base_url or os.environ.get(
+            "DOCKER_HOST", "unix:///var/run/docker.sock"
+        )
+        self._docker: Optional[aiodocker.Docker] = None
+        # есть ли в контейнере утилита timeout, по id контейнера
+        self._has_timeout: Dict[str, bool] = {}
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
 
     async def _get(self) -> aiodocker.Docker:
-        # каждый вызов создаёт новый клиент; его нужно закрыть после использования
-        return aiodocker.Docker(url=self._base_url)
+        # один клиент (и пул соединений aiohttp) на хост, живёт до close()
+        if self._docker is None:
+            self._docker = aiodocker.Docker(url=self._base_url)
+        return self._docker
+
+    async def close(self) -> None:
+        if self._docker is not None:
+            await self._docker.close()
+            self._docker = None
 
     async def list_containers(self, all_: bool = True):
         docker = await self._get()
-        try:
-            return await docker.containers.list(all=all_)
-        finally:
-            await docker.close()
+        return await docker.containers.list(all=all_)
 
     async def get_container(self, name: str):
         docker = await self._get()
         try:
-            try:
-                return await docker.containers.get(name)
-            except aiodocker.exceptions.DockerError:
-                return None
-        finally:
-            await docker.close()
+            return await docker.containers.get(name)
+        except aiodocker.exceptions.DockerError:
+            return None
 
     async def container_logs(self, name: str, tail: int = 100) -> str:
         docker = await self._get()
         try:
-            try:
-                container = await docker.containers.get(name)
-            except aiodocker.exceptions.DockerError:
-                raise ValueError(f"Container {name} not found")
-            logs = await container.log(stdout=True, stderr=True, tail=tail)
-            return "".join(logs)
-        finally:
-            await docker.close()
+            container = await docker.containers.get(name)
+        except aiodocker.exceptions.DockerError:
+            raise ValueError(f"Container {name} not found")
+        logs = await container.log(stdout=True, stderr=True, tail=tail)
+        return "".join(logs)
 
     async def container_logs_to_file(
         self, name: str, path: str, tail: int = 100
@@ -58,8 +97,6 @@ class DockerClient:
             return True
         except aiodocker.exceptions.DockerError:
             return False
-        finally:
-            await docker.close()
 
     async def stop_container(self, name: str) -> bool:
         docker = await self._get()
@@ -69,8 +106,6 @@ class DockerClient:
             return True
         except aiodocker.exceptions.DockerError:
             return False
-        finally:
-            await docker.close()
 
     async def restart_container(self, name: str) -> bool:
         docker = await self._get()
@@ -80,8 +115,6 @@ class DockerClient:
             return True
         except aiodocker.exceptions.DockerError:
             return False
-        finally:
-            await docker.close()
 
     async def remove_container(self, name: str, force: bool = False) -> bool:
         docker = await self._get()
@@ -91,8 +124,6 @@ class DockerClient:
             return True
         except aiodocker.exceptions.DockerError:
             return False
-        finally:
-            await docker.close()
 
     async def create_container(
         self,
@@ -101,43 +132,108 @@ class DockerClient:
         cmd: Optional[List[str]] = None,
     ):
         docker = await self._get()
-        try:
-            config = {"Image": image}
-            if cmd:
-                config["Cmd"] = cmd
-            container = await docker.containers.create_or_replace(
-                name=name, config=config
-            )
-            return container
-        finally:
-            await docker.close()
+        config = {"Image": image}
+        if cmd:
+            config["Cmd"] = cmd
+        container = await docker.containers.create_or_replace(
+            name=name, config=config
+        )
+        return container
 
     async def get_container_stats_cpu(self, name: str) -> float:
         docker = await self._get()
         try:
+            container = await docker.containers.get(name)
+        except aiodocker.exceptions.DockerError:
+            raise ValueError(f"Container {name} not found")
+
+        stat = await _first_stat(container)
+        if stat is None:
+            return 0.0
+
+        cpu_delta = (
+            stat["cpu_stats"]["cpu_usage"]["total_usage"]
+            - stat["precpu_stats"]["cpu_usage"]["total_usage"]
+        )
+        system_delta = (
+            stat["cpu_stats"]["system_cpu_usage"]
+            - stat["precpu_stats"]["system_cpu_usage"]
+        )
+        if system_delta <= 0:
+            return 0.0
+        cpu_percent = (cpu_delta / system_delta) * len(
+            stat["cpu_stats"]["cpu_usage"].get("percpu_usage", [1])
+        )
+        return cpu_percent
+
+    async def _run_exec(
+        self, container, cmd: List[str], on_output: Callable[[str], Awaitable[None]]
+    ) -> Optional[int]:
+        execution = await container.exec(cmd, stdout=True, stderr=True, tty=False)
+        async with execution.start(detach=False) as stream:
+            while True:
+                msg = await stream.read_out()
+                if msg is None:
+                    break
+                await on_output(msg.data.decode("utf-8", errors="replace"))
+        info = await execution.inspect()
+        return info.get("ExitCode")
+
+    async def _supports_timeout(self, container, name: str) -> bool:
+        key = getattr(container, "id", None) or name
+
+        async def _discard(data: str) -> None:
+            pass
+
+        if key not in self._has_timeout:
             try:
-                container = await docker.containers.get(name)
-            except aiodocker.exceptions.DockerError:
-                raise ValueError(f"Container {name} not found")
-
-            async for stat in container.stats(stream=False):
-                cpu_delta = (
-                    stat["cpu_stats"]["cpu_usage"]["total_usage"]
-                    - stat["precpu_stats"]["cpu_usage"]["total_usage"]
+                code = await asyncio.wait_for(
+                    self._run_exec(container, ["timeout", "-s", "KILL", "5", "true"], _discard),
+                    EXEC_KILL_GRACE,
                 )
-                system_delta = (
-                    stat["cpu_stats"]["system_cpu_usage"]
-                    - stat["precpu_stats"]["system_cpu_usage"]
-                )
-                if system_delta <= 0:
-                    return 0.0
-                cpu_percent = (cpu_delta / system_delta) * len(
-                    stat["cpu_stats"]["cpu_usage"].get("percpu_usage", [1])
-                )
-                return cpu_percent
-            return 0.0
-        finally:
-            await docker.close()
+            except (asyncio.TimeoutError, aiodocker.exceptions.DockerError):
+                code = None
+            self._has_timeout[key] = code == 0
+        return self._has_timeout[key]
+
+    async def exec_in_container(
+        self,
+        name: str,
+        cmd: List[str],
+        on_output: Callable[[str], Awaitable[None]],
+        timeout: Optional[float] = None,
+    ) -> Optional[int]:
+        """Выполняет команду, передавая вывод в ``on_output`` по мере появления.
+
+        С ``timeout`` команда запускается под ``timeout -s KILL``, чтобы по
+        истечении времени процесс в контейнере был убит, а не только отключён
+        от потока вывода. Если утилиты в образе нет, чтение обрывается по
+        таймауту, а процесс может продолжить работу. В обоих случаях
+        поднимается ``ExecTimeout``.
+        """
+        docker = await self._get()
+        try:
+            container = await docker.containers.get(name)
+        except aiodocker.exceptions.DockerError:
+            raise ValueError(f"Container {name} not found")
+
+        if timeout is None:
+            return await self._run_exec(container, cmd, on_output)
+
+        killable = await self._supports_timeout(container, name)
+        if killable:
+            cmd = ["timeout", "-s", "KILL", str(math.ceil(timeout)), *cmd]
+        started = time.monotonic()
+        try:
+            code = await asyncio.wait_for(
+                self._run_exec(container, cmd, on_output),
+                timeout + EXEC_KILL_GRACE if killable else timeout,
+            )
+        except asyncio.TimeoutError:
+            raise ExecTimeout(timeout, killed=False)
+        if killable and code == _KILLED and time.monotonic() - started >= timeout:
+            raise ExecTimeout(timeout, killed=True)
+        return code
 
     async def compose_scale(
         self, project: str, service: str, replicas: int, project_dir: str
@@ -147,6 +243,7 @@ class DockerClient:
 
         cmd = (
             f"cd {shlex.quote(project_dir)} && "
+            f"DOCKER_HOST={shlex.quote(self._base_url)} "
             f"docker compose -p {shlex.quote(project)} "
             f"up -d --scale {shlex.quote(service)}={replicas}"
         )
@@ -1,86 +1,120 @@
-from functools import wraps
-from typing import Callable, Awaitable
+import asyncio
+import io
+import time
 
 from telegram import Update, InputFile
-from telegram.ext import ContextTypes, CommandHandler, MessageHandler, filters
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes, MessageHandler, filters
+from telegram.helpers import escape_markdown
 
+from .commands import Arg, CommandRegistry
 from .config import Config
 from .docker_client import DockerClient
+from .hosts import HostRegistry
 
 
-def require_auth(cfg: Config):
-    def decorator(func: Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable]):
-        @wraps(func)
-        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-            chat_id = update.effective_chat.id if update.effective_chat else None
-            if chat_id not in cfg.allowed_chat_ids:
-                return
-            return await func(update, context)
+TELEGRAM_TEXT_LIMIT = 4096
+EXEC_EDIT_INTERVAL = 1.0  # seconds между правками сообщения с выводом
+
+
+def _clip(text: str) -> str:
+    # хвост вывода важнее начала
+    if len(text) <= TELEGRAM_TEXT_LIMIT:
+        return text
+    return "…" + text[-(TELEGRAM_TEXT_LIMIT - 1):]
+
+
+async def _safe_edit(message, text: str) -> None:
+    try:
+        await message.edit_text(_clip(text))
+    except BadRequest:
+        # "message is not modified" и подобное не должны ронять команду
+        pass
+
 
-        return wrapper
+def _format_container(c) -> str:
+    c_id = c._id[:12]
+    raw_name = c._container.get("Names", [""])[0]
+    name = raw_name.lstrip("/")
+    status = c._container.get("Status", "")
 
-    return decorator
+    lower = status.lower()
+    if "up" in lower:
+        emoji = "🟢"
+    elif "exited" in lower or "dead" in lower:
+        emoji = "🔴"
+    elif "created" in lower:
+        emoji = "🟡"
+    else:
+        emoji = "⚪️"
 
+    return f"{emoji} {name} — {status} ({c_id})"
+
+
+def build_commands(cfg: Config, docker: DockerClient | HostRegistry) -> CommandRegistry:
+    commands = CommandRegistry(cfg)
+    hosts = (
+        docker if isinstance(docker, HostRegistry) else HostRegistry({"local": docker})
+    )
+
+    async def _resolve(update: Update, address: str):
+        try:
+            return hosts.resolve(address)
+        except ValueError as e:
+            await update.message.reply_text(str(e))
+            return None
 
-def create_handlers(cfg: Config, docker: DockerClient):
-    @require_auth(cfg)
+    @commands.command("start", description="справка")
     async def start_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        text = (
-            "🐳 *Docker bot ready*\n\n"
-            "Доступные команды:\n"
-            "• 📋 `/list` — список контейнеров\n"
-            "• 📜 `/logs <name>` — логи в файл\n"
-            "• ▶️ `/startc <name>` — старт контейнера\n"
-            "• ⏹ `/stopc <name>` — стоп контейнера\n"
-            "• 🔁 `/restartc <name>` — рестарт контейнера\n"
-            "• 🗑 `/rmc <name>` — удалить контейнер\n"
-            "• 🧱 `/new <image> [name]` — создать контейнер\n"
-            "• 📈 `/scale <n>` — масштабировать web‑сервис\n"
-        )
+        lines = ["🐳 *Docker bot ready*\n", "Доступные команды:"]
+        for cmd in commands.visible_to(update.effective_chat.id):
+            if cmd.name == "start":
+                continue
+            lines.append(
+                f"• {cmd.emoji} `{cmd.usage}` — "
+                f"{escape_markdown(cmd.description, version=2)}"
+            )
+        lines.append("\n`<container>` можно указать как `host:name`")
         await update.message.reply_text(
-            text,
+            "\n".join(lines),
             parse_mode="MarkdownV2",
             disable_web_page_preview=True,
         )
 
-    @require_auth(cfg)
+    @commands.command("list", emoji="📋", description="список контейнеров")
     async def list_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        containers = await docker.list_containers(all_=True)
-        lines: list[str] = []
-
-        for c in containers:
-            c_id = c._id[:12]
-            raw_name = c._container.get("Names", [""])[0]
-            name = raw_name.lstrip("/")
-            status = c._container.get("Status", "")
-
-            lower = status.lower()
-            if "up" in lower:
-                emoji = "🟢"
-            elif "exited" in lower or "dead" in lower:
-                emoji = "🔴"
-            elif "created" in lower:
-                emoji = "🟡"
-            else:
-                emoji = "⚪️"
-
-            lines.append(f"{emoji} {name} — {status} ({c_id})")
-
-        text = "\n".join(lines) if lines else "Нет контейнеров"
+        results = await hosts.list_containers(all_=True)
+        sections: list[str] = []
+
+        for host, containers in results.items():
+            if isinstance(containers, BaseException):
+                sections.append(f"⚠️ {host}: unavailable ({containers!r})")
+                continue
+            lines = [_format_container(c) for c in containers]
+            if hosts.is_multi:
+                lines.insert(0, f"[{host}]")
+                if len(lines) == 1:
+                    lines.append("Нет контейнеров")
+            if lines:
+                sections.append("\n".join(lines))
+
+        text = "\n\n".join(sections) if sections else "Нет контейнеров"
 
         await update.message.reply_text(f"Containers:\n{text}")
 
-    @require_auth(cfg)
+    @commands.command(
+        "logs", emoji="📜", description="логи в файл",
+        args=(Arg("container"),), rate_limit=(5, 60),
+    )
     async def logs_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /logs <container>")
+        resolved = await _resolve(update, context.args[0])
+        if resolved is None:
             return
-
-        name = context.args[0]
-        path = f"/tmp/{name}_logs.txt"
+        host, client, name = resolved
+        path = f"/tmp/{host}_{name}_logs.txt"
 
         try:
-            await docker.container_logs_to_file(name, path, tail=200)
+            await client.container_logs_to_file(name, path, tail=200)
         except ValueError as e:
             await update.message.reply_text(str(e))
             return
@@ -90,62 +124,86 @@ def create_handlers(cfg: Config, docker: DockerClient):
                 document=InputFile(f, filename=f"{name}_logs.txt")
             )
 
-    @require_auth(cfg)
+    @commands.command(
+        "startc", emoji="▶️", description="старт контейнера",
+        args=(Arg("container"),), role="operator",
+    )
     async def startc_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /startc <container>")
+        resolved = await _resolve(update, context.args[0])
+        if resolved is None:
             return
+        _, client, name = resolved
 
-        ok = await docker.start_container(context.args[0])
+        ok = await client.start_container(name)
         await update.message.reply_text("Started" if ok else "Container not found")
 
-    @require_auth(cfg)
+    @commands.command(
+        "stopc", emoji="⏹", description="стоп контейнера",
+        args=(Arg("container"),), role="operator",
+    )
     async def stopc_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /stopc <container>")
+        resolved = await _resolve(update, context.args[0])
+        if resolved is None:
             return
+        _, client, name = resolved
 
-        ok = await docker.stop_container(context.args[0])
+        ok = await client.stop_container(name)
         await update.message.reply_text("Stopped" if ok else "Container not found")
 
-    @require_auth(cfg)
+    @commands.command(
+        "restartc", emoji="🔁", description="рестарт контейнера",
+        args=(Arg("container"),), role="operator",
+    )
     async def restartc_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /restartc <container>")
+        resolved = await _resolve(update, context.args[0])
+        if resolved is None:
             return
+        _, client, name = resolved
 
-        ok = await docker.restart_container(context.args[0])
+        ok = await client.restart_container(name)
         await update.message.reply_text("Restarted" if ok else "Container not found")
 
-    @require_auth(cfg)
+    @commands.command(
+        "rmc", emoji="🗑", description="удалить контейнер",
+        args=(Arg("container"),), role="admin",
+    )
     async def rmc_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /rmc <container>")
+        resolved = await _resolve(update, context.args[0])
+        if resolved is None:
             return
+        _, client, name = resolved
 
-        ok = await docker.remove_container(context.args[0], force=True)
+        ok = await client.remove_container(name, force=True)
         await update.message.reply_text("Removed" if ok else "Container not found")
 
-    @require_auth(cfg)
+    @commands.command(
+        "new", emoji="🧱", description="создать контейнер",
+        args=(Arg("image"), Arg("name", optional=True)), role="admin",
+    )
     async def new_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /new <image> [name]")
-            return
-
         image = context.args[0]
-        name = context.args[1] if len(context.args) > 1 else None
-        container = await docker.create_container(image=image, name=name)
+        resolved = await _resolve(update, context.args[1] if len(context.args) > 1 else "")
+        if resolved is None:
+            return
+        _, client, name = resolved
+        container = await client.create_container(image=image, name=name or None)
         await update.message.reply_text(f"Created: {container._id[:12]}")
 
-    @require_auth(cfg)
+    @commands.command(
+        "scale", emoji="📈", description="масштабировать web‑сервис",
+        args=(Arg("replicas", int), Arg("host", optional=True)),
+        role="admin", rate_limit=(2, 60),
+    )
     async def scale_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if not context.args:
-            await update.message.reply_text("Usage: /scale <replicas>")
-            return
-
         replicas = int(context.args[0])
+        host = context.args[1] if len(context.args) > 1 else hosts.default
+        try:
+            client = hosts.get(host)
+        except ValueError as e:
+            await update.message.reply_text(str(e))
+            return
 
-        await docker.compose_scale(
+        await client.compose_scale(
             cfg.compose_project,
             cfg.compose_service,
             replicas,
@@ -156,37 +214,84 @@ def create_handlers(cfg: Config, docker: DockerClient):
             f"Scaled {cfg.compose_project}/{cfg.compose_service} to {replicas}"
         )
 
-    return {
-        "start": start_cmd,
-        "list": list_cmd,
-        "logs": logs_cmd,
-        "startc": startc_cmd,
-        "stopc": stopc_cmd,
-        "restartc": restartc_cmd,
-        "rmc": rmc_cmd,
-        "new": new_cmd,
-        "scale": scale_cmd,
-    }
+    @commands.command(
+        "exec", emoji="💻", description="команда внутри контейнера",
+        args=(Arg("container"), Arg("cmd", variadic=True)),
+        role="admin", rate_limit=(3, 60),
+        # exec может идти долго — не блокируем обработку остальных апдейтов
+        block=False,
+    )
+    async def exec_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        address, cmd = context.args[0], context.args[1:]
+        if cmd[0] not in cfg.exec_allowed_commands:
+            await update.message.reply_text(f"Command not allowed: {cmd[0]}")
+            return
+        resolved = await _resolve(update, address)
+        if resolved is None:
+            return
+        _, client, name = resolved
+
+        header = f"$ {' '.join(cmd)}\n"
+        msg = await update.message.reply_text(header + "…")
+
+        chunks: list[str] = []
+        size = 0
+        last_edit = 0.0
+
+        async def on_output(data: str):
+            nonlocal size, last_edit
+            chunks.append(data)
+            size += len(data.encode("utf-8"))
+            if size > cfg.exec_file_threshold:
+                # дальше вывод уйдёт файлом, не тратим правки
+                return
+            now = time.monotonic()
+            if now - last_edit < EXEC_EDIT_INTERVAL:
+                return
+            last_edit = now
+            await _safe_edit(msg, header + "".join(chunks))
+
+        try:
+            exit_code = await client.exec_in_container(
+                name, cmd, on_output, timeout=cfg.exec_timeout
+            )
+            status = f"exit code {exit_code}"
+        except ValueError as e:
+            await _safe_edit(msg, str(e))
+            return
+        except asyncio.TimeoutError as e:
+            if getattr(e, "killed", False):
+                status = f"timed out after {cfg.exec_timeout}s, process killed"
+            else:
+                status = f"timed out after {cfg.exec_timeout}s, process may still be running"
+
+        output = "".join(chunks)
+        if size > cfg.exec_file_threshold:
+            await _safe_edit(msg, f"{header}[{status}, output attached]")
+            await update.message.reply_document(
+                document=InputFile(
+                    io.BytesIO(output.encode("utf-8")),
+                    filename=f"{name}_exec.txt",
+                )
+            )
+        else:
+            await _safe_edit(msg, f"{header}{output or '(no output)'}\n[{status}]")
+
+    return commands
+
+
+def create_handlers(cfg: Config, docker: DockerClient | HostRegistry):
+    return build_commands(cfg, docker).handlers()
 
 
 async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(f"echo: {update.message.text}")
 
 
-def register_handlers(app, cfg: Config, docker: DockerClient):
-    handlers = create_handlers(cfg, docker)
-
-    app.add_handler(CommandHandler("start", handlers["start"]))
-    app.add_handler(CommandHandler("list", handlers["list"]))
-    app.add_handler(CommandHandler("logs", handlers["logs"]))
-    app.add_handler(CommandHandler("startc", handlers["startc"]))
-    app.add_handler(CommandHandler("stopc", handlers["stopc"]))
-    app.add_handler(CommandHandler("restartc", handlers["restartc"]))
-    app.add_handler(CommandHandler("rmc", handlers["rmc"]))
-    app.add_handler(CommandHandler("new", handlers["new"]))
-    app.add_handler(CommandHandler("scale", handlers["scale"]))
+def register_handlers(app, cfg: Config, docker: DockerClient | HostRegistry):
+    commands = build_commands(cfg, docker)
+    commands.register(app)
 
     app.add_handler(MessageHandler(filters.ALL, echo))
 
-    return handlers
-
+    return commands.handlers()
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from .docker_client import DockerClient
+
+T = TypeVar("T")
+
+
+class HostRegistry:
+    """Набор Docker-хостов: по одному долгоживущему DockerClient на хост.
+
+    Контейнеры адресуются как ``host:container``; имя без префикса
+    относится к хосту по умолчанию (первому в списке).
+    """
+
+    def __init__(self, clients: dict[str, DockerClient], timeout: float = 5.0):
+        if not clients:
+            raise ValueError("At least one Docker host is required")
+        self._clients = dict(clients)
+        self.default = next(iter(self._clients))
+        self.timeout = timeout
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._clients)
+
+    @property
+    def is_multi(self) -> bool:
+        return len(self._clients) > 1
+
+    def get(self, host: str) -> DockerClient:
+        try:
+            return self._clients[host]
+        except KeyError:
+            raise ValueError(f"Unknown host: {host}")
+
+    def resolve(self, address: str) -> tuple[str, DockerClient, str]:
+        # в именах контейнеров Docker двоеточие не допускается
+        host, sep, name = address.partition(":")
+        if not sep:
+            return self.default, self._clients[self.default], address
+        return host, self.get(host), name
+
+    async def fan_out(
+        self, func: Callable[[DockerClient], Awaitable[T]]
+    ) -> dict[str, T | BaseException]:
+        """Вызывает ``func`` на всех хостах параллельно, у каждого свой таймаут.
+
+        Ошибка или таймаут одного хоста не мешает остальным: вместо
+        результата в словаре оказывается исключение.
+        """
+
+        async def _one(client: DockerClient):
+            return await asyncio.wait_for(func(client), self.timeout)
+
+        results = await asyncio.gather(
+            *(_one(client) for client in self._clients.values()),
+            return_exceptions=True,
+        )
+        return dict(zip(self._clients, results))
+
+    async def list_containers(self, all_: bool = True):
+        return await self.fan_out(lambda client: client.list_containers(all_=all_))
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.close()
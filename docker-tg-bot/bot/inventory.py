@@ -0,0 +1,99 @@
+from collections import deque
+from dataclasses import dataclass
+from statistics import median
+from typing import Iterable, Optional
+
+# состояния healthcheck в терминах Docker; "none" — healthcheck не задан
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+STARTING = "starting"
+NONE = "none"
+
+
+def parse_health(status: str) -> str:
+    """Состояние healthcheck из поля Status списка контейнеров,
+    например ``Up 5 minutes (health: starting)``.
+    """
+    lower = status.lower()
+    if "(health: starting)" in lower:
+        return STARTING
+    if "(unhealthy)" in lower:
+        return UNHEALTHY
+    if "(healthy)" in lower:
+        return HEALTHY
+    return NONE
+
+
+@dataclass
+class ReplicaState:
+    health: str
+    first_seen: float
+    unhealthy_checks: int = 0
+    seen_starting: bool = False
+
+    @property
+    def serving(self) -> bool:
+        # без healthcheck реплика считается рабочей, как и раньше
+        return self.health in (HEALTHY, NONE)
+
+
+class ReplicaInventory:
+    """Состояние здоровья реплик между проверками автоскейлера.
+
+    Считает подряд идущие unhealthy-проверки и время от старта реплики
+    до первого ``healthy``.
+    """
+
+    def __init__(self, samples: int = 20):
+        self._replicas: dict[str, ReplicaState] = {}
+        self._time_to_healthy: deque[float] = deque(maxlen=samples)
+
+    def __getitem__(self, replica_id: str) -> ReplicaState:
+        return self._replicas[replica_id]
+
+    def observe(
+        self,
+        replica_id: str,
+        health: str,
+        now: float,
+        created: Optional[float] = None,
+    ) -> ReplicaState:
+        state = self._replicas.get(replica_id)
+        if state is None:
+            state = ReplicaState(health=health, first_seen=created or now)
+            self._replicas[replica_id] = state
+        elif health == HEALTHY and state.health != HEALTHY and state.seen_starting:
+            self._time_to_healthy.append(now - state.first_seen)
+
+        state.health = health
+        if health == STARTING:
+            state.seen_starting = True
+        state.unhealthy_checks = state.unhealthy_checks + 1 if health == UNHEALTHY else 0
+        return state
+
+    def retain(self, replica_ids: Iterable[str]) -> None:
+        keep = set(replica_ids)
+        for replica_id in list(self._replicas):
+            if replica_id not in keep:
+                del self._replicas[replica_id]
+
+    def forget(self, replica_ids: Iterable[str]) -> None:
+        for replica_id in replica_ids:
+            self._replicas.pop(replica_id, None)
+
+    def starting(self) -> list[str]:
+        return [r for r, s in self._replicas.items() if s.health == STARTING]
+
+    def persistently_unhealthy(self, checks: int) -> list[str]:
+        if checks <= 0:
+            return []
+        return [r for r, s in self._replicas.items() if s.unhealthy_checks >= checks]
+
+    def time_to_healthy(self) -> list[float]:
+        return list(self._time_to_healthy)
+
+    def expected_time_to_healthy(self) -> float:
+        """Медиана последних замеров, 0 — если замеров ещё не было."""
+        if not self._time_to_healthy:
+            return 0.0
+        return median(self._time_to_healthy)
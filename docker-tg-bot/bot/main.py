@@ -1,10 +1,12 @@
 import logging
 
-from telegram.ext import ApplicationBuilder, CommandHandler
+from telegram.ext import ApplicationBuilder
 
+from .commands import Authorizer
 from .config import Config
 from .docker_client import DockerClient
-from .handlers import create_handlers
+from .handlers import register_handlers
+from .hosts import HostRegistry
 from .monitor import Autoscaler
 
 logging.basicConfig(
@@ -16,39 +18,47 @@ log = logging.getLogger(__name__)
 
 def main() -> None:
     cfg = Config.from_env()
-    docker = DockerClient()
-
-    async def _async_setup() -> tuple:
-        app = ApplicationBuilder().token(cfg.telegram_token).build()
-
-        handlers = create_handlers(cfg, docker)
-        app.add_handler(CommandHandler("start", handlers["start"]))
-        app.add_handler(CommandHandler("list", handlers["list"]))
-        app.add_handler(CommandHandler("logs", handlers["logs"]))
-        app.add_handler(CommandHandler("startc", handlers["startc"]))
-        app.add_handler(CommandHandler("stopc", handlers["stopc"]))
-        app.add_handler(CommandHandler("restartc", handlers["restartc"]))
-        app.add_handler(CommandHandler("rmc", handlers["rmc"]))
-        app.add_handler(CommandHandler("new", handlers["new"]))
-        app.add_handler(CommandHandler("scale", handlers["scale"]))
+    docker = HostRegistry(
+        {name: DockerClient(url) for name, url in cfg.docker_hosts.items()},
+        timeout=cfg.docker_host_timeout,
+    )
+    autoscaler: Autoscaler | None = None
+    # все чаты с ролью, включая заданные только через TELEGRAM_CHAT_ROLES
+    notify_chats = sorted(Authorizer(cfg).chat_ids)
+
+    # клиенты хостов держат сессии aiohttp, привязанные к циклу событий:
+    # создаются и закрываются в хуках Application, в цикле run_polling
+    async def post_init(app) -> None:
+        nonlocal autoscaler
 
         async def notify(msg: str):
-            for chat_id in cfg.allowed_chat_ids:
+            for chat_id in notify_chats:
                 await app.bot.send_message(chat_id=chat_id, text=msg)
 
         autoscaler = Autoscaler(cfg, docker, notify)
         autoscaler.start()
-        return app, autoscaler
 
-    import asyncio
-    app, autoscaler = asyncio.run(_async_setup())
+    async def post_stop(app) -> None:
+        # до shutdown: уведомления автоскейлера ещё могут уйти через app.bot
+        log.info("Stopping autoscaler")
+        if autoscaler is not None:
+            await autoscaler.stop()
+
+    async def post_shutdown(app) -> None:
+        await docker.close()
+
+    app = (
+        ApplicationBuilder()
+        .token(cfg.telegram_token)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    register_handlers(app, cfg, docker)
 
     log.info("Starting bot with run_polling")
-    try:
-        app.run_polling()
-    finally:
-        log.info("Stopping autoscaler")
-        asyncio.run(autoscaler.stop())
+    app.run_polling()
 
 
 if __name__ == "__main__":
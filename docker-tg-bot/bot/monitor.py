@@ -1,9 +1,13 @@
 import asyncio
 import logging
+import time
 from typing import Callable
 
 from .config import Config
 from .docker_client import DockerClient
+from .hosts import HostRegistry
+from .inventory import ReplicaInventory, parse_health
+from .stats import ReplicaCpuTracker
 
 log = logging.getLogger(__name__)
 
@@ -12,34 +16,161 @@ class Autoscaler:
     def __init__(
         self,
         cfg: Config,
-        docker: DockerClient,
+        docker: DockerClient | HostRegistry,
         notify_func: Callable[[str], "asyncio.Future"],
     ):
         self.cfg = cfg
         self.docker = docker
+        self.hosts = (
+            docker
+            if isinstance(docker, HostRegistry)
+            else HostRegistry({"local": docker})
+        )
         self.notify = notify_func
 
         self._task: asyncio.Task | None = None
         self._running = False
         self._replicas = cfg.min_replicas
+        self._cpu = ReplicaCpuTracker(cfg.cpu_aggregation, cfg.cpu_window)
+        # по последнему замеру: реплик сервиса и агрегированный CPU на хост
+        self._host_replicas: dict[str, int] = {}
+        self._host_load: dict[str, float] = {}
+        self.inventory = ReplicaInventory()
+        self._last_scale_up: float | None = None
+
+    def _is_warming_up(self, container, now: float) -> bool:
+        if self.cfg.cpu_warmup <= 0:
+            return False
+        created = container._container.get("Created")
+        if not created:
+            return False
+        return now - created < self.cfg.cpu_warmup
 
     async def _measure_cpu_avg(self) -> float:
-        containers = await self.docker.list_containers(all_=False)
-        cpu_values: list[float] = []
-
-        for c in containers:
-            name = c._container.get("Names", [""])[0].lstrip("/")
-            if not name.startswith(
-                f"{self.cfg.compose_project}_{self.cfg.compose_service}"
-            ):
+        results = await self.hosts.list_containers(all_=False)
+        errors = [r for r in results.values() if isinstance(r, BaseException)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+
+        now = time.time()
+        listed: list[str] = []
+        # (хост, ключ реплики, id контейнера) для замера CPU
+        measured: list[tuple[str, str, str]] = []
+        self._host_replicas = {}
+        self._host_load = {}
+
+        for host, containers in results.items():
+            if isinstance(containers, BaseException):
+                log.warning("Autoscaler: host %s unavailable: %r", host, containers)
                 continue
-            cpu = await self.docker.get_container_stats_cpu(c._id)
-            cpu_values.append(cpu)
 
-        if not cpu_values:
-            return 0.0
-
-        return sum(cpu_values) / len(cpu_values)
+            self._host_replicas[host] = 0
+            for c in containers:
+                name = c._container.get("Names", [""])[0].lstrip("/")
+                if not name.startswith(
+                    f"{self.cfg.compose_project}_{self.cfg.compose_service}"
+                ):
+                    continue
+                self._host_replicas[host] += 1
+                key = f"{host}:{c._id}"
+                state = self.inventory.observe(
+                    key,
+                    parse_health(c._container.get("Status", "")),
+                    now,
+                    created=c._container.get("Created"),
+                )
+                listed.append(key)
+                # стартующие и больные реплики не отражают реальную нагрузку
+                if not state.serving or self._is_warming_up(c, now):
+                    continue
+                measured.append((host, key, c._id))
+
+        # замеры параллельно и с таймаутом хоста: медленный или недоступный
+        # демон не задерживает весь тик, его реплики просто без данных
+        cpus = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self.hosts.get(host).get_container_stats_cpu(cid), self.hosts.timeout
+                )
+                for host, _, cid in measured
+            ),
+            return_exceptions=True,
+        )
+        seen: list[str] = []
+        host_seen: dict[str, list[str]] = {host: [] for host in self._host_replicas}
+        failed: set[str] = set()
+        for (host, key, _), cpu in zip(measured, cpus):
+            if isinstance(cpu, BaseException):
+                if host not in failed:
+                    log.warning("Autoscaler: CPU stats from %s failed: %r", host, cpu)
+                    failed.add(host)
+                continue
+            self._cpu.add(key, cpu)
+            host_seen[host].append(key)
+            seen.append(key)
+        for host, keys in host_seen.items():
+            self._host_load[host] = self._cpu.aggregate(keys)
+
+        self._cpu.retain(seen)
+        self.inventory.retain(listed)
+        if self.hosts.is_multi:
+            self._replicas = sum(self._host_replicas.values())
+        return self._cpu.aggregate()
+
+    async def _replace_unhealthy(self) -> None:
+        """Удаляет реплики, подряд проваливающие healthcheck, и пересоздаёт
+        их через compose: для пропускной способности они уже потеряны.
+        """
+        keys = self.inventory.persistently_unhealthy(self.cfg.unhealthy_replace_after)
+        hosts: set[str] = set()
+        for key in keys:
+            host, _, cid = key.partition(":")
+            await self.hosts.get(host).remove_container(cid, force=True)
+            hosts.add(host)
+            await self.notify(
+                f"Autoscale: replacing unhealthy replica {cid[:12]}"
+                + (f" on {host}" if self.hosts.is_multi else "")
+            )
+        self.inventory.forget(keys)
+
+        for host in hosts:
+            replicas = (
+                self._host_replicas.get(host, 0)
+                if self.hosts.is_multi
+                else self._replicas
+            )
+            await self.hosts.get(host).compose_scale(
+                self.cfg.compose_project,
+                self.cfg.compose_service,
+                replicas,
+                self.cfg.compose_project_dir,
+            )
+
+    def _scale_on_hold(self) -> bool:
+        # пока новые реплики не стали healthy, нагрузка ещё не перераспределилась
+        if self.inventory.starting():
+            return True
+        if self._last_scale_up is None:
+            return False
+        elapsed = time.monotonic() - self._last_scale_up
+        return elapsed < self.inventory.expected_time_to_healthy()
+
+    def _place(self, new_replicas: int) -> tuple[str, int]:
+        """Хост и его новое число реплик для перехода к ``new_replicas``."""
+        if not self.hosts.is_multi:
+            return self.hosts.default, new_replicas
+
+        delta = new_replicas - self._replicas
+        counts = self._host_replicas
+        if delta > 0:
+            # новые реплики — на наименее загруженный доступный хост
+            host = min(counts, key=lambda h: (self._host_load.get(h, 0.0), counts[h]))
+        else:
+            host = max(
+                (h for h in counts if counts[h] > 0),
+                key=lambda h: (counts[h], self._host_load.get(h, 0.0)),
+            )
+        return host, max(0, counts[host] + delta)
 
     async def _loop(self):
         self._running = True
@@ -48,6 +179,7 @@ class Autoscaler:
                 try:
                     cpu_avg = await self._measure_cpu_avg()
                     log.info("Autoscaler CPU avg=%.2f", cpu_avg)
+                    await self._replace_unhealthy()
 
                     # простое правило:
                     #  > threshold — +1 реплика
@@ -65,18 +197,33 @@ class Autoscaler:
                             self.cfg.min_replicas, self._replicas - 1
                         )
 
+                    if new_replicas != self._replicas and self._scale_on_hold():
+                        log.info(
+                            "Autoscaler: %d replicas starting, expected "
+                            "time-to-healthy %.1fs, holding at %d",
+                            len(self.inventory.starting()),
+                            self.inventory.expected_time_to_healthy(),
+                            self._replicas,
+                        )
+                        new_replicas = self._replicas
+
                     if new_replicas != self._replicas:
-                        await self.docker.compose_scale(
+                        host, host_replicas = self._place(new_replicas)
+                        await self.hosts.get(host).compose_scale(
                             self.cfg.compose_project,
                             self.cfg.compose_service,
-                            new_replicas,
+                            host_replicas,
                             self.cfg.compose_project_dir,
                         )
                         msg = (
                             f"Autoscale: {self._replicas} -> {new_replicas} "
                             f"replicas (CPU avg={cpu_avg:.2f})"
                         )
+                        if self.hosts.is_multi:
+                            msg += f" on {host}: {host_replicas}"
                         await self.notify(msg)
+                        if new_replicas > self._replicas:
+                            self._last_scale_up = time.monotonic()
                         self._replicas = new_replicas
 
                 except Exception as e:
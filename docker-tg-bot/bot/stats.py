@@ -0,0 +1,131 @@
+import bisect
+import re
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+
+class SlidingWindow:
+    """Последние ``size`` замеров одной реплики.
+
+    Рядом с очередью держим отсортированную копию, поэтому квантили
+    считаются за O(1). Добавление и вытеснение — O(log n) на поиск места
+    плюс O(n) на сдвиг элементов списка; для окон в десятки-сотни замеров
+    это один memmove, дешевле любого дерева на Python.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("window size must be >= 1")
+        self._values: deque[float] = deque()
+        self._sorted: list[float] = []
+        self._size = size
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: float) -> None:
+        if len(self._values) == self._size:
+            old = self._values.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self._values.append(value)
+        bisect.insort(self._sorted, value)
+
+    def sorted_values(self) -> list[float]:
+        return self._sorted
+
+
+def _quantile(sorted_values: list[float], q: float) -> float:
+    # линейная интерполяция между соседними порядковыми статистиками
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    frac = pos - lo
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+
+
+def _mean(sorted_values: list[float]) -> float:
+    if not sorted_values:
+        return 0.0
+    return sum(sorted_values) / len(sorted_values)
+
+
+def _trimmed_mean(sorted_values: list[float], proportion: float) -> float:
+    k = int(len(sorted_values) * proportion)
+    trimmed = sorted_values[k : len(sorted_values) - k] or sorted_values
+    return _mean(trimmed)
+
+
+_PERCENTILE_RE = re.compile(r"^p(\d{1,2}(?:\.\d+)?)$")
+_TRIMMED_RE = re.compile(r"^trimmed(\d{1,2})?$")
+
+Aggregator = Callable[[list[float]], float]
+
+
+def make_aggregator(spec: str) -> Aggregator:
+    """Функция агрегации по имени: ``mean``, ``median``, ``max``,
+    ``pNN`` (например ``p90``) или ``trimmedNN`` (срез NN % с каждого края,
+    по умолчанию 10). Функция принимает уже отсортированный список.
+    """
+    spec = spec.strip().lower()
+    if spec == "mean":
+        return _mean
+    if spec == "median":
+        return lambda values: _quantile(values, 0.5)
+    if spec == "max":
+        return lambda values: values[-1] if values else 0.0
+
+    m = _PERCENTILE_RE.match(spec)
+    if m:
+        q = float(m.group(1)) / 100
+        return lambda values: _quantile(values, q)
+
+    m = _TRIMMED_RE.match(spec)
+    if m:
+        proportion = int(m.group(1) or 10) / 100
+        if proportion >= 0.5:
+            raise ValueError(f"Invalid trimmed proportion: {spec}")
+        return lambda values: _trimmed_mean(values, proportion)
+
+    raise ValueError(f"Unknown CPU aggregation: {spec}")
+
+
+class ReplicaCpuTracker:
+    """Окно замеров CPU на каждую реплику и двухуровневая агрегация:
+    сначала внутри окна реплики, затем между репликами.
+    """
+
+    def __init__(self, aggregation: str = "mean", window: int = 1):
+        self._aggregate = make_aggregator(aggregation)
+        self._window = window
+        self._replicas: dict[str, SlidingWindow] = {}
+
+    def add(self, replica_id: str, value: float) -> None:
+        window = self._replicas.get(replica_id)
+        if window is None:
+            window = self._replicas[replica_id] = SlidingWindow(self._window)
+        window.add(value)
+
+    def retain(self, replica_ids: Iterable[str]) -> None:
+        # забываем окна реплик, которых больше нет
+        keep = set(replica_ids)
+        for replica_id in list(self._replicas):
+            if replica_id not in keep:
+                del self._replicas[replica_id]
+
+    def replica_value(self, replica_id: str) -> float:
+        window = self._replicas.get(replica_id)
+        if window is None:
+            return 0.0
+        return self._aggregate(window.sorted_values())
+
+    def aggregate(self, replica_ids: Optional[Iterable[str]] = None) -> float:
+        if replica_ids is None:
+            windows = list(self._replicas.values())
+        else:
+            windows = [self._replicas[r] for r in replica_ids if r in self._replicas]
+        per_replica = sorted(
+            self._aggregate(w.sorted_values()) for w in windows if len(w)
+        )
+        return self._aggregate(per_replica)
@@ -0,0 +1,137 @@
+import types
+
+import pytest
+from telegram.ext import ApplicationHandlerStop, CommandHandler, TypeHandler
+
+from bot.commands import Arg, Authorizer, Command, CommandRegistry, RateLimiter
+from bot.config import Config
+
+
+class DummyUpdate:
+    def __init__(self, chat_id=1):
+        self.effective_chat = types.SimpleNamespace(id=chat_id)
+        self._texts: list[str] = []
+
+        async def _reply_text(text, **kwargs):
+            self._texts.append(text)
+
+        self.message = types.SimpleNamespace(reply_text=_reply_text)
+
+
+class DummyContext:
+    def __init__(self, args=None):
+        self.args = args or []
+
+
+def _cfg(**kwargs):
+    return Config(telegram_token="x", allowed_chat_ids=[1], **kwargs)
+
+
+async def _noop(update, context):
+    pass
+
+
+def test_command_usage_and_args():
+    cmd = Command(
+        "scale",
+        _noop,
+        args=(Arg("replicas", int), Arg("host", optional=True)),
+    )
+
+    assert cmd.usage == "/scale <replicas> [host]"
+    assert cmd.check_args(["3"])
+    assert cmd.check_args(["3", "h1"])
+    assert not cmd.check_args([])
+    assert not cmd.check_args(["three"])
+    assert not cmd.check_args(["3", "h1", "extra"])
+
+    exec_cmd = Command("exec", _noop, args=(Arg("container"), Arg("cmd", variadic=True)))
+    assert exec_cmd.usage == "/exec <container> <cmd...>"
+    assert exec_cmd.check_args(["web", "ps", "aux"])
+    assert not exec_cmd.check_args(["web"])
+
+
+def test_authorizer_roles():
+    auth = Authorizer(_cfg(chat_roles={2: "viewer", 3: "operator"}))
+
+    assert auth.chat_ids == frozenset({1, 2, 3})
+    assert auth.allows(1, "admin")
+    assert auth.allows(2, "viewer")
+    assert not auth.allows(2, "operator")
+    assert auth.allows(3, "operator")
+    assert not auth.allows(3, "admin")
+    assert not auth.allows(999, "viewer")
+    assert not auth.allows(None)
+
+    with pytest.raises(ValueError):
+        Authorizer(_cfg(chat_roles={2: "root"}))
+
+
+def test_rate_limiter_window():
+    now = [0.0]
+    limiter = RateLimiter(clock=lambda: now[0])
+
+    assert limiter.retry_after(1, "logs", (2, 10)) == 0
+    assert limiter.retry_after(1, "logs", (2, 10)) == 0
+    assert limiter.retry_after(1, "logs", (2, 10)) == pytest.approx(10)
+    # другой чат и другая команда считаются отдельно
+    assert limiter.retry_after(2, "logs", (2, 10)) == 0
+    assert limiter.retry_after(1, "list", (2, 10)) == 0
+
+    now[0] = 10.0
+    assert limiter.retry_after(1, "logs", (2, 10)) == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_wrapper_checks_role_args_and_rate():
+    registry = CommandRegistry(_cfg(chat_roles={2: "viewer"}))
+    calls = []
+
+    @registry.command("rmc", args=(Arg("container"),), role="admin", rate_limit=(1, 60))
+    async def rmc(update, context):
+        calls.append(context.args)
+
+    handler = registry.handlers()["rmc"]
+
+    viewer = DummyUpdate(chat_id=2)
+    await handler(viewer, DummyContext(args=["web"]))
+    assert viewer._texts == [] and calls == []
+
+    upd = DummyUpdate(chat_id=1)
+    await handler(upd, DummyContext())
+    assert upd._texts == ["Usage: /rmc <container>"]
+
+    await handler(upd, DummyContext(args=["web"]))
+    await handler(upd, DummyContext(args=["web"]))
+    assert calls == [["web"]]
+    assert "Too many /rmc requests" in upd._texts[-1]
+
+
+@pytest.mark.asyncio
+async def test_registry_registers_guard_and_commands():
+    registry = CommandRegistry(_cfg())
+
+    @registry.command("list")
+    async def list_cmd(update, context):
+        pass
+
+    @registry.command("exec", block=False)
+    async def exec_cmd(update, context):
+        pass
+
+    added = []
+    app = types.SimpleNamespace(
+        add_handler=lambda handler, group=0: added.append((handler, group))
+    )
+    registry.register(app)
+
+    guard, group = added[0]
+    assert isinstance(guard, TypeHandler) and group == -1
+    commands = {next(iter(h.commands)): h for h, _ in added[1:]}
+    assert set(commands) == {"list", "exec"}
+    assert isinstance(commands["exec"], CommandHandler)
+    assert commands["exec"].block is False
+
+    with pytest.raises(ApplicationHandlerStop):
+        await registry._drop_unauthorized(DummyUpdate(chat_id=999), DummyContext())
+    await registry._drop_unauthorized(DummyUpdate(chat_id=1), DummyContext())
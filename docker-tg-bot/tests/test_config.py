@@ -15,6 +15,13 @@ def test_from_env_ok(monkeypatch):
     monkeypatch.setenv("COMPOSE_PROJECT", "proj")
     monkeypatch.setenv("COMPOSE_SERVICE", "svc")
     monkeypatch.setenv("COMPOSE_PROJECT_DIR", "/proj-dir")
+    monkeypatch.setenv("CPU_AGGREGATION", "p90")
+    monkeypatch.setenv("CPU_WINDOW", "6")
+    monkeypatch.setenv("CPU_WARMUP", "45")
+    monkeypatch.setenv("UNHEALTHY_REPLACE_AFTER", "4")
+    monkeypatch.setenv("EXEC_ALLOWED_COMMANDS", "ps, df")
+    monkeypatch.setenv("TELEGRAM_CHAT_ROLES", "4=viewer,5=operator")
+    monkeypatch.setenv("DOCKER_HOSTS", "a=tcp://10.0.0.1:2375, b=ssh://deploy@10.0.0.2")
 
     cfg = Config.from_env()
 
@@ -27,6 +34,16 @@ def test_from_env_ok(monkeypatch):
     assert cfg.compose_project == "proj"
     assert cfg.compose_service == "svc"
     assert cfg.compose_project_dir == "/proj-dir"
+    assert cfg.cpu_aggregation == "p90"
+    assert cfg.cpu_window == 6
+    assert cfg.cpu_warmup == 45
+    assert cfg.unhealthy_replace_after == 4
+    assert cfg.exec_allowed_commands == ["ps", "df"]
+    assert cfg.chat_roles == {4: "viewer", 5: "operator"}
+    assert cfg.docker_hosts == {
+        "a": "tcp://10.0.0.1:2375",
+        "b": "ssh://deploy@10.0.0.2",
+    }
 
 
 def test_from_env_missing_token(monkeypatch):
@@ -44,3 +61,23 @@ def test_from_env_missing_chats(monkeypatch):
     with pytest.raises(RuntimeError):
         Config.from_env()
 
+
+
+def test_from_env_default_docker_host(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "token123")
+    monkeypatch.setenv("TELEGRAM_ALLOWED_CHATS", "1")
+    monkeypatch.delenv("DOCKER_HOSTS", raising=False)
+    monkeypatch.setenv("DOCKER_HOST", "tcp://127.0.0.1:2375")
+
+    cfg = Config.from_env()
+
+    assert cfg.docker_hosts == {"local": "tcp://127.0.0.1:2375"}
+
+
+def test_from_env_invalid_docker_hosts(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "token123")
+    monkeypatch.setenv("TELEGRAM_ALLOWED_CHATS", "1")
+    monkeypatch.setenv("DOCKER_HOSTS", "tcp://no-name")
+
+    with pytest.raises(RuntimeError):
+        Config.from_env()
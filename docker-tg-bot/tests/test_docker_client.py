@@ -1,4 +1,5 @@
 import asyncio
+import types
 
 import pytest
 
@@ -248,3 +249,120 @@ async def test_compose_scale_fail(monkeypatch, tmp_path):
             project_dir=str(tmp_path),
         )
 
+
+
+def _exec_docker(has_timeout=True, exit_code=3, messages=(b"hello ", b"world")):
+    from aiodocker.stream import Message
+
+    class DummyStream:
+        def __init__(self, chunks):
+            self._messages = [Message(1, c) for c in chunks]
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+        async def read_out(self):
+            return self._messages.pop(0) if self._messages else None
+
+    class DummyExec:
+        def __init__(self, cmd):
+            self.cmd = cmd
+
+        def start(self, detach=False):
+            return DummyStream(() if self.cmd[-1] == "true" else messages)
+
+        async def inspect(self):
+            if self.cmd[:1] == ["timeout"] and not has_timeout:
+                return {"ExitCode": 127}
+            if self.cmd[-1] == "true":
+                return {"ExitCode": 0}
+            return {"ExitCode": exit_code}
+
+    class DummyContainer:
+        id = "c1"
+
+        def __init__(self):
+            self.cmds = []
+
+        async def exec(self, cmd, **kwargs):
+            self.cmds.append(cmd)
+            return DummyExec(cmd)
+
+    class DummyDocker:
+        def __init__(self):
+            self.containers = self
+            self.container = DummyContainer()
+
+        async def get(self, name):
+            return self.container
+
+        async def close(self):
+            pass
+
+    return DummyDocker()
+
+
+def _client_with(monkeypatch, docker):
+    client = DockerClient()
+
+    async def fake_get(self):
+        return docker
+
+    monkeypatch.setattr(client, "_get", fake_get.__get__(client))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_exec_in_container_streams_output(monkeypatch):
+    docker = _exec_docker()
+    client = _client_with(monkeypatch, docker)
+
+    out = []
+
+    async def on_output(data):
+        out.append(data)
+
+    rc = await client.exec_in_container("foo", ["echo", "hi"], on_output, timeout=5)
+    assert rc == 3
+    assert "".join(out) == "hello world"
+    # проба один раз, затем команда под timeout
+    assert docker.container.cmds == [
+        ["timeout", "-s", "KILL", "5", "true"],
+        ["timeout", "-s", "KILL", "5", "echo", "hi"],
+    ]
+
+    await client.exec_in_container("foo", ["echo", "hi"], on_output)
+    assert docker.container.cmds[-1] == ["echo", "hi"]
+    assert len(docker.container.cmds) == 3
+
+
+@pytest.mark.asyncio
+async def test_exec_in_container_kills_on_timeout(monkeypatch):
+    from bot import docker_client as dc
+
+    docker = _exec_docker(exit_code=137)
+    client = _client_with(monkeypatch, docker)
+    clock = iter([100.0, 110.0])
+    monkeypatch.setattr(dc, "time", types.SimpleNamespace(monotonic=lambda: next(clock)))
+
+    async def on_output(data):
+        pass
+
+    with pytest.raises(dc.ExecTimeout) as err:
+        await client.exec_in_container("foo", ["sleep", "100"], on_output, timeout=5)
+    assert err.value.killed
+
+
+@pytest.mark.asyncio
+async def test_exec_in_container_without_timeout_binary(monkeypatch):
+    docker = _exec_docker(has_timeout=False, exit_code=0)
+    client = _client_with(monkeypatch, docker)
+
+    async def on_output(data):
+        pass
+
+    assert await client.exec_in_container("foo", ["ps"], on_output, timeout=5) == 0
+    assert docker.container.cmds[-1] == ["ps"]
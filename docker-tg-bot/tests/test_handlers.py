@@ -1,9 +1,10 @@
+import asyncio
 import types
 
 import pytest
 
 from bot.config import Config
-from bot.docker_client import DockerClient
+from bot.docker_client import DockerClient, ExecTimeout
 from bot.handlers import create_handlers
 
 
@@ -12,9 +13,14 @@ class DummyUpdate:
         self.effective_chat = types.SimpleNamespace(id=chat_id)
         self._texts: list[str] = []
         self._docs: list[object] = []
+        self._edits: list[str] = []
+
+        async def _edit_text(text, **kwargs):
+            self._edits.append(text)
 
         async def _reply_text(text, **kwargs):
             self._texts.append(text)
+            return types.SimpleNamespace(edit_text=_edit_text)
 
         async def _reply_doc(document, **kwargs):
             self._docs.append(document)
@@ -268,3 +274,105 @@ async def test_handlers_auth_block(monkeypatch):
     await list_cmd(upd, ctx)
     assert upd._texts == []
 
+
+
+@pytest.mark.asyncio
+async def test_exec_cmd(monkeypatch):
+    cfg = _cfg()
+    cfg.exec_allowed_commands = ["ps", "cat"]
+    cfg.exec_file_threshold = 20
+
+    class DummyDocker(DockerClient):
+        async def exec_in_container(self, name, cmd, on_output, timeout=None):
+            self.last_exec = (name, cmd, timeout)
+            if cmd[0] == "cat":
+                await on_output("x" * 50)
+            else:
+                await on_output("PID CMD\n")
+                await on_output("1 nginx\n")
+            return 0
+
+    docker = DummyDocker()
+    handlers = create_handlers(cfg, docker)
+    exec_cmd = handlers["exec"]
+
+    upd_usage = DummyUpdate(chat_id=1)
+    await exec_cmd(upd_usage, DummyContext(args=["web"]))
+    assert any("Usage: /exec" in t for t in upd_usage._texts)
+
+    upd_denied = DummyUpdate(chat_id=1)
+    await exec_cmd(upd_denied, DummyContext(args=["web", "rm", "-rf", "/"]))
+    assert any("not allowed" in t for t in upd_denied._texts)
+
+    upd_ok = DummyUpdate(chat_id=1)
+    await exec_cmd(upd_ok, DummyContext(args=["web", "ps", "aux"]))
+    assert docker.last_exec == ("web", ["ps", "aux"], cfg.exec_timeout)
+    assert "1 nginx" in upd_ok._edits[-1]
+    assert "exit code 0" in upd_ok._edits[-1]
+    assert not upd_ok._docs
+
+    upd_big = DummyUpdate(chat_id=1)
+    await exec_cmd(upd_big, DummyContext(args=["web", "cat", "big.log"]))
+    assert upd_big._docs
+    assert "output attached" in upd_big._edits[-1]
+
+
+@pytest.mark.asyncio
+async def test_exec_cmd_timeout_and_missing(monkeypatch):
+    cfg = _cfg()
+    cfg.exec_allowed_commands = ["sleep"]
+
+    class DummyDocker(DockerClient):
+        def __init__(self, exc):
+            self._exc = exc
+
+        async def exec_in_container(self, name, cmd, on_output, timeout=None):
+            raise self._exc
+
+    handlers = create_handlers(cfg, DummyDocker(asyncio.TimeoutError()))
+    upd = DummyUpdate(chat_id=1)
+    await handlers["exec"](upd, DummyContext(args=["web", "sleep", "100"]))
+    assert "timed out" in upd._edits[-1]
+    assert "may still be running" in upd._edits[-1]
+
+    handlers = create_handlers(cfg, DummyDocker(ExecTimeout(cfg.exec_timeout, killed=True)))
+    upd = DummyUpdate(chat_id=1)
+    await handlers["exec"](upd, DummyContext(args=["web", "sleep", "100"]))
+    assert "process killed" in upd._edits[-1]
+
+    handlers = create_handlers(cfg, DummyDocker(ValueError("Container web not found")))
+    upd = DummyUpdate(chat_id=1)
+    await handlers["exec"](upd, DummyContext(args=["web", "sleep", "1"]))
+    assert "not found" in upd._edits[-1]
+
+
+@pytest.mark.asyncio
+async def test_start_lists_only_permitted_commands(monkeypatch):
+    cfg = _cfg()
+    cfg.chat_roles = {2: "viewer"}
+
+    handlers = create_handlers(cfg, DockerClient())
+
+    upd_admin = DummyUpdate(chat_id=1)
+    await handlers["start"](upd_admin, DummyContext())
+    assert "/rmc <container>" in upd_admin._texts[0]
+
+    upd_viewer = DummyUpdate(chat_id=2)
+    await handlers["start"](upd_viewer, DummyContext())
+    assert "/list" in upd_viewer._texts[0]
+    assert "/rmc" not in upd_viewer._texts[0]
+
+
+@pytest.mark.asyncio
+async def test_scale_cmd_rejects_non_integer(monkeypatch):
+    cfg = _cfg()
+
+    class DummyDocker(DockerClient):
+        async def compose_scale(self, project, service, replicas, project_dir):
+            raise AssertionError("must not be called")
+
+    handlers = create_handlers(cfg, DummyDocker())
+
+    upd = DummyUpdate(chat_id=1)
+    await handlers["scale"](upd, DummyContext(args=["many"]))
+    assert upd._texts == ["Usage: /scale <replicas> [host]"]
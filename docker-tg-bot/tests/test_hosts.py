@@ -0,0 +1,236 @@
+import asyncio
+import types
+
+import pytest
+from aiohttp import web
+
+from bot.config import Config
+from bot.docker_client import DockerClient
+from bot.handlers import create_handlers
+from bot.hosts import HostRegistry
+from bot.monitor import Autoscaler
+
+
+class FakeDaemon:
+    """Минимальный Docker Engine API поверх aiohttp: список, inspect,
+    stats и start. Достаточно, чтобы гонять настоящий aiodocker.
+    """
+
+    def __init__(self, containers, cpu=0.0, delay=0.0, stats_delay=0.0):
+        # containers: {id: name}
+        self.containers = containers
+        self.cpu = cpu
+        self.delay = delay
+        self.stats_delay = stats_delay
+        self.started: list[str] = []
+        self._runner = None
+        self.url = None
+
+    def _summary(self, cid):
+        return {
+            "Id": cid,
+            "Names": [f"/{self.containers[cid]}"],
+            "Status": "Up 5 minutes",
+            "State": "running",
+        }
+
+    def _find(self, ref):
+        for cid, name in self.containers.items():
+            if ref in (cid, name):
+                return cid
+        raise web.HTTPNotFound(
+            text='{"message": "No such container"}', content_type="application/json"
+        )
+
+    async def version(self, request):
+        return web.json_response({"ApiVersion": "1.43"})
+
+    async def list(self, request):
+        await asyncio.sleep(self.delay)
+        return web.json_response([self._summary(cid) for cid in self.containers])
+
+    async def inspect(self, request):
+        cid = self._find(request.match_info["ref"])
+        return web.json_response({"Id": cid, "Name": f"/{self.containers[cid]}"})
+
+    async def stats(self, request):
+        self._find(request.match_info["ref"])
+        await asyncio.sleep(self.stats_delay)
+        return web.json_response(
+            {
+                "cpu_stats": {
+                    "cpu_usage": {"total_usage": int(self.cpu * 1000)},
+                    "system_cpu_usage": 2000,
+                },
+                "precpu_stats": {
+                    "cpu_usage": {"total_usage": 0},
+                    "system_cpu_usage": 1000,
+                },
+            }
+        )
+
+    async def start(self, request):
+        self.started.append(self._find(request.match_info["ref"]))
+        return web.Response(status=204)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/version", self.version)
+        app.router.add_get("/{v}/containers/json", self.list)
+        app.router.add_get("/{v}/containers/{ref}/json", self.inspect)
+        app.router.add_get("/{v}/containers/{ref}/stats", self.stats)
+        app.router.add_post("/{v}/containers/{ref}/start", self.start)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+class DummyUpdate:
+    def __init__(self, chat_id=1):
+        self.effective_chat = types.SimpleNamespace(id=chat_id)
+        self._texts: list[str] = []
+
+        async def _reply_text(text, **kwargs):
+            self._texts.append(text)
+
+        self.message = types.SimpleNamespace(reply_text=_reply_text)
+
+
+class DummyContext:
+    def __init__(self, args=None):
+        self.args = args or []
+
+
+def _cfg():
+    return Config(
+        telegram_token="x",
+        allowed_chat_ids=[1],
+        autoscale_interval=0,
+        cpu_threshold=0.7,
+        max_replicas=5,
+        min_replicas=1,
+        compose_project="my_stack",
+        compose_service="web",
+    )
+
+
+def test_resolve_addresses():
+    registry = HostRegistry({"a": DockerClient("tcp://a"), "b": DockerClient("tcp://b")})
+
+    assert registry.resolve("web-1")[0] == "a"
+    host, client, name = registry.resolve("b:web-1")
+    assert (host, client.base_url, name) == ("b", "tcp://b", "web-1")
+    with pytest.raises(ValueError):
+        registry.resolve("nope:web-1")
+
+
+@pytest.mark.asyncio
+async def test_list_fans_out_with_per_host_timeout():
+    async with FakeDaemon({"aaa111": "my_stack_web-1"}) as d1, FakeDaemon(
+        {"bbb222": "my_stack_web-2"}
+    ) as d2, FakeDaemon({"ccc333": "slow"}, delay=1.0) as d3:
+        registry = HostRegistry(
+            {
+                "h1": DockerClient(d1.url),
+                "h2": DockerClient(d2.url),
+                "slow": DockerClient(d3.url),
+            },
+            timeout=0.3,
+        )
+        try:
+            handlers = create_handlers(_cfg(), registry)
+            upd = DummyUpdate()
+            await handlers["list"](upd, DummyContext())
+        finally:
+            await registry.close()
+
+    text = upd._texts[0]
+    assert "[h1]" in text and "my_stack_web-1" in text
+    assert "[h2]" in text and "my_stack_web-2" in text
+    assert "slow: unavailable" in text
+
+
+@pytest.mark.asyncio
+async def test_host_prefixed_command():
+    async with FakeDaemon({"aaa111": "web"}) as d1, FakeDaemon(
+        {"bbb222": "web"}
+    ) as d2:
+        registry = HostRegistry({"h1": DockerClient(d1.url), "h2": DockerClient(d2.url)})
+        try:
+            handlers = create_handlers(_cfg(), registry)
+            upd = DummyUpdate()
+            await handlers["startc"](upd, DummyContext(args=["h2:web"]))
+        finally:
+            await registry.close()
+
+    assert upd._texts == ["Started"]
+    assert d1.started == []
+    assert d2.started == ["bbb222"]
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_places_replica_on_least_loaded_host():
+    async with FakeDaemon({"aaa111": "my_stack_web-1"}, cpu=1.0) as d1, FakeDaemon(
+        {"bbb222": "my_stack_web-2"}, cpu=0.6
+    ) as d2:
+        clients = {"busy": DockerClient(d1.url), "idle": DockerClient(d2.url)}
+        scaled = []
+
+        async def fake_scale(host, project, service, replicas, project_dir):
+            scaled.append((host, replicas))
+
+        for host, client in clients.items():
+            client.compose_scale = lambda *a, _h=host: fake_scale(_h, *a)
+
+        registry = HostRegistry(clients)
+        notifications = []
+
+        async def notify(msg: str):
+            notifications.append(msg)
+
+        autoscaler = Autoscaler(_cfg(), registry, notify)
+        try:
+            cpu = await autoscaler._measure_cpu_avg()
+            assert cpu == pytest.approx(0.8)
+            assert autoscaler._replicas == 2
+
+            host, replicas = autoscaler._place(3)
+            assert (host, replicas) == ("idle", 2)
+
+            host, replicas = autoscaler._place(1)
+            assert (host, replicas) == ("busy", 0)
+        finally:
+            await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_skips_host_with_slow_stats():
+    async with FakeDaemon({"aaa111": "my_stack_web-1"}, cpu=0.9) as d1, FakeDaemon(
+        {"bbb222": "my_stack_web-2"}, cpu=0.1, stats_delay=1.0
+    ) as d2:
+        registry = HostRegistry(
+            {"fast": DockerClient(d1.url), "slow": DockerClient(d2.url)}, timeout=0.3
+        )
+
+        async def notify(msg: str):
+            pass
+
+        autoscaler = Autoscaler(_cfg(), registry, notify)
+        try:
+            started = asyncio.get_running_loop().time()
+            cpu = await autoscaler._measure_cpu_avg()
+            elapsed = asyncio.get_running_loop().time() - started
+        finally:
+            await registry.close()
+
+    # реплика медленного хоста посчитана, но без данных о CPU
+    assert cpu == pytest.approx(0.9)
+    assert autoscaler._replicas == 2
+    assert elapsed < 1.0
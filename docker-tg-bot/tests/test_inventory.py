@@ -0,0 +1,53 @@
+import pytest
+
+from bot.inventory import (
+    HEALTHY,
+    NONE,
+    STARTING,
+    UNHEALTHY,
+    ReplicaInventory,
+    parse_health,
+)
+
+
+@pytest.mark.parametrize(
+    "status, expected",
+    [
+        ("Up 5 minutes (healthy)", HEALTHY),
+        ("Up 2 seconds (health: starting)", STARTING),
+        ("Up 3 minutes (unhealthy)", UNHEALTHY),
+        ("Up 1 second", NONE),
+    ],
+)
+def test_parse_health(status, expected):
+    assert parse_health(status) == expected
+
+
+def test_time_to_healthy_measured_from_creation():
+    inv = ReplicaInventory()
+    inv.observe("a", STARTING, now=105.0, created=100.0)
+    inv.observe("a", STARTING, now=110.0)
+    inv.observe("a", HEALTHY, now=112.0)
+    # уже healthy при первом замере — время неизвестно, не учитываем
+    inv.observe("b", HEALTHY, now=112.0, created=50.0)
+
+    assert inv.time_to_healthy() == [12.0]
+    assert inv.expected_time_to_healthy() == 12.0
+    assert inv.starting() == []
+
+
+def test_persistently_unhealthy_counts_consecutive_checks():
+    inv = ReplicaInventory()
+    inv.observe("a", UNHEALTHY, now=1.0)
+    inv.observe("a", UNHEALTHY, now=2.0)
+    inv.observe("a", HEALTHY, now=3.0)
+    inv.observe("a", UNHEALTHY, now=4.0)
+    assert inv.persistently_unhealthy(2) == []
+
+    inv.observe("a", UNHEALTHY, now=5.0)
+    assert inv.persistently_unhealthy(2) == ["a"]
+    assert inv.persistently_unhealthy(0) == []
+    assert not inv["a"].serving
+
+    inv.forget(["a"])
+    assert inv.persistently_unhealthy(2) == []
@@ -7,38 +7,62 @@ from bot import main as main_mod
 
 
 class DummyApp:
-    def __init__(self):
+    def __init__(self, hooks):
         self.handlers = []
+        self.hooks = hooks
         self.bot = types.SimpleNamespace(send_message=self._send_message)
-        self.run_polling_called = False
         self.sent_messages = []
+        self.loops = {}
 
     async def _send_message(self, chat_id, text):
         self.sent_messages.append((chat_id, text))
 
-    def add_handler(self, handler):
+    def add_handler(self, handler, group=0):
         self.handlers.append(handler)
 
     def run_polling(self):
-        self.run_polling_called = True
+        # как PTB: все хуки в одном цикле, который затем закрывается
+        async def _lifecycle():
+            for name in ("post_init", "post_stop", "post_shutdown"):
+                self.loops[name] = asyncio.get_running_loop()
+                await self.hooks[name](self)
+
+        asyncio.run(_lifecycle())
 
 
 class DummyApplicationBuilder:
     def __init__(self):
         self._token = None
+        self._hooks = {}
 
     def token(self, token):
         self._token = token
         return self
 
+    def post_init(self, func):
+        self._hooks["post_init"] = func
+        return self
+
+    def post_stop(self, func):
+        self._hooks["post_stop"] = func
+        return self
+
+    def post_shutdown(self, func):
+        self._hooks["post_shutdown"] = func
+        return self
+
     def build(self):
-        return DummyApp()
+        return DummyApp(self._hooks)
 
 
 class DummyDocker:
-    def __init__(self):
+    def __init__(self, base_url=None):
+        self.base_url = base_url
         self.closed = False
 
+    async def close(self):
+        self.closed = True
+
 
 class DummyAutoscaler:
     def __init__(self, cfg, docker, notify):
@@ -60,27 +84,61 @@ def _setup_env(monkeypatch):
     monkeypatch.setenv("TELEGRAM_ALLOWED_CHATS", "1,2")
 
 
-def fake_asyncio_run(coro):
-    return asyncio.get_event_loop().run_until_complete(coro)
-
-
-def test_main_runs_setup_and_polling(monkeypatch):
+def test_main_runs_hosts_lifecycle_in_polling_loop(monkeypatch):
     _setup_env(monkeypatch)
 
     monkeypatch.setattr(main_mod, "ApplicationBuilder", DummyApplicationBuilder)
     monkeypatch.setattr(main_mod, "DockerClient", DummyDocker)
-    monkeypatch.setattr(main_mod, "Autoscaler", DummyAutoscaler)
-    monkeypatch.setattr(asyncio, "run", fake_asyncio_run)
 
-    app_holder = {}
+    autoscalers = []
+    monkeypatch.setattr(
+        main_mod,
+        "Autoscaler",
+        lambda *a: autoscalers.append(DummyAutoscaler(*a)) or autoscalers[-1],
+    )
+    apps = []
+    orig_build = DummyApplicationBuilder.build
+    monkeypatch.setattr(
+        DummyApplicationBuilder,
+        "build",
+        lambda self: apps.append(orig_build(self)) or apps[-1],
+    )
 
-    def fake_run_polling(self):
-        app_holder["app"] = self
+    main_mod.main()
 
-    monkeypatch.setattr(DummyApp, "run_polling", fake_run_polling)
+    app = apps[0]
+    assert app.handlers
+    assert len(set(app.loops.values())) == 1
+    (autoscaler,) = autoscalers
+    assert autoscaler.started and autoscaler.stopped
+    assert all(c.closed for c in autoscaler.docker._clients.values())
 
-    main_mod.main()
 
-    app = app_holder["app"]
-    assert isinstance(app, DummyApp)
+def test_notify_reaches_chats_with_roles_only(monkeypatch):
+    _setup_env(monkeypatch)
+    monkeypatch.setenv("TELEGRAM_CHAT_ROLES", "2=viewer,7=operator")
+    monkeypatch.setattr(main_mod, "ApplicationBuilder", DummyApplicationBuilder)
+    monkeypatch.setattr(main_mod, "DockerClient", DummyDocker)
+
+    autoscalers = []
+    monkeypatch.setattr(
+        main_mod,
+        "Autoscaler",
+        lambda *a: autoscalers.append(DummyAutoscaler(*a)) or autoscalers[-1],
+    )
+    apps = []
+    orig_build = DummyApplicationBuilder.build
+    monkeypatch.setattr(
+        DummyApplicationBuilder,
+        "build",
+        lambda self: apps.append(orig_build(self)) or apps[-1],
+    )
+
+    main_mod.main()
+    asyncio.run(autoscalers[0].notify("scaled web to 3"))
 
+    assert apps[0].sent_messages == [
+        (1, "scaled web to 3"),
+        (2, "scaled web to 3"),
+        (7, "scaled web to 3"),
+    ]
@@ -176,3 +176,159 @@ async def test_autoscaler_start_and_stop(monkeypatch):
     await autoscaler.stop()
     assert autoscaler._running is False
 
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_skips_warming_up_replicas(monkeypatch):
+    cfg = _base_cfg()
+    cfg.cpu_warmup = 60
+
+    class C:
+        def __init__(self, cid, created):
+            self._id = cid
+            self._container = {
+                "Names": [f"/my_stack_web-{cid}"],
+                "Status": "Up",
+                "Created": created,
+            }
+
+    now = 1_000_000.0
+    monkeypatch.setattr("bot.monitor.time.time", lambda: now)
+
+    class PerIdDocker(DummyDocker):
+        async def get_container_stats_cpu(self, cid):
+            return {"old": 0.2, "new": 1.0}[cid]
+
+    docker = PerIdDocker(
+        cpus=[], containers=[C("old", now - 600), C("new", now - 5)]
+    )
+
+    async def notify(msg: str):
+        pass
+
+    autoscaler = Autoscaler(cfg, docker, notify)
+
+    assert await autoscaler._measure_cpu_avg() == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_median_aggregation(monkeypatch):
+    cfg = _base_cfg()
+    cfg.cpu_aggregation = "median"
+
+    class C:
+        def __init__(self, cid):
+            self._id = cid
+            self._container = {"Names": [f"/my_stack_web-{cid}"], "Status": "Up"}
+
+    class PerIdDocker(DummyDocker):
+        async def get_container_stats_cpu(self, cid):
+            return {"a": 0.3, "b": 0.4, "hot": 3.0}[cid]
+
+    docker = PerIdDocker(cpus=[], containers=[C("a"), C("b"), C("hot")])
+
+    async def notify(msg: str):
+        pass
+
+    autoscaler = Autoscaler(cfg, docker, notify)
+
+    assert await autoscaler._measure_cpu_avg() == pytest.approx(0.4)
+
+
+class HealthDocker(DummyDocker):
+    """Реплики с заданным Status; CPU и удаления по id."""
+
+    def __init__(self, replicas):
+        # replicas: {id: (status, cpu)}
+        class C:
+            def __init__(self, cid, status):
+                self._id = cid
+                self._container = {"Names": [f"/my_stack_web-{cid}"], "Status": status}
+
+        super().__init__(
+            cpus=[], containers=[C(cid, st) for cid, (st, _) in replicas.items()]
+        )
+        self.replicas = replicas
+        self.removed = []
+
+    async def get_container_stats_cpu(self, cid):
+        return self.replicas[cid][1]
+
+    async def remove_container(self, name, force=False):
+        self.removed.append(name)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_ignores_unhealthy_and_starting_replicas():
+    cfg = _base_cfg()
+    docker = HealthDocker(
+        {
+            "ok": ("Up 5 minutes (healthy)", 0.9),
+            "sick": ("Up 5 minutes (unhealthy)", 0.0),
+            "new": ("Up 2 seconds (health: starting)", 0.0),
+        }
+    )
+
+    async def notify(msg: str):
+        pass
+
+    autoscaler = Autoscaler(cfg, docker, notify)
+
+    assert await autoscaler._measure_cpu_avg() == pytest.approx(0.9)
+    assert autoscaler.inventory.starting() == ["local:new"]
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_holds_while_replicas_start(monkeypatch):
+    cfg = _base_cfg()
+    docker = HealthDocker(
+        {
+            "ok": ("Up 5 minutes (healthy)", 0.9),
+            "new": ("Up 2 seconds (health: starting)", 0.0),
+        }
+    )
+
+    async def notify(msg: str):
+        pass
+
+    autoscaler = Autoscaler(cfg, docker, notify)
+
+    async def fake_sleep(_):
+        autoscaler._running = False
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+
+    autoscaler._replicas = 2
+    await autoscaler._loop()
+
+    assert docker.compose_calls == []
+
+
+@pytest.mark.asyncio
+async def test_autoscaler_replaces_persistently_unhealthy(monkeypatch):
+    cfg = _base_cfg()
+    cfg.unhealthy_replace_after = 2
+    docker = HealthDocker(
+        {
+            "ok": ("Up 5 minutes (healthy)", 0.5),
+            "sick": ("Up 5 minutes (unhealthy)", 0.0),
+        }
+    )
+    notifications = []
+
+    async def notify(msg: str):
+        notifications.append(msg)
+
+    autoscaler = Autoscaler(cfg, docker, notify)
+    autoscaler._replicas = 2
+
+    await autoscaler._measure_cpu_avg()
+    await autoscaler._replace_unhealthy()
+    assert docker.removed == []
+
+    await autoscaler._measure_cpu_avg()
+    await autoscaler._replace_unhealthy()
+    assert docker.removed == ["sick"]
+    assert docker.compose_calls[-1][2] == 2
+    assert any("replacing unhealthy" in m for m in notifications)
@@ -0,0 +1,57 @@
+import pytest
+
+from bot.stats import ReplicaCpuTracker, SlidingWindow, make_aggregator
+
+
+def test_sliding_window_evicts_oldest():
+    w = SlidingWindow(3)
+    for v in [5.0, 1.0, 3.0, 2.0]:
+        w.add(v)
+
+    assert len(w) == 3
+    assert w.sorted_values() == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("mean", 22.0),
+        ("median", 3.0),
+        ("max", 100.0),
+        ("p50", 3.0),
+        ("p75", 4.0),
+        ("trimmed20", 3.0),
+    ],
+)
+def test_make_aggregator(spec, expected):
+    values = [1.0, 2.0, 3.0, 4.0, 100.0]
+    assert make_aggregator(spec)(values) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("spec", ["avg", "p", "trimmed50"])
+def test_make_aggregator_invalid(spec):
+    with pytest.raises(ValueError):
+        make_aggregator(spec)
+
+
+def test_tracker_median_ignores_hot_replica():
+    tracker = ReplicaCpuTracker("median", window=3)
+    for _ in range(3):
+        tracker.add("a", 0.2)
+        tracker.add("b", 0.3)
+        tracker.add("hot", 1.0)
+
+    assert tracker.aggregate() == pytest.approx(0.3)
+
+
+def test_tracker_window_smooths_spike_and_retain():
+    tracker = ReplicaCpuTracker("median", window=3)
+    for v in [0.2, 0.9, 0.2]:
+        tracker.add("a", v)
+    tracker.add("gone", 0.9)
+
+    tracker.retain(["a"])
+
+    assert tracker.replica_value("a") == pytest.approx(0.2)
+    assert tracker.replica_value("gone") == 0.0
+    assert tracker.aggregate() == pytest.approx(0.2)